@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Measure /video_raw, /screenshot and gauge reading without a webcam.
+
+Runs the camera paths against a synthetic (or replayed) frame source:
+MJPEG throughput per /video_raw profile through the Flask test client,
+/screenshot round trips with the stub vision client, and gauge-reading
+accuracy against the synthetic source's known readings. Exits non-zero
+when the full-frame read rate on the synthetic dial drops below
+--min-read-rate, since the accuracy numbers are meaningless then.
+
+    python benchmarks/bench_camera_sources.py --seconds 3
+    python benchmarks/bench_camera_sources.py --source replay:clips/panel.mp4
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from flask import Flask
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from gauge_app.config import Config   # noqa: E402
+from gauge_app.services import camera_service, screenshot_service   # noqa: E402
+from gauge_app.utils.frame_sources import SyntheticSource   # noqa: E402
+from gauge_app.utils.gauge_utils import GaugeTracker, read_regular_gauge   # noqa: E402
+
+
+def make_app(source, fps, tmp):
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(CAMERA_SOURCE=source, CAMERA_SOURCE_FPS=fps,
+                      SCREENSHOT_VISION='stub', SCREENSHOT_DIR=tmp)
+    from gauge_app.routes.video_routes import bp as video_bp
+    from gauge_app.routes.screenshot import bp as screenshot_bp
+    app.register_blueprint(video_bp)
+    app.register_blueprint(screenshot_bp)
+    camera_service.init_app(app)
+    screenshot_service.init_app(app)
+    return app
+
+
+def bench_stream(client, query, seconds):
+    resp = client.get('/video_raw' + query, buffered=False)
+    frames, size = 0, 0
+    started = time.perf_counter()
+    for chunk in resp.response:
+        frames += 1
+        size += len(chunk)
+        if time.perf_counter() - started >= seconds:
+            break
+    elapsed = time.perf_counter() - started
+    resp.close()
+    return {'query': query or '(default)', 'fps': frames / elapsed,
+            'kb_per_frame': size / max(frames, 1) / 1024}
+
+
+def bench_screenshot(client, requests):
+    latencies, cached = [], 0
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        body = client.post('/screenshot').get_json()
+        job = screenshot_service.get_job(body['job_id'])
+        job.wait(10)
+        latencies.append(time.perf_counter() - t0)
+        cached += bool(job.result and job.result.get('cached'))
+    return {'requests': requests, 'cached': cached,
+            'vision_calls': screenshot_service.vision.calls,
+            'mean_ms': statistics.mean(latencies) * 1e3}
+
+
+def bench_gauges(frames, period):
+    source = SyntheticSource(fps=0, period=period)
+    tracker = GaugeTracker()
+    rows = {'full': [], 'tracked': []}
+    times = {'full': 0.0, 'tracked': 0.0}
+    for _ in range(frames):
+        _, frame = source.read()
+        for name, read in (('full', read_regular_gauge), ('tracked', tracker.read)):
+            t0 = time.perf_counter()
+            value = read(frame)
+            times[name] += time.perf_counter() - t0
+            if value is not None:
+                d = abs(value - source.truth) % 100
+                rows[name].append(min(d, 100 - d))
+    return {name: {'read_rate': len(errs) / frames,
+                   'median_error': statistics.median(errs) if errs else None,
+                   'mean_ms': times[name] / frames * 1e3}
+            for name, errs in rows.items()}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--source', default='synthetic',
+                    help="'synthetic' or 'replay:<video or image dir>'")
+    ap.add_argument('--fps', type=float, default=30)
+    ap.add_argument('--seconds', type=float, default=2.0, help='per stream profile')
+    ap.add_argument('--profiles', nargs='*',
+                    default=['', '?width=800&quality=70', '?width=480&quality=50&fps=10'])
+    ap.add_argument('--screenshots', type=int, default=5)
+    ap.add_argument('--gauge-frames', type=int, default=60)
+    ap.add_argument('--min-read-rate', type=float, default=0.9,
+                    help='fail if read_regular_gauge() reads fewer synthetic frames')
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(args.source, args.fps, tmp)
+        client = app.test_client()
+        results = {
+            'source': args.source,
+            'stream': [bench_stream(client, q, args.seconds) for q in args.profiles],
+            'variant_encodes': camera_service.broadcaster.encodes,
+            'screenshot': bench_screenshot(client, args.screenshots),
+        }
+        camera_service.broadcaster.stop()
+    results['gauge'] = bench_gauges(args.gauge_frames, period=args.gauge_frames)
+    print(json.dumps(results, indent=2))
+
+    rate = results['gauge']['full']['read_rate']
+    if rate < args.min_read_rate:
+        print(f"✗ full-frame read rate {rate:.2f} < {args.min_read_rate}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
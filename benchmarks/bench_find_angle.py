@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Compare the vectorised findAngle() with the original nested-loop version.
+
+Renders synthetic gauges with known readings, runs both implementations
+on the same Hough segments and reports matching readings and timings.
+
+    python benchmarks/bench_find_angle.py --images 20 --ticks 60
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from gauge_app.utils.gauge_utils import (   # noqa: E402
+    findRed, findCircles, line, intersection, needle_tip
+)
+from gauge_app.utils.synthetic_gauge import render_gauge   # noqa: E402
+
+
+def legacy_tip(lines, center, width):
+    """The pre-vectorisation O(L²) loop from findAngle(), verbatim."""
+    tip, maxd = None, 0
+    for ln in lines:
+        x1, y1, x2, y2 = ln[0]
+        L1 = line((x1, y1), (x2, y2))
+        for ln2 in lines:
+            x3, y3, x4, y4 = ln2[0]
+            if (x1, y1, x2, y2) == (x3, y3, x4, y4):
+                continue
+            L2 = line((x3, y3), (x4, y4))
+            pt = intersection(L1, L2)
+            if pt:
+                dx = pt[0] - center[0]
+                dy = center[1] - pt[1]
+                dist = math.hypot(dx, dy)
+                if 0 < dist < width/2 and dist > maxd:
+                    tip, maxd = pt, dist
+    return tip
+
+
+def to_pct(tip, center):
+    if tip is None:
+        return None
+    deg = math.degrees(math.atan2(center[1] - tip[1], tip[0] - center[0]))
+    if deg < 0:
+        pct = (90 + abs(deg)) / 360
+    elif deg <= 90:
+        pct = (90 - deg) / 360
+    else:
+        pct = (450 - deg) / 360
+    return max(0, min(100, int(pct*100)))
+
+
+def dial_segments(frame):
+    """Reproduce read_regular_gauge() up to the HoughLinesP call."""
+    red = findRed(frame)
+    circles = findCircles(red)
+    if not circles:
+        return None
+    x, y, r = circles[0]
+    pad = int(1.2*r)
+    y1, y2 = max(0, y-pad), min(frame.shape[0], y+pad)
+    x1, x2 = max(0, x-pad), min(frame.shape[1], x+pad)
+    cut_mask = red[y1:y2, x1:x2]
+    width = x2 - x1
+    edges = cv2.Canny(cut_mask, 50, 150, apertureSize=3)
+    lines = cv2.HoughLinesP(edges, rho=1, theta=np.pi/180, threshold=30,
+                            minLineLength=width//3, maxLineGap=20)
+    if lines is not None:
+        # OpenCV 4 returns (L, 1, 4), OpenCV 5 (L, 4); the loop wants the former
+        lines = lines.reshape(-1, 1, 4)
+    return lines, ((x2-x1)//2, (y2-y1)//2), width
+
+
+def timed(fn, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--images', type=int, default=12)
+    ap.add_argument('--ticks', type=int, default=60,
+                    help='tick marks per dial')
+    ap.add_argument('--radius', type=int, default=75)
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--segments', type=int, nargs='*', default=[50, 100, 200, 400],
+                    help='random segment counts for the scaling run')
+    ap.add_argument('--json', action='store_true', help='print only a JSON summary')
+    args = ap.parse_args()
+
+    rows = []
+    for k in range(args.images):
+        truth = (k * 100.0 / args.images + 3.7) % 100
+        frame = render_gauge(truth, radius=args.radius, ticks=args.ticks,
+                             clutter=40, seed=k)
+        found = dial_segments(frame)
+        if found is None or found[0] is None:
+            rows.append({'truth': truth, 'segments': 0})
+            continue
+        lines, center, width = found
+        old_tip, old_t = timed(lambda: legacy_tip(lines, center, width), args.repeat)
+        new_tip, new_t = timed(lambda: needle_tip(lines, center, width), args.repeat)
+        rows.append({
+            'truth': round(truth, 1),
+            'segments': len(lines),
+            'legacy': to_pct(old_tip, center),
+            'vectorised': to_pct(new_tip, center),
+            'legacy_ms': old_t * 1e3,
+            'vectorised_ms': new_t * 1e3,
+        })
+
+    # Scaling: random segments inside a 400px dial box, as on a busy panel
+    rng = np.random.default_rng(0)
+    scaling = []
+    for n in args.segments:
+        lines = rng.integers(0, 400, size=(n, 1, 4)).astype(np.int32)
+        center, width = (200, 200), 400
+        old_tip, old_t = timed(lambda: legacy_tip(lines, center, width), 1)
+        new_tip, new_t = timed(lambda: needle_tip(lines, center, width), args.repeat)
+        scaling.append({
+            'segments': n,
+            'equal': to_pct(old_tip, center) == to_pct(new_tip, center),
+            'legacy_ms': old_t * 1e3,
+            'vectorised_ms': new_t * 1e3,
+            'speedup': old_t / new_t,
+        })
+
+    timed_rows = [r for r in rows if r['segments']]
+    summary = {
+        'images': len(rows),
+        'dials_found': len(timed_rows),
+        'readings_equal': all(r['legacy'] == r['vectorised'] for r in timed_rows),
+        'mean_segments': float(np.mean([r['segments'] for r in timed_rows])) if timed_rows else 0,
+        'legacy_ms_total': sum(r['legacy_ms'] for r in timed_rows),
+        'vectorised_ms_total': sum(r['vectorised_ms'] for r in timed_rows),
+    }
+    if summary['vectorised_ms_total']:
+        summary['speedup'] = summary['legacy_ms_total'] / summary['vectorised_ms_total']
+    summary['scaling'] = scaling
+
+    if args.json:
+        print(json.dumps(summary))
+        return
+    print(f"{'truth':>6} {'segs':>5} {'legacy':>7} {'vector':>7} {'legacy ms':>10} {'vector ms':>10}")
+    for r in rows:
+        if not r['segments']:
+            print(f"{r['truth']:6.1f}   no dial / no segments")
+            continue
+        print(f"{r['truth']:6.1f} {r['segments']:5d} {str(r['legacy']):>7} "
+              f"{str(r['vectorised']):>7} {r['legacy_ms']:10.2f} {r['vectorised_ms']:10.2f}")
+    print(f"\n{'segs':>5} {'equal':>6} {'legacy ms':>10} {'vector ms':>10} {'speedup':>8}")
+    for r in scaling:
+        print(f"{r['segments']:5d} {str(r['equal']):>6} {r['legacy_ms']:10.2f} "
+              f"{r['vectorised_ms']:10.2f} {r['speedup']:7.0f}x")
+    print(json.dumps({k: v for k, v in summary.items() if k != 'scaling'}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Compare full-frame gauge reads with GaugeTracker's ROI reads.
+
+Renders a sequence of synthetic frames whose dial slowly wanders and
+whose needle sweeps, reads each frame with read_regular_gauge() and
+with a GaugeTracker, and reports per-frame timings and reading errors
+against the known truth. `agreement` checks that reading the tracked
+dial from its ROI gives the same value as reading it from the full frame.
+
+    python benchmarks/bench_gauge_tracker.py --frames 120 --radius 75
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from gauge_app.utils.gauge_utils import (   # noqa: E402
+    GaugeTracker, findRed, read_dial, read_regular_gauge
+)
+from gauge_app.utils.synthetic_gauge import render_gauge   # noqa: E402
+
+
+def error(reading, truth):
+    if reading is None:
+        return None
+    d = abs(reading - truth) % 100
+    return min(d, 100 - d)
+
+
+def summarise(times, errors):
+    found = [e for e in errors if e is not None]
+    return {
+        'mean_ms': statistics.mean(times) * 1e3,
+        'p95_ms': sorted(times)[int(0.95 * (len(times) - 1))] * 1e3,
+        'read_rate': len(found) / len(errors),
+        'median_error': statistics.median(found) if found else None,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--frames', type=int, default=90)
+    ap.add_argument('--radius', type=int, default=75)
+    ap.add_argument('--ticks', type=int, default=0)
+    ap.add_argument('--clutter', type=int, default=20)
+    ap.add_argument('--drift', type=float, default=0.5,
+                    help='pixels the dial moves per frame')
+    ap.add_argument('--refresh', type=int, default=30)
+    ap.add_argument('--json', action='store_true', help='print only a JSON summary')
+    args = ap.parse_args()
+
+    frames = []
+    for k in range(args.frames):
+        truth = (30 + k * 0.7) % 100
+        center = (800 + int(args.drift * k * math.cos(k / 20)),
+                  450 + int(args.drift * k * math.sin(k / 20)))
+        frames.append((truth, render_gauge(truth, center=center, radius=args.radius,
+                                           ticks=args.ticks, clutter=args.clutter,
+                                           seed=1)))
+
+    tracker = GaugeTracker(refresh_every=args.refresh)
+    full_t, full_e, roi_t, roi_e, agree = [], [], [], [], 0
+    roi_only = []     # tracked frames that did not need a full scan
+    for truth, frame in frames:
+        t0 = time.perf_counter()
+        full = read_regular_gauge(frame)
+        t1 = time.perf_counter()
+        scans = tracker.full_scans
+        tracked = tracker.read(frame)
+        t2 = time.perf_counter()
+        full_t.append(t1 - t0)
+        roi_t.append(t2 - t1)
+        if tracker.full_scans == scans:
+            roi_only.append(t2 - t1)
+        full_e.append(error(full, truth))
+        roi_e.append(error(tracked, truth))
+        # Same dial read from the full-frame mask: ROI reads must not differ
+        if tracker.circles:
+            agree += read_dial(frame, findRed(frame), tracker.circles[0]) == tracked
+
+    summary = {
+        'frames': args.frames,
+        'full': summarise(full_t, full_e),
+        'tracked': summarise(roi_t, roi_e),
+        'agreement': agree / args.frames,
+        'full_scans': tracker.full_scans,
+        'roi_frames': tracker.roi_frames,
+    }
+    summary['speedup'] = summary['full']['mean_ms'] / summary['tracked']['mean_ms']
+    # steady state, without the periodic full scans amortised in
+    summary['roi_frame_ms'] = statistics.mean(roi_only) * 1e3 if roi_only else None
+    if roi_only:
+        summary['roi_speedup'] = summary['full']['mean_ms'] / summary['roi_frame_ms']
+
+    if args.json:
+        print(json.dumps(summary))
+        return
+    print(f"{'':8} {'mean ms':>8} {'p95 ms':>8} {'read %':>7} {'med err':>8}")
+    for name in ('full', 'tracked'):
+        s = summary[name]
+        err = '-' if s['median_error'] is None else f"{s['median_error']:.1f}"
+        print(f"{name:8} {s['mean_ms']:8.2f} {s['p95_ms']:8.2f} "
+              f"{s['read_rate'] * 100:6.0f}% {err:>8}")
+    if roi_only:
+        print(f"\nROI-only frames {summary['roi_frame_ms']:.2f} ms "
+              f"({summary['roi_speedup']:.1f}x the full-frame read)")
+    print(f"\nspeedup {summary['speedup']:.1f}x, {tracker.full_scans} full scans, "
+          f"{tracker.roi_frames} ROI frames, ROI and full-frame reads of the "
+          f"tracked dial agree on {summary['agreement'] * 100:.0f}% of frames")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""Load-test mqtt_service at configurable message rates.
+
+Messages come from an in-process loopback broker by default: one thread
+plays paho's network thread and calls on_mqtt_message() at the target
+rate, spread round-robin over `--topics` topics. `--broker host:port`
+publishes through a real (local) broker instead. Readings then go
+through the normal ingest workers, history, anomaly rules and batched
+Socket.IO fan-out, delivered to simulated clients by a fake SocketIO.
+
+Each payload is the publish time (seconds since the run started), so
+probe clients can measure publish-to-client latency per reading.
+
+    python benchmarks/bench_mqtt_load.py --rate 20000 --topics 300 --seconds 10
+    python benchmarks/bench_mqtt_load.py --rate 1000 5000 20000 > load.json
+
+Several rates run one after another, each in a fresh process, and the
+output is one JSON document with a result per rate.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask   # noqa: E402
+
+from gauge_app.config import Config   # noqa: E402
+from gauge_app.services import mqtt_service   # noqa: E402
+from gauge_app.services.sensor_emitter import BROADCAST_ROOM   # noqa: E402
+
+
+def rss_mb():
+    """Resident set size of this process in MiB."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        import resource
+        # ru_maxrss is a peak, in KiB on Linux and bytes on macOS
+        scale = 2 ** 20 if sys.platform == 'darwin' else 2 ** 10
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def percentiles(samples):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1e3  # noqa: E731
+    return {'p50_ms': pick(0.50), 'p95_ms': pick(0.95), 'p99_ms': pick(0.99),
+            'max_ms': samples[-1] * 1e3, 'n': len(samples)}
+
+
+class SimClient:
+    """A connected browser; probe clients decode batches and time readings."""
+
+    def __init__(self, sid, clock_zero, probe=False):
+        self.sid = sid
+        self.clock_zero = clock_zero
+        self.probe = probe
+        self.batches = 0
+        self.readings = 0
+        self.bytes = 0
+        self.latencies = []
+
+    def receive(self, event, encoded):
+        self.bytes += len(encoded)
+        if event != 'sensorDataBatch':
+            return
+        self.batches += 1
+        if not self.probe:
+            return
+        now = time.perf_counter() - self.clock_zero
+        readings = json.loads(encoded)['readings']
+        self.readings += len(readings)
+        for value in readings.values():
+            if isinstance(value, (int, float)):
+                self.latencies.append(now - value)
+
+
+class FakeSocketIO:
+    """The parts of flask_socketio.SocketIO that mqtt_service uses.
+
+    Each emit is JSON-encoded once, as the real server encodes a packet
+    once per emit, then handed to every client in the target room.
+    """
+
+    def __init__(self):
+        self.clients = {}
+        self.rooms = {BROADCAST_ROOM: set()}
+        self.handlers = {}
+        self.emits = 0
+        self._lock = threading.Lock()
+
+    def connect(self, client, room=BROADCAST_ROOM):
+        self.clients[client.sid] = client
+        if room:
+            self.rooms[room].add(client.sid)
+
+    def on(self, event):
+        def register(fn):
+            self.handlers[event] = fn
+            return fn
+        return register
+
+    def emit(self, event, data, to=None, **kwargs):
+        encoded = json.dumps(data)
+        if to is None:
+            sids = list(self.clients)
+        elif to in self.rooms:
+            sids = list(self.rooms[to])
+        else:
+            sids = [to]
+        for sid in sids:
+            client = self.clients.get(sid)
+            if client is not None:
+                client.receive(event, encoded)
+        with self._lock:
+            self.emits += 1
+
+    def start_background_task(self, target, *args, **kwargs):
+        thread = threading.Thread(target=target, args=args, kwargs=kwargs, daemon=True)
+        thread.start()
+        return thread
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class LoopbackBroker:
+    """Deliver messages to `on_message` at `rate` msg/s from one thread."""
+
+    def __init__(self, on_message, topics, rate, clock_zero, seed=0):
+        self.on_message = on_message
+        self.topics = list(topics)
+        random.Random(seed).shuffle(self.topics)
+        self.rate = rate
+        self.clock_zero = clock_zero
+        self.sent = 0
+        self.behind = 0.0        # worst backlog in seconds, if delivery can't keep up
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._thread.join()
+
+    def _run(self):
+        topics, n = self.topics, len(self.topics)
+        zero = self.clock_zero
+        started = time.perf_counter()
+        while self._running:
+            now = time.perf_counter()
+            due = int((now - started) * self.rate) - self.sent
+            if due <= 0:
+                time.sleep(0.0005)
+                continue
+            self.behind = max(self.behind, due / self.rate)
+            for _ in range(min(due, 1000)):
+                msg = SimpleNamespace(topic=topics[self.sent % n],
+                                      payload=b'%.6f' % (time.perf_counter() - zero))
+                self.on_message(None, None, msg)
+                self.sent += 1
+
+
+class PahoPublisher(LoopbackBroker):
+    """Publish through a real broker; mqtt_service subscribes to it."""
+
+    def __init__(self, host, port, topics, rate, clock_zero, seed=0):
+        import paho.mqtt.client as mqtt
+        self.client = mqtt.Client()
+        self.client.connect(host, port, keepalive=60)
+        self.client.loop_start()
+        super().__init__(lambda c, u, msg: self.client.publish(msg.topic, msg.payload, qos=0),
+                         topics, rate, clock_zero, seed)
+
+    def stop(self):
+        super().stop()
+        self.client.loop_stop()
+        self.client.disconnect()
+
+
+def make_app(args, tmp):
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(
+        HISTORY_DIR=os.path.join(tmp, 'history'),
+        HISTORY_MAX_AGE=0,
+        INGEST_WORKERS=args.workers,
+        INGEST_QUEUE_SIZE=args.queue,
+        INGEST_POLICY=args.policy,
+        SENSOR_EMIT_HZ=args.emit_hz,
+        SENSOR_CLIENT_MAX_HZ=None,
+        MQTT_TOPICS=[f"{args.prefix}/#"],
+        CONTROLLER_TOPIC=f"{args.prefix}-control",
+    )
+    if args.broker:
+        host, _, port = args.broker.partition(':')
+        app.config.update(MQTT_BROKER=host, MQTT_PORT=int(port or 1883))
+    return app
+
+
+def run(args):
+    """One load run at args.rate; returns the summary dict."""
+    topics = [f"{args.prefix}/{i:04d}" for i in range(args.topics)]
+    socketio = FakeSocketIO()
+    clock_zero = time.perf_counter()
+    for i in range(args.clients):
+        socketio.connect(SimClient(f"room-{i}", clock_zero, probe=i < args.probes))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(args, tmp)
+        for topic in topics:
+            mqtt_service.sensor_history.ensure(topic)
+        mqtt_service.init_app(app, socketio, connect=bool(args.broker))
+        for i in range(args.slow_clients):
+            client = SimClient(f"slow-{i}", clock_zero, probe=i < args.probes)
+            socketio.connect(client, room=None)
+            mqtt_service.sensor_emitter.set_client_rate(client.sid, args.slow_hz)
+        if args.broker:
+            time.sleep(1.0)        # let the subscription land
+            host, _, port = args.broker.partition(':')
+            broker = PahoPublisher(host, int(port or 1883), topics, args.rate, clock_zero, args.seed)
+        else:
+            broker = LoopbackBroker(mqtt_service.on_mqtt_message, topics, args.rate,
+                                    clock_zero, args.seed)
+
+        memory = [rss_mb()]
+        broker.start()
+        started = time.perf_counter()
+        while time.perf_counter() - started < args.seconds:
+            time.sleep(min(0.5, args.seconds))
+            memory.append(rss_mb())
+        broker.stop()
+        published_for = time.perf_counter() - started
+
+        # let queued messages and the last batch reach the clients
+        drain_started = time.perf_counter()
+        if not args.broker:
+            mqtt_service.ingest_pipeline.join()
+        drain = time.perf_counter() - drain_started
+        time.sleep(2.0 / args.emit_hz)
+        memory.append(rss_mb())
+
+        ingest = mqtt_service.ingest_pipeline.stats()
+        emitter = mqtt_service.sensor_emitter.stats()
+        anomalies = len(mqtt_service.anomaly_log)
+        mqtt_service.shutdown()
+
+    clients = list(socketio.clients.values())
+    probes = [c for c in clients if c.probe]
+    latency = {kind: percentiles([lat for c in probes if c.sid.startswith(kind)
+                                  for lat in c.latencies])
+               for kind in ('room', 'slow')}
+    processed = ingest['processed']
+    return {
+        'rate': args.rate,
+        'topics': args.topics,
+        'seconds': published_for,
+        'mode': 'broker' if args.broker else 'loopback',
+        'published': broker.sent,
+        'publish_rate': broker.sent / published_for,
+        'publisher_max_backlog_s': broker.behind,
+        'processed': processed,
+        'processed_rate': processed / (published_for + drain),
+        'dropped': ingest['dropped'],
+        'sampled_out': ingest['sampled_out'],
+        'max_queue_depth': ingest['max_depth'],
+        'emitter': emitter,
+        'socketio_emits': socketio.emits,
+        'anomalies_logged': anomalies,
+        'clients': {
+            'room': args.clients,
+            'throttled': args.slow_clients,
+            'batches_per_client': sum(c.batches for c in clients) / max(len(clients), 1),
+            'mb_per_client': sum(c.bytes for c in clients) / max(len(clients), 1) / 2 ** 20,
+            'probe_readings': sum(c.readings for c in probes),
+        },
+        'latency': {'room': latency['room'], 'throttled': latency['slow']},
+        'memory_mb': {
+            'start': memory[0],
+            'peak': max(memory),
+            'end': memory[-1],
+            'growth': memory[-1] - memory[0],
+            'growth_per_100k_msgs': (memory[-1] - memory[0]) / max(broker.sent, 1) * 1e5,
+        },
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--rate', type=float, nargs='+', default=[5000], help='messages/s')
+    ap.add_argument('--topics', type=int, default=200)
+    ap.add_argument('--seconds', type=float, default=5.0, help='publishing time per rate')
+    ap.add_argument('--clients', type=int, default=20, help='clients at the shared rate')
+    ap.add_argument('--slow-clients', type=int, default=5, help='clients throttled to --slow-hz')
+    ap.add_argument('--slow-hz', type=float, default=2.0)
+    ap.add_argument('--probes', type=int, default=2,
+                    help='clients per kind that decode batches and record latency')
+    ap.add_argument('--workers', type=int, default=Config.INGEST_WORKERS)
+    ap.add_argument('--queue', type=int, default=Config.INGEST_QUEUE_SIZE)
+    ap.add_argument('--policy', default=Config.INGEST_POLICY)
+    ap.add_argument('--emit-hz', type=float, default=Config.SENSOR_EMIT_HZ)
+    ap.add_argument('--broker', help='host[:port] of a local broker; default is in-process')
+    ap.add_argument('--prefix', default='bench')
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+
+    if len(args.rate) == 1:
+        args.rate = args.rate[0]
+        print(json.dumps(run(args), indent=2))
+        return
+
+    # a fresh process per rate keeps memory and module state independent
+    results = []
+    argv = [a for a in sys.argv[1:]]
+    at = argv.index('--rate')
+    argv[at:at + 1 + len(args.rate)] = []
+    for rate in args.rate:
+        out = subprocess.run([sys.executable, __file__, '--rate', str(rate), *argv],
+                             check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(out[out.index('{'):]))
+    print(json.dumps({'runs': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
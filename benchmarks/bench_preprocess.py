@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Compare screenshot preprocessing profiles with the original chain.
+
+Renders noisy synthetic camera frames, runs legacy_preprocess() and each
+Preprocessor profile on them, and reports latency plus how far each
+output is from the legacy output (PSNR and perceptual-hash distance).
+
+    python benchmarks/bench_preprocess.py --frames 20 --size 900x1600
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from gauge_app.utils.phash import hamming, phash   # noqa: E402
+from gauge_app.utils.preprocess import PROFILES, Preprocessor, legacy_preprocess   # noqa: E402
+from gauge_app.utils.synthetic_gauge import render_gauge   # noqa: E402
+
+
+def make_frame(k, size, rng):
+    h, w = size
+    # smooth colour texture so CLAHE and the filters have work to do
+    base = cv2.resize(rng.integers(0, 255, (9, 16, 3)).astype(np.uint8), (w, h),
+                      interpolation=cv2.INTER_CUBIC)
+    frame = render_gauge((k * 7) % 100, image=base, center=(w // 2, h // 2),
+                         radius=min(h, w) // 6)
+    noise = rng.normal(0, 6, frame.shape)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+
+def psnr(a, b):
+    mse = np.mean((a.astype(np.float64) - b.astype(np.float64)) ** 2)
+    return math.inf if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--frames', type=int, default=20)
+    ap.add_argument('--size', default='900x1600', help='frame HxW')
+    ap.add_argument('--target', type=int, default=512)
+    ap.add_argument('--json', action='store_true', help='print only a JSON summary')
+    args = ap.parse_args()
+
+    size = tuple(int(v) for v in args.size.split('x'))
+    rng = np.random.default_rng(0)
+    frames = [make_frame(k, size, rng) for k in range(args.frames)]
+
+    legacy_out, legacy_t = [], []
+    for frame in frames:
+        t0 = time.perf_counter()
+        out = legacy_preprocess(frame, args.target)
+        legacy_t.append(time.perf_counter() - t0)
+        legacy_out.append(cv2.cvtColor(out, cv2.COLOR_BGR2GRAY))
+
+    results = {'legacy': {'mean_ms': statistics.mean(legacy_t) * 1e3,
+                          'p95_ms': sorted(legacy_t)[int(0.95 * (len(legacy_t) - 1))] * 1e3}}
+    for profile in PROFILES:
+        if profile == 'legacy':
+            continue
+        pre = Preprocessor(profile, args.target)
+        pre.run(frames[0])   # allocate buffers outside the timing
+        times, psnrs, dists = [], [], []
+        for frame, ref in zip(frames, legacy_out):
+            t0 = time.perf_counter()
+            out = pre.run(frame)
+            times.append(time.perf_counter() - t0)
+            if out.shape != ref.shape:
+                ref = cv2.resize(ref, out.shape[::-1], interpolation=cv2.INTER_AREA)
+            psnrs.append(psnr(out, ref))
+            dists.append(hamming(phash(out), phash(ref)))
+        mean = statistics.mean(times)
+        results[profile] = {
+            'mean_ms': mean * 1e3,
+            'p95_ms': sorted(times)[int(0.95 * (len(times) - 1))] * 1e3,
+            'speedup': results['legacy']['mean_ms'] / (mean * 1e3),
+            'psnr_vs_legacy': statistics.mean(psnrs),
+            'phash_bits_vs_legacy': statistics.mean(dists),
+        }
+
+    if args.json:
+        print(json.dumps(results))
+        return
+    print(f"{'profile':10} {'mean ms':>8} {'p95 ms':>8} {'speedup':>8} {'PSNR dB':>8} {'phash':>6}")
+    for name, r in results.items():
+        extra = ''
+        if name != 'legacy':
+            extra = f"{r['speedup']:7.1f}x {r['psnr_vs_legacy']:8.1f} {r['phash_bits_vs_legacy']:6.1f}"
+        print(f"{name:10} {r['mean_ms']:8.2f} {r['p95_ms']:8.2f} {extra}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Compare the simulator Engine with the old thread-per-topic loops.
+
+Both publish into a counter instead of a broker, so this measures
+scheduling only: achieved rate against the target, how late publishes
+are, and how far the last publish drifted from its nominal slot.
+
+    python benchmarks/bench_simulator.py --topics 2000 --interval 0.5 --seconds 5
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulator.engine import Engine   # noqa: E402
+
+
+def bench_threads(topics, interval, seconds):
+    """The original publisher_loop: sleep(interval) after every publish."""
+    counts = [0] * topics
+    lag = [0.0] * topics
+    stop = threading.Event()
+    started = time.monotonic()
+
+    def loop(i):
+        while not stop.is_set():
+            counts[i] += 1
+            lag[i] = time.monotonic() - (started + (counts[i] - 1) * interval)
+            time.sleep(interval)
+
+    threads = [threading.Thread(target=loop, args=(i,), daemon=True) for i in range(topics)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    return {'published': sum(counts), 'rate': sum(counts) / seconds,
+            'final_drift_ms': statistics.mean(lag) * 1e3, 'threads': topics}
+
+
+def bench_engine(topics, interval, seconds, jitter):
+    published = [0]
+    engine = Engine(lambda topic, payload: published.__setitem__(0, published[0] + 1),
+                    jitter=jitter, profile='mixed', seed=0)
+    for i in range(topics):
+        engine.add(f"sim/{i}", 0.0, 100.0, interval)
+    engine.run(duration=seconds)
+    stats = engine.stats()
+    return {'published': published[0], 'rate': published[0] / seconds,
+            'late_p50_ms': stats['late_p50_ms'], 'late_p99_ms': stats['late_p99_ms'],
+            'missed': stats['missed'], 'threads': 1}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--topics', type=int, default=1000)
+    ap.add_argument('--interval', type=float, default=0.5)
+    ap.add_argument('--seconds', type=float, default=5.0)
+    ap.add_argument('--jitter', type=float, default=0.0)
+    args = ap.parse_args()
+
+    target = args.topics / args.interval
+    results = {'target_rate': target,
+               'threads': bench_threads(args.topics, args.interval, args.seconds),
+               'engine': bench_engine(args.topics, args.interval, args.seconds, args.jitter)}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Check WeatherFeed against a local stub of the Open-Meteo API.
+
+Covers a fresh fetch, the disk cache sharing one request between
+feeds, falling back to the held forecast when the server fails, an
+unwritable cache directory, and stop() during a long sleep.
+Exits non-zero on the first failed check.
+
+    python benchmarks/check_weather_feed.py
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulator.weather import WeatherFeed, make_session   # noqa: E402
+
+
+def forecast_body(now):
+    """An Open-Meteo style response with hourly data around `now`."""
+    hour = int(now // 3600) * 3600
+    times = [hour + 3600 * i for i in range(-3, 4)]
+    return {
+        'current_weather': {'temperature': 21.5, 'time': hour},
+        'hourly': {
+            'time': times,
+            'temperature_2m': [20.0 + i for i in range(len(times))],
+            'relativehumidity_2m': [60.0 + i for i in range(len(times))],
+        },
+    }
+
+
+class StubServer:
+    """Serves forecast_body() on a free local port; `fail` makes it 503."""
+
+    def __init__(self):
+        self.hits = 0
+        self.fail = False
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits += 1
+                if stub.fail:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = json.dumps(forecast_body(time.time())).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1/forecast"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def check(name, ok):
+    print(("✓ " if ok else "✗ ") + name)
+    if not ok:
+        sys.exit(1)
+
+
+def feed(server, cache_dir, **kw):
+    # no retries, so the failure checks don't wait on backoff
+    return WeatherFeed(34.69, 135.50, cache_dir=cache_dir, url=server.url,
+                       session=make_session(retries=0), **kw)
+
+
+def main():
+    server = StubServer()
+    tmp = tempfile.mkdtemp()
+    try:
+        updates = []
+        first = feed(server, tmp, on_update=lambda t, h: updates.append((t, h)))
+        delay = first.update()
+        check("fresh fetch sets current", first.current == (21.5, 63.0))
+        check("on_update called", updates == [(21.5, 63.0)])
+        check("next refresh due after the ttl", 1.0 <= delay <= first.ttl)
+
+        second = feed(server, tmp)
+        second.update()
+        check("second feed served from the disk cache", server.hits == 1
+              and second.requests == 0 and second.current == first.current)
+
+        server.fail = True
+        expired = feed(server, tmp, ttl=0.0, retry=5.0)
+        delay = expired.update()
+        check("server failure falls back to the stale forecast",
+              expired.failures == 1 and expired.current is not None and delay == 5.0)
+
+        server.fail = False
+        unwritable = feed(server, os.path.join(tmp, 'blocked'))
+        # a directory where the temp file goes fails the write, even as root
+        os.makedirs(unwritable.cache_path + '.tmp')
+        unwritable.update()
+        check("unwritable cache still updates", unwritable.current == (21.5, 63.0)
+              and unwritable.failures == 0)
+
+        sleeper = feed(server, None, ttl=3600.0)
+        sleeper.start()
+        time.sleep(0.3)
+        started = time.monotonic()
+        sleeper.stop()
+        sleeper._thread.join(timeout=3)
+        check("stop() ends the refresh thread promptly",
+              not sleeper._thread.is_alive() and time.monotonic() - started < 2.0)
+    finally:
+        server.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
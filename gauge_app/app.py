@@ -34,10 +34,14 @@ def create_app():
     from gauge_app.routes.anomalies    import bp as anomalies_bp
     from gauge_app.routes.video_routes import bp as video_bp
     from gauge_app.routes.screenshot   import bp as screenshot_bp
+    from gauge_app.routes.sensor_api   import bp as sensor_api_bp
+    from gauge_app.routes.metrics      import bp as metrics_bp
 
     app.register_blueprint(anomalies_bp)
     app.register_blueprint(video_bp)
     app.register_blueprint(screenshot_bp)
+    app.register_blueprint(sensor_api_bp)
+    app.register_blueprint(metrics_bp)
 
     # 6. Finally, catch-all for your SPA
     from gauge_app.routes.web_routes import bp as web_bp
@@ -45,17 +49,33 @@ def create_app():
 
     return app
 
-# 7. Create app & SocketIO
-app = create_app()
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+def init_services(app, socketio):
+    """Start MQTT, reports, screenshots, the camera and the gauge readers.
 
-# 8. Initialize camera & MQTT
-from gauge_app.services.camera_service import init_app as init_camera
-from gauge_app.services import mqtt_service
+    Only the serving process may call this. Report workers (forkserver
+    or spawn) re-import the main module, so nothing here can run at
+    import time or every worker would open the camera and MQTT again.
+    """
+    from gauge_app.services.camera_service import init_app as init_camera
+    from gauge_app.services import mqtt_service, report_service, gauge_service, screenshot_service
 
-mqtt_service.init_app(app, socketio)
-init_camera(app)
+    mqtt_service.init_app(app, socketio)
+    report_service.init_app(app, socketio)
+    screenshot_service.init_app(app, socketio)
+    init_camera(app)
+    gauge_service.init_app(app, socketio)
 
-if __name__ == '__main__':
-    port = int(os.environ.get('PORT', 3000))
+
+def main(port=None):
+    """Build the app, start its services and serve on `port` (default $PORT or 3000)."""
+    # 7. Create app & SocketIO
+    app = create_app()
+    socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+    # 8. Initialize camera & MQTT
+    init_services(app, socketio)
+    port = port or int(os.environ.get('PORT', 3000))
     socketio.run(app, host='0.0.0.0', port=port)
+
+
+if __name__ == '__main__':
+    main()
@@ -20,10 +20,98 @@ class Config:
     ]
     CONTROLLER_TOPIC = os.environ.get('CONTROLLER_TOPIC', 'carlospeacock')
     
+    # MQTT ingestion: worker threads, total queue size and what to do when
+    # it is full (drop_oldest | block | sample)
+    INGEST_WORKERS = int(os.environ.get('INGEST_WORKERS', 2))
+    INGEST_QUEUE_SIZE = int(os.environ.get('INGEST_QUEUE_SIZE', 10000))
+    INGEST_POLICY = os.environ.get('INGEST_POLICY', 'drop_oldest')
+    INGEST_SAMPLE_EVERY = int(os.environ.get('INGEST_SAMPLE_EVERY', 10))
+
+    # Sensor history retention (per topic): max samples, and max age in
+    # seconds (0 keeps samples until the buffer is full)
+    HISTORY_CAPACITY = int(os.environ.get('HISTORY_CAPACITY', 100000))
+    HISTORY_MAX_AGE = float(os.environ.get('HISTORY_MAX_AGE', 24 * 3600))
+
+    # Persistent sensor history (memory-mapped columnar segments on disk)
+    HISTORY_DIR = os.environ.get('HISTORY_DIR', os.path.join('data', 'history'))
+    HISTORY_SEGMENT_ROWS = int(os.environ.get('HISTORY_SEGMENT_ROWS', 100000))
+    HISTORY_SEGMENT_SECONDS = float(os.environ.get('HISTORY_SEGMENT_SECONDS', 3600))
+    HISTORY_RETENTION_DAYS = float(os.environ.get('HISTORY_RETENTION_DAYS', 30))
+    HISTORY_COMPACT_INTERVAL = float(os.environ.get('HISTORY_COMPACT_INTERVAL', 600))
+
+    # Socket.IO sensor batching: flush rate, and optional default per-client
+    # cap (clients may lower their own rate with 'setSensorRate')
+    SENSOR_EMIT_HZ = float(os.environ.get('SENSOR_EMIT_HZ', 10))
+    SENSOR_CLIENT_MAX_HZ = float(os.environ.get('SENSOR_CLIENT_MAX_HZ', 0)) or None
+
+    # State sent on connect: a snapshot (latest values, sparklines over
+    # SYNC_SPARKLINE_SECONDS, unacknowledged anomalies), or only what was
+    # missed when a client reconnects within SYNC_BACKLOG_SECONDS
+    SYNC_SPARKLINE_SECONDS = float(os.environ.get('SYNC_SPARKLINE_SECONDS', 300))
+    SYNC_SPARKLINE_POINTS = int(os.environ.get('SYNC_SPARKLINE_POINTS', 60))
+    SYNC_BACKLOG_SECONDS = float(os.environ.get('SYNC_BACKLOG_SECONDS', 120))
+    SYNC_MAX_ANOMALIES = int(os.environ.get('SYNC_MAX_ANOMALIES', 50))
+
+    # Anomaly detection: rules run over micro-batches every
+    # ANOMALY_BATCH_INTERVAL seconds (see services/anomaly_service.py)
+    ANOMALY_BATCH_INTERVAL = float(os.environ.get('ANOMALY_BATCH_INTERVAL', 0.5))
+    ANOMALY_ZSCORE_WINDOW = int(os.environ.get('ANOMALY_ZSCORE_WINDOW', 60))
+    ANOMALY_ZSCORE_THRESHOLD = float(os.environ.get('ANOMALY_ZSCORE_THRESHOLD', 3.0))
+    ANOMALY_DRIFT_THRESHOLD = float(os.environ.get('ANOMALY_DRIFT_THRESHOLD', 3.0))
+    ANOMALY_STUCK_SAMPLES = int(os.environ.get('ANOMALY_STUCK_SAMPLES', 30))
+    ANOMALY_RATE_LIMITS = {}   # topic -> max |change| per second (default: range/s)
+    # Shortest Δt the rate rule divides by; closer readings are compared further back
+    ANOMALY_RATE_MIN_INTERVAL = float(os.environ.get('ANOMALY_RATE_MIN_INTERVAL', 1.0))
+    ANOMALY_LOG_MAX = int(os.environ.get('ANOMALY_LOG_MAX', 10000))
+
+    # PDF report rendering (process pool + cache of finished reports)
+    REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', 2))
+    REPORT_CACHE_SIZE = int(os.environ.get('REPORT_CACHE_SIZE', 8))
+    REPORT_JOB_TTL = float(os.environ.get('REPORT_JOB_TTL', 3600))
+    # Screenshots in the PDF: 'thumb', 'full' or 'none'
+    REPORT_SCREENSHOTS = os.environ.get('REPORT_SCREENSHOTS', 'thumb')
+
+    # Screenshot answers reused while the view is perceptually unchanged
+    SCREENSHOT_CACHE_SIZE = int(os.environ.get('SCREENSHOT_CACHE_SIZE', 64))
+    SCREENSHOT_CACHE_TTL = float(os.environ.get('SCREENSHOT_CACHE_TTL', 120))
+    SCREENSHOT_HASH_THRESHOLD = int(os.environ.get('SCREENSHOT_HASH_THRESHOLD', 6))  # bits of 64
+    # Vision calls run as jobs on a small pool; 'stub' answers offline
+    SCREENSHOT_VISION = os.environ.get('SCREENSHOT_VISION', 'openai')
+    # Preprocessing profile: default | fast | minimal | legacy (see utils/preprocess.py)
+    SCREENSHOT_PROFILE = os.environ.get('SCREENSHOT_PROFILE', 'default')
+    SCREENSHOT_WORKERS = int(os.environ.get('SCREENSHOT_WORKERS', 2))
+    SCREENSHOT_MAX_PENDING = int(os.environ.get('SCREENSHOT_MAX_PENDING', 4))
+    SCREENSHOT_JOB_TTL = float(os.environ.get('SCREENSHOT_JOB_TTL', 600))
+    # Screenshot log: full JPEGs on disk, oldest dropped past either cap
+    SCREENSHOT_DIR = os.environ.get('SCREENSHOT_DIR', os.path.join('data', 'screenshots'))
+    SCREENSHOT_MAX_COUNT = int(os.environ.get('SCREENSHOT_MAX_COUNT', 500))
+    SCREENSHOT_MAX_BYTES = int(os.environ.get('SCREENSHOT_MAX_BYTES', 200 * 2**20))
+    SCREENSHOT_THUMB_SIZE = int(os.environ.get('SCREENSHOT_THUMB_SIZE', 160))
+
+    # Joystick control channel: publish rate, staleness cutoff, wire format
+    CONTROL_TICK_HZ = float(os.environ.get('CONTROL_TICK_HZ', 20))
+    CONTROL_STALE_MS = float(os.environ.get('CONTROL_STALE_MS', 500))
+    CONTROL_PAYLOAD = os.environ.get('CONTROL_PAYLOAD', 'binary')   # 'binary' or 'json'
+
     # Camera settings
     CAMERA_WIDTH = int(os.environ.get('CAMERA_WIDTH', 1600))
     CAMERA_HEIGHT = int(os.environ.get('CAMERA_HEIGHT', 900))
     CAMERA_INDEX = int(os.environ.get('CAMERA_INDEX', 0))
+    # Frame source: 'device', 'synthetic' or 'replay:<video file or image dir>'
+    CAMERA_SOURCE = os.environ.get('CAMERA_SOURCE', 'device')
+    CAMERA_SOURCE_FPS = float(os.environ.get('CAMERA_SOURCE_FPS', 30))   # replay/synthetic
+    # Upper bound on /video_raw frame rate per client
+    VIDEO_FPS = float(os.environ.get('VIDEO_FPS', 30))
+
+    # On-device gauge reading from the camera feed (0 disables)
+    GAUGE_READ_HZ = float(os.environ.get('GAUGE_READ_HZ', 2))
+    GAUGE_TOPIC = os.environ.get('GAUGE_TOPIC', 'gaugepeacock')
+    # Full-frame circle search every N reads; ROI tracking in between (0 = always full)
+    GAUGE_TRACK_REFRESH = int(os.environ.get('GAUGE_TRACK_REFRESH', 30))
+    # Read every dial in the frame, each stored as '<GAUGE_TOPIC>/<id>'
+    GAUGE_MULTI = os.environ.get('GAUGE_MULTI', '0').lower() in ('1', 'true', 'yes')
+    # Threads reading dials in parallel in multi-gauge mode (0 = inline)
+    GAUGE_READ_WORKERS = int(os.environ.get('GAUGE_READ_WORKERS', 0))
 
     THRESHOLDS = {
         'temperaturapeacock': { 'low': 20.0, 'high': 30.0 },   # °C (68–86°F) :contentReference[oaicite:4]{index=4}
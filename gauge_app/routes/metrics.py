@@ -0,0 +1,12 @@
+# gauge_app/routes/metrics.py
+from flask import Blueprint, Response
+
+from gauge_app.utils import metrics
+
+bp = Blueprint('metrics', __name__)
+
+
+@bp.route('/metrics')
+def scrape():
+    """Prometheus text exposition of every registered metric."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
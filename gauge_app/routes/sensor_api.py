@@ -0,0 +1,116 @@
+# gauge_app/routes/sensor_api.py
+import hashlib
+import json
+import time
+from datetime import datetime
+
+import numpy as np
+from flask import Blueprint, current_app, jsonify, request
+
+import gauge_app.services.mqtt_service as mqtt_service
+from gauge_app.utils.downsample import METHODS
+
+bp = Blueprint('sensor_api', __name__, url_prefix='/api/sensors')
+
+DEFAULT_POINTS = 500
+MAX_POINTS = 5000
+DEFAULT_SPAN = 3600   # seconds of history when `from` is omitted
+
+
+def _parse_time(raw, default):
+    """Accept epoch seconds or an ISO-8601 timestamp."""
+    if raw is None or raw == '':
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return datetime.fromisoformat(raw).timestamp()
+
+
+def _load(topic, start, end):
+    """Read [start, end] from memory, falling back to disk for older data."""
+    oldest = mqtt_service.sensor_history[topic].first()
+    store = mqtt_service.history_store
+    if store is not None and (oldest is None or start < oldest[0]):
+        return store.query(topic, start, end)
+    return mqtt_service.sensor_history.window(topic, start, end)
+
+
+def _json(obj):
+    return current_app.response_class(
+        json.dumps(obj, separators=(',', ':')), mimetype='application/json')
+
+
+@bp.route('')
+def list_sensors():
+    """Topics with their running summary statistics."""
+    return jsonify({
+        topic: mqtt_service.sensor_stats.summary(topic)
+        for topic in mqtt_service.sensor_history
+    })
+
+
+@bp.route('/snapshot')
+def snapshot():
+    """What a dashboard is sent on connect: latest values, sparklines and
+    unacknowledged anomalies (see sync_service)."""
+    return _json(mqtt_service.snapshot())
+
+
+@bp.route('/<path:topic>/history')
+def sensor_history(topic):
+    """Downsampled history for one topic.
+
+    Query args: from/to (epoch seconds or ISO time), points (max samples
+    returned), method (lttb|minmax) and format (json|f32). The f32 body
+    is all time offsets from X-Base-Time followed by all values, both
+    little-endian float32.
+    """
+    if topic not in mqtt_service.sensor_history:
+        return jsonify({'error': f'Unknown topic {topic}'}), 404
+    try:
+        end = _parse_time(request.args.get('to'), time.time())
+        start = _parse_time(request.args.get('from'), end - DEFAULT_SPAN)
+        points = int(request.args.get('points', DEFAULT_POINTS))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    points = max(2, min(points, MAX_POINTS))
+    method = request.args.get('method', 'lttb')
+    fmt = request.args.get('format', 'json')
+    if method not in METHODS or fmt not in ('json', 'f32'):
+        return jsonify({'error': 'method must be lttb|minmax, format json|f32'}), 400
+
+    ts, vals = _load(topic, start, end)
+    raw_count = len(ts)
+
+    # The ETag only depends on the raw slice, so check it before downsampling
+    signature = (topic, request.args.get('from'), request.args.get('to'),
+                 points, method, fmt, raw_count,
+                 float(ts[0]) if len(ts) else None,
+                 float(ts[-1]) if len(ts) else None)
+    etag = hashlib.blake2b(repr(signature).encode(), digest_size=12).hexdigest()
+    if etag in request.if_none_match:
+        resp = current_app.response_class(status=304)
+        resp.set_etag(etag)
+        return resp
+
+    ts, vals = METHODS[method](ts, vals, points)
+
+    if fmt == 'f32':
+        body = ((ts - start).astype('<f4').tobytes()
+                + vals.astype('<f4').tobytes())
+        resp = current_app.response_class(body, mimetype='application/octet-stream')
+        resp.headers['X-Base-Time'] = repr(start)
+        resp.headers['X-Points'] = str(len(ts))
+    else:
+        resp = _json({
+            'topic': topic,
+            'from': start,
+            'to': end,
+            't': np.round(ts, 3).tolist(),
+            'v': np.round(vals, 4).tolist(),
+        })
+    resp.headers['X-Raw-Count'] = str(raw_count)
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.set_etag(etag)
+    return resp
@@ -1,13 +1,27 @@
 # gauge_app/routes/video_routes.py
 
-from flask import Blueprint, Response
+from flask import Blueprint, Response, current_app, request
 from gauge_app.services.camera_service import gen_raw_frames
 
 bp = Blueprint('video', __name__)
 
+
+def _int_arg(name, low, high):
+    value = request.args.get(name, type=int)
+    return None if value is None else max(low, min(high, value))
+
+
 @bp.route('/video_raw')
 def video_raw():
+    """MJPEG stream; ?width=, ?quality= (1-100), ?fps= and ?adapt=0 to
+    pin the profile instead of degrading it for a slow client."""
+    fps = request.args.get('fps', type=float) or current_app.config['VIDEO_FPS']
     return Response(
-        gen_raw_frames(),
+        gen_raw_frames(
+            width=_int_arg('width', 160, 4096),
+            quality=_int_arg('quality', 1, 100),
+            fps=min(fps, current_app.config['VIDEO_FPS']),
+            adapt=request.args.get('adapt', '1') not in ('0', 'false', 'no'),
+        ),
         mimetype='multipart/x-mixed-replace; boundary=frame'
     )
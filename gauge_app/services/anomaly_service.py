@@ -0,0 +1,119 @@
+# gauge_app/services/anomaly_service.py
+import itertools
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from gauge_app.utils.anomaly_rules import (
+    StaticBounds, RollingZScore, EwmaDrift, RateOfChange, StuckSensor
+)
+
+
+def default_rules(config):
+    """The standard rule set, tuned from a Config object/mapping."""
+    thresholds = config['THRESHOLDS']
+    return [
+        StaticBounds(thresholds),
+        RollingZScore(window=config['ANOMALY_ZSCORE_WINDOW'],
+                      threshold=config['ANOMALY_ZSCORE_THRESHOLD']),
+        EwmaDrift(threshold=config['ANOMALY_DRIFT_THRESHOLD']),
+        RateOfChange(config['ANOMALY_RATE_LIMITS'], thresholds,
+                     min_interval=config['ANOMALY_RATE_MIN_INTERVAL']),
+        StuckSensor(samples=config['ANOMALY_STUCK_SAMPLES']),
+    ]
+
+
+class AnomalyDetector:
+    """Run a rule pipeline over per-topic micro-batches.
+
+    `submit()` only buffers the reading; a background thread evaluates
+    all rules every `interval` seconds over the new samples plus the
+    last `context` samples of each topic, appends structured events to
+    `log` and passes them to `on_events`.
+    """
+
+    def __init__(self, rules, log, interval=0.5, context=120,
+                 on_events=None, max_log=10000):
+        self.rules = list(rules)
+        self.log = log
+        self.interval = interval
+        self.context = context
+        self.on_events = on_events
+        self.max_log = max_log
+        self._pending = {}     # topic -> ([ts], [value])
+        self._tails = {}       # topic -> (ts array, value array)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._running = False
+
+    def submit(self, topic, ts, value):
+        with self._lock:
+            batch = self._pending.get(topic)
+            if batch is None:
+                batch = self._pending[topic] = ([], [])
+            batch[0].append(ts)
+            batch[1].append(value)
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self._running = False
+
+    def _run(self):
+        while self._running:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print("✗ anomaly detection failed:", e)
+
+    def flush(self):
+        """Evaluate everything submitted since the last flush."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        events = []
+        for topic, (batch_ts, batch_vals) in pending.items():
+            events.extend(self._evaluate(topic,
+                                         np.asarray(batch_ts, dtype=np.float64),
+                                         np.asarray(batch_vals, dtype=np.float64)))
+        if not events:
+            return events
+
+        events.sort(key=lambda e: e['ts'])
+        self.log.extend(events)
+        if len(self.log) > self.max_log:
+            del self.log[:len(self.log) - self.max_log]
+        if self.on_events:
+            self.on_events(events)
+        return events
+
+    def _evaluate(self, topic, batch_ts, batch_vals):
+        tail = self._tails.get(topic)
+        if tail is not None:
+            ts = np.concatenate((tail[0], batch_ts))
+            vals = np.concatenate((tail[1], batch_vals))
+            start = len(tail[0])
+        else:
+            ts, vals, start = batch_ts, batch_vals, 0
+        self._tails[topic] = (ts[-self.context:], vals[-self.context:])
+
+        events = []
+        for rule in self.rules:
+            for i, severity, detail in rule.evaluate(topic, ts, vals, start):
+                events.append({
+                    'id': next(self._ids),
+                    'topic': topic,
+                    'value': float(vals[i]),
+                    'ts': float(ts[i]),
+                    'time': datetime.fromtimestamp(ts[i]),
+                    'rule': rule.name,
+                    'severity': severity,
+                    'detail': detail,
+                })
+        return events
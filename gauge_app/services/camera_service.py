@@ -1,50 +1,309 @@
 # gauge_app/services/camera_service.py
 
+import threading
+import time
+
 import cv2
 from flask import current_app
-from gauge_app.utils.gauge_utils import (
-    getNeedleMask,
-    findCircles,
-    read_regular_gauge
-)
+
+from gauge_app.utils import metrics
+from gauge_app.utils.frame_sources import open_source
 
 # Camera will be set in init_app()
 camera = None
+# Shared capture thread, also set in init_app()
+broadcaster = None
+
+MJPEG_PART_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+
+READ_SECONDS = metrics.histogram('camera_read_seconds', 'Time spent in capture.read() per frame')
+ENCODE_SECONDS = metrics.histogram('camera_encode_seconds', 'JPEG encode time per frame',
+                                   ('variant',))
+
+# Resized/re-encoded variants are snapped to these, so arbitrary
+# ?width=/?quality= values share a handful of encodes
+VARIANT_WIDTHS = (160, 240, 320, 480, 640, 800, 960, 1280, 1920)
+VARIANT_QUALITIES = (30, 40, 50, 60, 70, 80, 90)
+
+
+def snap_variant(width, quality, frame_width):
+    """(width, quality) moved onto the variant ladder; None means full
+    size / default quality."""
+    if width:
+        fits = [w for w in VARIANT_WIDTHS if w <= width]
+        width = fits[-1] if fits else VARIANT_WIDTHS[0]
+        if width >= frame_width:
+            width = None
+    if quality:
+        quality = min(VARIANT_QUALITIES, key=lambda q: abs(q - quality))
+    return width, quality
+
+
+class FrameBroadcaster:
+    """Read the camera on one background thread and share each frame.
+
+    Every frame is JPEG-encoded at most once and stored as a ready-to-send
+    multipart chunk; all MJPEG viewers yield that same bytes object, so
+    adding viewers does not add reads or encodes. Resized variants are
+    dropped once nobody has asked for them in `variant_idle` frames.
+    """
+
+    def __init__(self, capture, variant_idle=150):
+        self.capture = capture
+        self.variant_idle = variant_idle
+        self._cond = threading.Condition()
+        self._frame = None     # latest raw BGR frame
+        self._chunk = None     # latest multipart chunk (None until encoded)
+        self._seq = 0
+        self._subscribers = 0
+        self._running = False
+        self._thread = None
+        self._variants = {}      # (width, quality) -> (seq, chunk)
+        self._variant_locks = {}  # (width, quality) -> (lock, encode-time histogram child)
+        self._requested = {}     # (width, quality) -> seq it was last asked for
+        self.encodes = 0         # variant encodes, for comparing with frames served
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _run(self):
+        read_seconds = READ_SECONDS.labels()
+        encode_seconds = ENCODE_SECONDS.labels(variant='full')
+        while self._running:
+            with metrics.timed(read_seconds):
+                success, frame = self.capture.read()
+            if not success:
+                time.sleep(0.05)
+                continue
+
+            # Only pay for the encode when somebody is watching
+            chunk = None
+            if self._subscribers:
+                with metrics.timed(encode_seconds):
+                    ret, buf = cv2.imencode('.jpg', frame)
+                if ret:
+                    chunk = MJPEG_PART_HEADER + buf.tobytes() + b'\r\n'
+
+            with self._cond:
+                self._frame = frame
+                self._chunk = chunk
+                self._seq += 1
+                self._cond.notify_all()
+                if self._seq % self.variant_idle == 0:
+                    self._drop_idle_variants()
+
+    def _drop_idle_variants(self):
+        """Forget variants nobody requested in the last `variant_idle`
+        frames; call with _cond held."""
+        cutoff = self._seq - self.variant_idle
+        for key, last in list(self._requested.items()):
+            if last < cutoff:
+                del self._requested[key]
+                self._variants.pop(key, None)
+
+    def latest(self, timeout=2.0):
+        """Return (seq, frame) for the most recent raw frame.
+
+        Waits for the first frame; frame is None if none arrived in time.
+        """
+        with self._cond:
+            if self._frame is None:
+                self._cond.wait_for(lambda: self._frame is not None, timeout)
+            return self._seq, self._frame
+
+    def latest_frame(self, timeout=2.0):
+        """Return the most recent raw frame, waiting for the first one."""
+        return self.latest(timeout)[1]
+
+    def wait_frame(self, last_seq, timeout=1.0):
+        """Wait for a frame newer than `last_seq`; returns (seq, frame, chunk).
+
+        `chunk` is the shared full-quality encode, None unless a viewer
+        registered with add_viewer() is active.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._seq != last_seq and self._frame is not None, timeout)
+            return self._seq, self._frame, self._chunk
+
+    def encoded(self, seq, frame, width=None, quality=None):
+        """Multipart chunk of frame `seq` resized to `width` at `quality`.
+
+        Width and quality are snapped to the variant ladder first. Each
+        variant is encoded once per frame and shared by every client
+        asking for it; a client holding an older frame gets the newer
+        cached encode.
+        """
+        width, quality = snap_variant(width, quality, frame.shape[1])
+        key = (width, quality)
+        with self._cond:
+            slot = self._variant_locks.get(key)
+            if slot is None:
+                slot = self._variant_locks[key] = (
+                    threading.Lock(),
+                    ENCODE_SECONDS.labels(variant=f"{width or 'full'}q{quality or 'default'}"))
+            lock, encode_seconds = slot
+            self._requested[key] = max(seq, self._requested.get(key, seq))
+        with lock:
+            cached = self._variants.get(key)
+            if cached is not None and cached[0] >= seq:
+                return cached[1]
+            with metrics.timed(encode_seconds):
+                img = frame
+                if width:
+                    height = max(1, round(frame.shape[0] * width / frame.shape[1]))
+                    img = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+                params = [cv2.IMWRITE_JPEG_QUALITY, quality] if quality else []
+                ret, buf = cv2.imencode('.jpg', img, params)
+            if not ret:
+                return None
+            chunk = MJPEG_PART_HEADER + buf.tobytes() + b'\r\n'
+            self._variants[key] = (seq, chunk)
+            self.encodes += 1
+        return chunk
+
+    @property
+    def running(self):
+        return self._running
+
+    def add_viewer(self):
+        """Register a viewer of the shared full-quality encode."""
+        with self._cond:
+            self._subscribers += 1
+
+    def remove_viewer(self):
+        with self._cond:
+            self._subscribers -= 1
 
 
 def init_app(app):
-    """Initialize the global camera using settings from app.config."""
-    global camera
-    idx    = app.config['CAMERA_INDEX']
-    width  = app.config['CAMERA_WIDTH']
-    height = app.config['CAMERA_HEIGHT']
+    """Initialize the global camera using settings from app.config.
 
-    camera = cv2.VideoCapture(idx)
-    camera.set(cv2.CAP_PROP_FRAME_WIDTH,  width)
-    camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-    print("📷  Opening camera index", app.config['CAMERA_INDEX'])
+    CAMERA_SOURCE picks a live device, a file replay or synthetic gauges.
+    """
+    global camera, broadcaster
+    camera = open_source(app.config)
+    if app.config['CAMERA_SOURCE'] == 'device':
+        print("📷  Opening camera index", app.config['CAMERA_INDEX'])
+    else:
+        print("📷  Using frame source", app.config['CAMERA_SOURCE'])
 
+    broadcaster = FrameBroadcaster(camera)
+    broadcaster.start()
+    metrics.collect('camera', lambda: {'frames': broadcaster._seq,
+                                       'variant_encodes': broadcaster.encodes,
+                                       'variants': len(broadcaster._variants),
+                                       'viewers': broadcaster._subscribers})
 
 
-def gen_raw_frames():
-    """Stream raw MJPEG frames from the camera."""
-    if camera is None:
-        raise RuntimeError(
-            "camera_service not initialized; call init_app(app) first"
-        )
+class AdaptiveStream:
+    """One viewer's MJPEG stream, stepping quality down when it lags.
 
-    while True:
-        success, frame = camera.read()
-        if not success:
-            break
+    The time the server spends inside each `yield` is how long the
+    client took to drain the previous frame. When its average uses most
+    of the frame budget (1/fps) the stream moves one step down a ladder
+    of cheaper (width, quality, fps) levels; when the client drains
+    quickly for a while it moves back up. The broadcaster snaps widths
+    and qualities to its variant ladder, so clients at the same level
+    share encodes.
+    """
 
-        ret, buf = cv2.imencode('.jpg', frame)
-        if not ret:
-            continue
+    # (width scale, quality drop, fps scale), cheapest last
+    LADDER = ((1.0, 0, 1.0), (1.0, 20, 1.0), (0.75, 20, 1.0),
+              (0.5, 35, 1.0), (0.5, 35, 0.5))
 
-        jpg = buf.tobytes()
-        yield (
-            b'--frame\r\n'
-            b'Content-Type: image/jpeg\r\n\r\n' 
-            + jpg + b'\r\n'
+    def __init__(self, source, width=None, quality=None, fps=30.0, adapt=True,
+                 min_width=320, min_quality=30):
+        self.source = source
+        self.width = width
+        self.quality = quality
+        self.fps = max(1.0, fps)
+        self.adapt = adapt
+        self.min_width = min_width
+        self.min_quality = min_quality
+        self.level = 0
+        self.drain = 0.0         # EWMA of seconds spent sending a frame
+        self.frames = 0
+        self.level_changes = 0
+
+    def profile(self, frame_width):
+        """(width, quality, fps) for the current level."""
+        w_scale, q_drop, f_scale = self.LADDER[self.level]
+        width, quality = self.width, self.quality
+        if w_scale < 1:
+            base = width or frame_width
+            width = max(self.min_width, int(base * w_scale))
+        if q_drop:
+            quality = max(self.min_quality, (quality or 95) - q_drop)
+        return width, quality, max(1.0, self.fps * f_scale)
+
+    def _adjust(self, drain, since_change):
+        self.drain = drain if not self.frames else 0.7 * self.drain + 0.3 * drain
+        budget = 1.0 / (self.fps * self.LADDER[self.level][2])
+        if (self.drain > 0.7 * budget and since_change >= 5
+                and self.level < len(self.LADDER) - 1):
+            self.level += 1
+        elif self.drain < 0.25 * budget and since_change >= 30 and self.level > 0:
+            self.level -= 1
+        else:
+            return False
+        self.level_changes += 1
+        return True
+
+    def __iter__(self):
+        # full-quality viewers reuse the capture thread's encode
+        shared = self.width is None and self.quality is None
+        if shared:
+            self.source.add_viewer()
+        try:
+            last_seq, next_due, since_change = -1, 0.0, 0
+            while self.source.running:
+                seq, frame, chunk = self.source.wait_frame(last_seq)
+                if seq == last_seq or frame is None:
+                    continue
+                width, quality, fps = self.profile(frame.shape[1])
+                now = time.monotonic()
+                if now < next_due:
+                    time.sleep(next_due - now)
+                    seq, frame, chunk = self.source.wait_frame(-1, 0)
+                last_seq = seq
+                next_due = max(next_due, time.monotonic() - 1.0 / fps) + 1.0 / fps
+
+                if (width, quality) != (None, None) or chunk is None:
+                    chunk = self.source.encoded(seq, frame, width, quality)
+                    if chunk is None:
+                        continue
+                started = time.perf_counter()
+                yield chunk
+                drain = time.perf_counter() - started
+                self.frames += 1
+                since_change += 1
+                if self.adapt and self._adjust(drain, since_change):
+                    since_change = 0
+        finally:
+            if shared:
+                self.source.remove_viewer()
+
+
+def gen_raw_frames(width=None, quality=None, fps=30.0, adapt=True):
+    """Stream MJPEG frames from the shared capture thread.
+
+    With no width/quality every viewer gets the one shared full-quality
+    encode; otherwise frames are resized/re-encoded once per profile.
+    """
+    if broadcaster is None:
+        raise RuntimeError(
+            "camera_service not initialized; call init_app(app) first"
         )
+
+    return iter(AdaptiveStream(broadcaster, width, quality, fps, adapt))
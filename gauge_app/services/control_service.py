@@ -0,0 +1,232 @@
+# gauge_app/services/control_service.py
+"""Server-side joystick channel.
+
+Browsers send `controllerData` as {axes: [x1, y1, x2, y2], t: ms epoch}
+(a bare axes list is still accepted). Only the newest command per
+controller is kept, and a fixed-rate tick publishes each new command
+once. Commands older than `stale_after` are dropped instead of sent.
+
+Binary payload (CONTROL_PAYLOAD='binary'), little-endian, 20 bytes:
+
+    B  version (1)
+    B  controller slot (0-255, stable while the controller is connected)
+    H  sequence number per controller (wraps at 65536)
+    d  server receive time, epoch seconds
+    4h axes scaled to -32767..32767
+
+CONTROL_PAYLOAD='json' publishes the original JSON axes list instead.
+"""
+import json
+import math
+import struct
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+PAYLOAD_VERSION = 1
+COMMAND = struct.Struct('<BBHd4h')
+AXES = 4
+PAYLOADS = ('binary', 'json')
+
+
+def encode_binary(slot, seq, ts, axes):
+    """Pack one command; raises ValueError on a non-finite axis or time."""
+    if not all(math.isfinite(a) for a in axes) or not math.isfinite(ts):
+        raise ValueError(f"non-finite command values: axes={axes!r} ts={ts!r}")
+    scaled = [int(round(max(-1.0, min(1.0, a)) * 32767)) for a in axes]
+    return COMMAND.pack(PAYLOAD_VERSION, slot, seq & 0xFFFF, ts, *scaled)
+
+
+def decode_binary(payload):
+    """Inverse of encode_binary(): (slot, seq, ts, [axes])."""
+    _, slot, seq, ts, *scaled = COMMAND.unpack(payload)
+    return slot, seq, ts, [v / 32767 for v in scaled]
+
+
+def parse_command(data):
+    """(axes, client_ts_seconds or None) from a controllerData event.
+
+    Raises ValueError for NaN/inf axes or times: clamping would turn NaN
+    into full deflection, and a NaN time disables the staleness check.
+    """
+    client_ts = None
+    if isinstance(data, dict):
+        axes = data.get('axes')
+        if data.get('t') is not None:
+            client_ts = float(data['t']) / 1000.0
+            if not math.isfinite(client_ts):
+                raise ValueError(f"non-finite command time {data['t']!r}")
+    else:
+        axes = data
+    axes = [float(a) for a in axes][:AXES]
+    if not all(math.isfinite(a) for a in axes):
+        raise ValueError(f"non-finite axes {axes!r}")
+    axes += [0.0] * (AXES - len(axes))
+    return axes, client_ts
+
+
+class _Controller:
+    __slots__ = ('slot', 'seq', 'axes', 'recv_ts', 'client_ts', 'fresh', 'offset')
+
+    def __init__(self, slot):
+        self.slot = slot
+        self.seq = 0
+        self.axes = None
+        self.recv_ts = 0.0
+        self.client_ts = None
+        self.fresh = False          # received since the last publish
+        self.offset = None          # min(recv - client_ts): clock skew + best transit
+
+
+class ControlChannel:
+    """Latest-command-wins publisher for joystick commands.
+
+    `update()` only stores the command; `publish(payload)` is called from
+    the tick thread at most `tick_hz` times a second per controller.
+    """
+
+    def __init__(self, publish, tick_hz=20.0, stale_after=0.5, payload='binary',
+                 latency_window=1000):
+        if payload not in PAYLOADS:
+            raise ValueError(f"Unknown control payload {payload!r}; use one of {PAYLOADS}")
+        self.publish = publish
+        self.interval = 1.0 / tick_hz
+        self.stale_after = stale_after
+        self.payload = payload
+        self._controllers = {}       # controller id -> _Controller
+        self._lock = threading.Lock()
+        self._running = False
+        # publish - receive (server queueing); publish - client send, valid
+        # when browser and server clocks agree; and the same corrected by
+        # the controller's best observed offset, i.e. delay beyond the
+        # fastest transit, which holds whatever the clock skew
+        self._queue_lat = deque(maxlen=latency_window)
+        self._e2e_lat = deque(maxlen=latency_window)
+        self._excess_lat = deque(maxlen=latency_window)
+        self.counters = {
+            'received': 0,     # commands accepted
+            'coalesced': 0,    # overwritten before a tick published them
+            'stale': 0,        # dropped as too old
+            'reordered': 0,    # arrived after a newer command from the same controller
+            'invalid': 0,      # unparseable events
+            'published': 0,
+            'errors': 0,       # publish failures
+        }
+
+    def _slot(self):
+        used = {c.slot for c in self._controllers.values()}
+        return next(i for i in range(256) if i not in used)
+
+    def update(self, controller_id, data, recv_ts=None):
+        """Store the newest command from `controller_id`; False if invalid."""
+        recv_ts = recv_ts or time.time()
+        try:
+            axes, client_ts = parse_command(data)
+        except (TypeError, ValueError):
+            self.counters['invalid'] += 1
+            return False
+        with self._lock:
+            ctl = self._controllers.get(controller_id)
+            if ctl is None:
+                if len(self._controllers) >= 256:
+                    self.counters['invalid'] += 1
+                    return False
+                ctl = self._controllers[controller_id] = _Controller(self._slot())
+            if client_ts is not None:
+                if ctl.client_ts is not None and client_ts < ctl.client_ts:
+                    self.counters['reordered'] += 1
+                    return False
+                offset = recv_ts - client_ts
+                ctl.offset = offset if ctl.offset is None else min(ctl.offset, offset)
+            if ctl.fresh:
+                self.counters['coalesced'] += 1
+            ctl.axes = axes
+            ctl.recv_ts = recv_ts
+            ctl.client_ts = client_ts
+            ctl.fresh = True
+            self.counters['received'] += 1
+        return True
+
+    def remove(self, controller_id):
+        with self._lock:
+            self._controllers.pop(controller_id, None)
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self._running = False
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while self._running:
+            self.tick()
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
+
+    def _age(self, ctl, now):
+        age = now - ctl.recv_ts
+        if ctl.client_ts is not None and ctl.offset is not None:
+            # time since it left the browser, beyond the best transit seen
+            age = max(age, now - (ctl.client_ts + ctl.offset))
+        return age
+
+    def tick(self):
+        """Publish each controller's new command, if it is still fresh."""
+        now = time.time()
+        due = []
+        with self._lock:
+            for ctl in self._controllers.values():
+                if not ctl.fresh:
+                    continue
+                ctl.fresh = False
+                if self._age(ctl, now) > self.stale_after:
+                    self.counters['stale'] += 1
+                    continue
+                ctl.seq = (ctl.seq + 1) & 0xFFFF
+                due.append((ctl.slot, ctl.seq, ctl.recv_ts, ctl.client_ts,
+                            ctl.offset, ctl.axes))
+
+        for slot, seq, recv_ts, client_ts, offset, axes in due:
+            try:
+                if self.payload == 'binary':
+                    payload = encode_binary(slot, seq, recv_ts, axes)
+                else:
+                    payload = json.dumps(axes, allow_nan=False)
+                self.publish(payload)
+            except Exception as e:
+                self.counters['errors'] += 1
+                print("✗ control publish failed:", e)
+                continue
+            sent = time.time()
+            self.counters['published'] += 1
+            self._queue_lat.append(sent - recv_ts)
+            if client_ts is not None:
+                self._e2e_lat.append(sent - client_ts)
+                self._excess_lat.append(sent - (client_ts + offset))
+
+    @staticmethod
+    def _percentiles(samples):
+        if not samples:
+            return None
+        p50, p95, p99 = np.percentile(np.fromiter(samples, float), (50, 95, 99)) * 1000
+        return {'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'n': len(samples)}
+
+    def stats(self):
+        with self._lock:
+            controllers = len(self._controllers)
+        return dict(self.counters,
+                    controllers=controllers,
+                    tick_hz=1.0 / self.interval,
+                    payload=self.payload,
+                    queue_latency=self._percentiles(list(self._queue_lat)),
+                    e2e_latency=self._percentiles(list(self._e2e_lat)),
+                    excess_latency=self._percentiles(list(self._excess_lat)))
@@ -0,0 +1,137 @@
+# gauge_app/services/gauge_service.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from gauge_app.services import camera_service, mqtt_service
+from gauge_app.utils import metrics
+from gauge_app.utils.gauge_utils import GaugeTracker, read_regular_gauge
+
+# Reader will be set in init_app()
+reader = None
+
+READ_SECONDS = metrics.histogram('gauge_read_seconds', 'Dial read time per frame', ('mode',))
+
+
+class GaugeReader:
+    """Read the dial from the newest camera frame at a fixed rate.
+
+    Each tick takes whatever frame is newest, so a slow read skips frames
+    instead of queueing them and latency stays bounded by one read.
+
+    `read` returns one reading, or {gauge_id: reading} for multi-gauge
+    reads; each gauge is then reported on '<topic>/<gauge_id>'.
+    """
+
+    def __init__(self, broadcaster, rate_hz, topic, on_reading=None,
+                 read=read_regular_gauge, mode='full'):
+        self.broadcaster = broadcaster
+        self.interval = 1.0 / rate_hz
+        self.topic = topic
+        self.on_reading = on_reading
+        self.read = read
+        self._read_seconds = READ_SECONDS.labels(mode=mode)
+        self.last = None            # (ts, value, latency_seconds)
+        self.frames_read = 0
+        self.frames_skipped = 0     # camera frames never looked at
+        self.ticks_missed = 0       # ticks lost because a read overran
+        self._running = False
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self._running = False
+
+    def _run(self):
+        last_seq = None
+        next_tick = time.monotonic()
+        while self._running:
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            seq, frame = self.broadcaster.latest()
+            if frame is not None and seq != last_seq:
+                if last_seq is not None:
+                    self.frames_skipped += max(0, seq - last_seq - 1)
+                last_seq = seq
+                try:
+                    self._read(frame)
+                except Exception as e:
+                    print("✗ gauge read failed:", e)
+
+            # Don't try to catch up on ticks we overran; just drop them
+            next_tick += self.interval
+            now = time.monotonic()
+            if next_tick < now:
+                self.ticks_missed += int((now - next_tick) / self.interval) + 1
+                next_tick = now + self.interval
+
+    def _read(self, frame):
+        ts = time.time()
+        with metrics.timed(self._read_seconds) as timer:
+            value = self.read(frame)
+        latency = timer.elapsed
+        self.frames_read += 1
+        self.last = (ts, value, latency)
+        if not self.on_reading:
+            return
+        if isinstance(value, dict):
+            for gauge_id, reading in value.items():
+                self.on_reading(f"{self.topic}/{gauge_id}", ts, reading, latency)
+        else:
+            self.on_reading(self.topic, ts, value, latency)
+
+    def stats(self):
+        return {
+            'topic': self.topic,
+            'frames_read': self.frames_read,
+            'frames_skipped': self.frames_skipped,
+            'ticks_missed': self.ticks_missed,
+            'last': self.last,
+        }
+
+
+def init_app(app, socketio):
+    """Start the on-device gauge reader (GAUGE_READ_HZ=0 disables it)."""
+    global reader
+    rate = app.config['GAUGE_READ_HZ']
+    if not rate or camera_service.broadcaster is None:
+        return
+    topic = app.config['GAUGE_TOPIC']
+    multi = app.config['GAUGE_MULTI']
+    if not multi:
+        mqtt_service.sensor_history.ensure(topic)
+
+    def on_reading(topic, ts, value, latency):
+        if value is not None:
+            if multi:
+                mqtt_service.sensor_history.ensure(topic)
+            mqtt_service.record_reading(topic, ts, float(value))
+        socketio.emit('gaugeReading', {
+            'topic': topic,
+            'value': value,
+            'time': ts,
+            'latency_ms': round(latency * 1000, 1),
+        })
+
+    refresh = app.config['GAUGE_TRACK_REFRESH']
+    if multi:
+        workers = app.config['GAUGE_READ_WORKERS']
+        executor = ThreadPoolExecutor(workers, thread_name_prefix='gauge') if workers else None
+        # refresh 0 still tracks ids, just with a full scan every read
+        read = partial(GaugeTracker(refresh_every=refresh).read_all, executor=executor)
+        mode = 'multi'
+    elif refresh:
+        read = GaugeTracker(refresh_every=refresh).read
+        mode = 'tracked'
+    else:
+        read = read_regular_gauge
+        mode = 'full'
+    reader = GaugeReader(camera_service.broadcaster, rate, topic, on_reading, read, mode)
+    reader.start()
+    metrics.collect('gauge_reader', reader.stats)
@@ -0,0 +1,150 @@
+# gauge_app/services/ingest_service.py
+import queue
+import threading
+import time
+
+# Backpressure policies for a full queue
+DROP_OLDEST = 'drop_oldest'   # evict the oldest queued message
+BLOCK       = 'block'         # make the producer wait (up to block_timeout)
+SAMPLE      = 'sample'        # past half full, keep only every Nth message
+POLICIES = (DROP_OLDEST, BLOCK, SAMPLE)
+
+
+class _Shard:
+    """One bounded queue and its worker; counters have a single writer each."""
+
+    def __init__(self, maxsize):
+        self.queue = queue.Queue(maxsize)
+        self.enqueued = 0       # written by the producer
+        self.dropped = 0        # written by the producer
+        self.sampled_out = 0    # written by the producer
+        self.offered = 0        # written by the producer
+        self.max_depth = 0      # written by the producer
+        self.processed = 0      # written by the worker
+        self.errors = 0         # written by the worker
+        self.busy_seconds = 0.0  # written by the worker
+
+
+class IngestPipeline:
+    """Bounded hand-off from the MQTT network thread to worker threads.
+
+    `submit()` only enqueues `(topic, payload, recv_ts)`; `handler` runs
+    on a worker. Topics are sharded across workers by hash, so readings
+    of one topic are always handled in arrival order.
+    """
+
+    def __init__(self, handler, workers=2, maxsize=10000, policy=DROP_OLDEST,
+                 sample_every=10, block_timeout=1.0):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown ingest policy {policy!r}; use one of {POLICIES}")
+        self.handler = handler
+        self.policy = policy
+        self.sample_every = max(1, int(sample_every))
+        self.block_timeout = block_timeout
+        per_shard = max(1, maxsize // max(1, workers))
+        self._shards = [_Shard(per_shard) for _ in range(max(1, workers))]
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        for shard in self._shards:
+            threading.Thread(target=self._work, args=(shard,), daemon=True).start()
+
+    def stop(self):
+        """Stop the workers; each finishes the message it is handling.
+
+        The None sentinel wakes an idle worker. A full queue gives up its
+        oldest message (counted as dropped) to make room for it.
+        """
+        self._running = False
+        for shard in self._shards:
+            self._put_dropping_oldest(shard, None)
+
+    @staticmethod
+    def _put_dropping_oldest(shard, item):
+        q = shard.queue
+        while True:
+            try:
+                q.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                    q.task_done()
+                    shard.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def submit(self, topic, payload, recv_ts):
+        """Queue one message; returns False if it was dropped or sampled out."""
+        shard = self._shards[hash(topic) % len(self._shards)]
+        item = (topic, payload, recv_ts)
+        q = shard.queue
+        shard.offered += 1
+
+        if self.policy == SAMPLE and q.qsize() >= q.maxsize // 2 \
+                and shard.offered % self.sample_every:
+            shard.sampled_out += 1
+            return False
+
+        if self.policy == BLOCK:
+            try:
+                q.put(item, timeout=self.block_timeout)
+            except queue.Full:
+                shard.dropped += 1
+                return False
+        elif self.policy == DROP_OLDEST:
+            self._put_dropping_oldest(shard, item)
+        else:
+            try:
+                q.put_nowait(item)
+            except queue.Full:
+                shard.dropped += 1
+                return False
+
+        shard.enqueued += 1
+        depth = q.qsize()
+        if depth > shard.max_depth:
+            shard.max_depth = depth
+        return True
+
+    def _work(self, shard):
+        q = shard.queue
+        while self._running:
+            item = q.get()
+            try:
+                if item is None:
+                    continue
+                started = time.perf_counter()
+                self.handler(*item)
+                shard.busy_seconds += time.perf_counter() - started
+                shard.processed += 1
+            except Exception as e:
+                shard.errors += 1
+                print("✗ ingest handler failed:", e)
+            finally:
+                q.task_done()
+
+    def join(self):
+        """Block until everything queued so far has been handled."""
+        for shard in self._shards:
+            shard.queue.join()
+
+    def stats(self):
+        shards = self._shards
+        return {
+            'policy': self.policy,
+            'workers': len(shards),
+            'capacity': sum(s.queue.maxsize for s in shards),
+            'depth': sum(s.queue.qsize() for s in shards),
+            'shard_depths': [s.queue.qsize() for s in shards],
+            'max_depth': max(s.max_depth for s in shards),
+            'enqueued': sum(s.enqueued for s in shards),
+            'processed': sum(s.processed for s in shards),
+            'dropped': sum(s.dropped for s in shards),
+            'sampled_out': sum(s.sampled_out for s in shards),
+            'errors': sum(s.errors for s in shards),
+            'busy_seconds': sum(s.busy_seconds for s in shards),
+        }
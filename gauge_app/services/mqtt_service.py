@@ -1,27 +1,127 @@
 # gauge_app/services/mqtt_service.py
 import paho.mqtt.client as mqtt
 import json
+import time
 
-from datetime import datetime
+from flask import request
+from flask_socketio import join_room, leave_room
 from gauge_app.config import Config
+from gauge_app.utils import metrics
+from gauge_app.utils.timeseries import TimeSeriesStore
+from gauge_app.utils.running_stats import SensorAggregator
+from gauge_app.utils.segment_store import SegmentStore
+from gauge_app.services.sensor_emitter import CoalescingEmitter, BROADCAST_ROOM
+from gauge_app.services.anomaly_service import AnomalyDetector, default_rules
+from gauge_app.services.ingest_service import IngestPipeline
+from gauge_app.services.control_service import ControlChannel
+from gauge_app.services import sync_service
 
 # In-memory stores
-sensor_history = { t: [] for t in Config.THRESHOLDS }   # list of (timestamp, float_value)
-anomaly_log    = []  # list of dicts: {'topic','value','time'}
+sensor_history = TimeSeriesStore(
+    Config.THRESHOLDS,
+    capacity=Config.HISTORY_CAPACITY,
+    max_age=Config.HISTORY_MAX_AGE or None
+)                    # topic -> RingBuffer of (epoch_seconds, float_value)
+sensor_stats   = SensorAggregator(windows=(60, 3600))   # running + 1 min / 1 h rollups
+anomaly_log    = []  # list of dicts: {'id','topic','value','ts','time','rule','severity','detail'}
 
 
 mqtt_client       = mqtt.Client()
 socketio_instance = None
+sensor_emitter    = None
+history_store     = None   # on-disk SegmentStore, set in init_app()
+anomaly_detector  = None
+ingest_pipeline   = None   # bounded queue + workers between paho and process_message
+control_channel   = None   # latest joystick command per controller, published per tick
+sync_settings     = {}     # sparkline window/points and anomaly limit for connect sync
 
-def init_app(app, socketio):
-    global socketio_instance
+MESSAGES        = metrics.counter('mqtt_messages_total', 'MQTT messages processed', ('topic',))
+PROCESS_SECONDS = metrics.histogram('mqtt_process_seconds', 'process_message() time', ('topic',))
+INGEST_DELAY    = metrics.histogram('mqtt_ingest_delay_seconds',
+                                    'Time from paho receive to processing start')
+_topic_metrics  = {}  # topic -> (message counter, latency histogram) label children
+
+def init_app(app, socketio, connect=True):
+    """Start the ingest, history, anomaly and emit pipeline.
+
+    With `connect=False` nothing talks to the broker; messages can be fed
+    to on_mqtt_message() directly (benchmarks, replays).
+    """
+    global socketio_instance, sensor_emitter, history_store, anomaly_detector
+    global ingest_pipeline, control_channel, sync_settings
     socketio_instance = socketio
 
+    # micro-batched anomaly rules, evaluated off the MQTT thread
+    anomaly_detector = AnomalyDetector(
+        default_rules(app.config), anomaly_log,
+        interval=app.config['ANOMALY_BATCH_INTERVAL'],
+        context=max(120, app.config['ANOMALY_STUCK_SAMPLES'],
+                    app.config['ANOMALY_ZSCORE_WINDOW']),
+        on_events=_emit_anomalies,
+        max_log=app.config['ANOMALY_LOG_MAX']
+    )
+    anomaly_detector.start()
+
+    # persistent history; reload the in-memory window from it
+    history_store = SegmentStore(
+        app.config['HISTORY_DIR'],
+        max_rows=app.config['HISTORY_SEGMENT_ROWS'],
+        max_seconds=app.config['HISTORY_SEGMENT_SECONDS'],
+        retention=app.config['HISTORY_RETENTION_DAYS'] * 86400,
+        compact_interval=app.config['HISTORY_COMPACT_INTERVAL']
+    )
+    warm_history(app.config['HISTORY_MAX_AGE'] or None)
+    history_store.start()
+
+    # batched, rate-limited fan-out to Socket.IO clients; recent batches
+    # are kept so reconnecting clients get only what they missed
+    rate_hz = app.config['SENSOR_EMIT_HZ']
+    sensor_emitter = CoalescingEmitter(
+        socketio, rate_hz=rate_hz,
+        backlog=max(1, int(app.config['SYNC_BACKLOG_SECONDS'] * rate_hz))
+    )
+    sensor_emitter.start()
+    sync_settings = {
+        'sparkline_seconds': app.config['SYNC_SPARKLINE_SECONDS'],
+        'sparkline_points': app.config['SYNC_SPARKLINE_POINTS'],
+        'max_anomalies': app.config['SYNC_MAX_ANOMALIES'],
+    }
+
     broker        = app.config['MQTT_BROKER']
     port          = app.config['MQTT_PORT']
     topics        = app.config['MQTT_TOPICS']
     controller_to = app.config['CONTROLLER_TOPIC']
 
+    # keep the paho network thread down to an enqueue per message
+    ingest_pipeline = IngestPipeline(
+        process_message,
+        workers=app.config['INGEST_WORKERS'],
+        maxsize=app.config['INGEST_QUEUE_SIZE'],
+        policy=app.config['INGEST_POLICY'],
+        sample_every=app.config['INGEST_SAMPLE_EVERY']
+    )
+    ingest_pipeline.start()
+
+    if connect:
+        connect_broker(broker, port, topics)
+
+    # joystick commands: last value wins, published at a fixed tick
+    control_channel = ControlChannel(
+        lambda payload: mqtt_client.publish(controller_to, payload, qos=0),
+        tick_hz=app.config['CONTROL_TICK_HZ'],
+        stale_after=app.config['CONTROL_STALE_MS'] / 1000.0,
+        payload=app.config['CONTROL_PAYLOAD']
+    )
+    control_channel.start()
+
+    metrics.collect('ingest', ingest_pipeline.stats)
+    metrics.collect('sensor_emitter', sensor_emitter.stats)
+    metrics.collect('control', control_channel.stats)
+    metrics.collect('anomalies', lambda: {'logged': len(anomaly_log)})
+
+    register_socketio_handlers(socketio, app.config['SENSOR_CLIENT_MAX_HZ'])
+
+def connect_broker(broker, port, topics):
     # register callbacks
     mqtt_client.on_connect = lambda client, u, f, rc: on_mqtt_connect(client, u, f, rc, topics)
     mqtt_client.on_message = on_mqtt_message
@@ -30,7 +130,14 @@ def init_app(app, socketio):
     mqtt_client.connect(broker, port, keepalive=60)
     mqtt_client.loop_start()                 # <-- only this, no loop_forever
 
-    register_socketio_handlers(socketio, controller_to)
+def shutdown():
+    """Stop the background workers started by init_app()."""
+    mqtt_client.loop_stop()
+    for worker in (control_channel, sensor_emitter, ingest_pipeline, anomaly_detector):
+        if worker is not None:
+            worker.stop()
+    if history_store is not None:
+        history_store.close()
 
 def on_mqtt_connect(client, userdata, flags, rc, topics):
     if rc == 0:
@@ -41,64 +148,50 @@ def on_mqtt_connect(client, userdata, flags, rc, topics):
     else:
         print(f"✗ MQTT connect failed (rc={rc})")
 
-# gauge_app/routes/anomalies.py
-from flask import Blueprint, send_file
-import io, statistics
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from gauge_app.services.mqtt_service import sensor_history, anomaly_log
-
-bp = Blueprint('anomalies', __name__)
-
-@bp.route('/anomalies/pdf')
-def anomalies_pdf():
-    buf = io.BytesIO()
-    p   = canvas.Canvas(buf, pagesize=letter)
-    width, height = letter
-
-    # Title
-    p.setFont("Helvetica-Bold", 16)
-    p.drawString(50, height - 50, "Anomaly Log Summary")
-
-    # Summary: for each topic, avg & peak
-    y = height - 80
-    p.setFont("Helvetica", 12)
-    for topic, readings in sensor_history.items():
-        if not readings: continue
-        values = [v for (_, v) in readings]
-        avg    = statistics.mean(values)
-        peak   = max(values)
-        trough = min(values)
-        p.drawString(50, y, f"{topic}: avg={avg:.1f}, peak={peak}, low={trough}")
-        y -= 20
-
-    # Detailed anomalies
-    y -= 10
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(50, y, "Anomalies:")
-    y -= 20
-    p.setFont("Helvetica", 10)
-    for entry in anomaly_log[-50:]:   # last 50
-        time_str = entry['time'].strftime("%Y-%m-%d %H:%M:%S")
-        p.drawString(60, y,
-            f"{time_str} | {entry['topic']} = {entry['value']}"
-        )
-        y -= 15
-        if y < 50:
-            p.showPage()
-            y = height - 50
-
-    p.save()
-    buf.seek(0)
-    return send_file(
-        buf,
-        as_attachment=True,
-        download_name="anomaly_log.pdf",
-        mimetype="application/pdf"
-    )
+def warm_history(max_age=None):
+    """Load recent readings from history_store into memory."""
+    start = time.time() - max_age if max_age else None
+    for topic in history_store.topics():
+        if topic not in sensor_history:
+            continue
+        ts, vals = history_store.query(topic, start)
+        sensor_history[topic].extend(ts, vals)
+        for t, v in zip(ts.tolist(), vals.tolist()):
+            sensor_stats.update(topic, t, v)
+        if len(ts):
+            print(f"  • Warmed {len(ts)} readings for {topic}")
+
+def _as_number(data):
+    """Return `data` as a float if it is a plain number, else None."""
+    if isinstance(data, bool) or not isinstance(data, (int, float)):
+        return None
+    return float(data)
+
 def on_mqtt_message(client, userdata, msg):
-    topic   = msg.topic
-    payload = msg.payload.decode('utf-8', errors='ignore')
+    """Paho callback: hand the raw message to the ingest workers."""
+    recv_ts = time.time()
+    if ingest_pipeline:
+        ingest_pipeline.submit(msg.topic, msg.payload, recv_ts)
+    else:
+        process_message(msg.topic, msg.payload, recv_ts)
+
+def _metrics_for(topic):
+    children = _topic_metrics.get(topic)
+    if children is None:
+        children = _topic_metrics.setdefault(
+            topic, (MESSAGES.labels(topic=topic), PROCESS_SECONDS.labels(topic=topic)))
+    return children
+
+def process_message(topic, payload, recv_ts):
+    """Parse one MQTT payload, record it and queue it for clients."""
+    INGEST_DELAY.observe(max(0.0, time.time() - recv_ts))
+    messages, seconds = _metrics_for(topic)
+    messages.inc()
+    with metrics.timed(seconds):
+        _process(topic, payload, recv_ts)
+
+def _process(topic, payload, recv_ts):
+    payload = payload.decode('utf-8', errors='ignore')
     try:
         data = float(payload)
     except ValueError:
@@ -107,30 +200,99 @@ def on_mqtt_message(client, userdata, msg):
         except Exception:
             return
 
-    now = datetime.now()
+    value = _as_number(data)
+
+    # record it (only numeric readings go into the history arrays)
+    if topic in sensor_history and value is not None:
+        record_reading(topic, recv_ts, value)
+
+    # queue for the next batched push to Socket.IO clients
+    if sensor_emitter:
+        sensor_emitter.push(topic, data)
+
+def record_reading(topic, ts, value):
+    """Store a numeric reading everywhere history is kept and check it."""
+    sensor_history.append(topic, ts, value)
+    sensor_stats.update(topic, ts, value)
+    if history_store:
+        history_store.append(topic, ts, value)
+    if anomaly_detector:
+        anomaly_detector.submit(topic, ts, value)
+
+
+def anomaly_json(event):
+    """JSON-safe view of an anomaly_log entry."""
+    return {k: v for k, v in event.items() if k != 'time'}
 
-    # record it
-    if topic in sensor_history:
-        sensor_history[topic].append((now, data))
-        thresh = Config.THRESHOLDS.get(topic, {})
-        low, high = thresh.get('low'), thresh.get('high')
-        if low is not None and (data < low or data > high):
-            anomaly_log.append({'topic': topic, 'value': data, 'time': now})
+def acknowledge_anomalies(ids=(), up_to=None):
+    """Mark anomaly_log events acknowledged, by id or every id <= `up_to`;
+    returns the ids newly acknowledged."""
+    ids = set(ids)
+    acked = []
+    for event in list(anomaly_log):
+        if event.get('acknowledged'):
+            continue
+        if event['id'] in ids or (up_to is not None and event['id'] <= up_to):
+            event['acknowledged'] = True
+            acked.append(event['id'])
+    return acked
 
-    # push to any Socket.IO clients
+def snapshot():
+    """The dashboard state a new client is sent on connect."""
+    with sensor_emitter.sync_lock:
+        return sync_service.snapshot(sensor_emitter, sensor_history, anomaly_log, sync_settings)
+
+def _emit_anomalies(events):
     if socketio_instance:
-        socketio_instance.emit('sensorData', {'topic': topic, 'data': data})
+        socketio_instance.emit('anomalies', [anomaly_json(e) for e in events])
 
+def _apply_client_rate(max_hz):
+    """Move the current client between the shared room and its own throttle."""
+    if sensor_emitter.set_client_rate(request.sid, max_hz):
+        leave_room(BROADCAST_ROOM)
+    else:
+        join_room(BROADCAST_ROOM)
 
-def register_socketio_handlers(socketio, controller_to):
+def register_socketio_handlers(socketio, client_max_hz=None):
     @socketio.on('connect')
-    def handle_connect():
+    def handle_connect(auth=None):
         print("→ Client connected")
+        # send the current state (or what a reconnecting client missed)
+        # before it starts receiving batches, with no flush in between
+        with sensor_emitter.sync_lock:
+            event, payload = sync_service.sync_payload(
+                sensor_emitter, sensor_history, anomaly_log, auth, sync_settings)
+            socketio.emit(event, payload, to=request.sid)
+            _apply_client_rate(client_max_hz)
+
+    @socketio.on('ackAnomalies')
+    def handle_ack(data):
+        data = data if isinstance(data, dict) else {}
+        try:
+            ids = [int(i) for i in data.get('ids') or ()]
+            up_to = int(data['upTo']) if data.get('upTo') is not None else None
+        except (TypeError, ValueError):
+            return
+        acked = acknowledge_anomalies(ids, up_to)
+        if acked:
+            socketio.emit('anomaliesAcked', {'ids': acked})
+
+    @socketio.on('setSensorRate')
+    def handle_sensor_rate(data):
+        try:
+            hz = float((data or {}).get('hz'))
+        except (TypeError, ValueError, AttributeError):
+            return
+        if client_max_hz:
+            hz = min(hz, client_max_hz)
+        _apply_client_rate(hz)
 
     @socketio.on('controllerData')
     def handle_controller(data):
-        mqtt_client.publish(controller_to, json.dumps(data))
+        control_channel.update(request.sid, data)
 
     @socketio.on('disconnect')
     def handle_disconnect():
         print("← Client disconnected")
+        sensor_emitter.remove_client(request.sid)
+        control_channel.remove(request.sid)
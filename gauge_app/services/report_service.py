@@ -0,0 +1,514 @@
+# gauge_app/services/report_service.py
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import (
+    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
+    PageBreak, KeepTogether, Image as PlatypusImage
+)
+
+from gauge_app.services.mqtt_service import sensor_history, sensor_stats, anomaly_log
+from gauge_app.services import screenshot_service
+from gauge_app.utils import metrics
+from gauge_app.utils.jobs import JobRegistry
+
+# Define modern color scheme
+BRAND_COLOR = colors.HexColor("#1E88E5")  # Modern blue
+ACCENT_COLOR = colors.HexColor("#FFC107")  # Complementary amber
+BG_LIGHT = colors.HexColor("#F5F5F5")     # Light gray background
+TEXT_COLOR = colors.HexColor("#212121")   # Dark gray for text
+DIVIDER_COLOR = colors.HexColor("#BDBDBD")  # Medium gray for dividers
+
+def setup_styles():
+    """Create custom styles for the document"""
+    styles = getSampleStyleSheet()
+    
+    # Custom heading style
+    styles.add(ParagraphStyle(
+        name='ModernHeading',
+        fontName='Helvetica-Bold',
+        fontSize=14,
+        textColor=BRAND_COLOR,
+        spaceAfter=12,
+        spaceBefore=16,
+        leading=16
+    ))
+    
+    # Custom normal text style
+    styles.add(ParagraphStyle(
+        name='ModernBody',
+        fontName='Helvetica',
+        fontSize=10,
+        textColor=TEXT_COLOR,
+        spaceAfter=6,
+        leading=12
+    ))
+    
+    return styles
+
+def _header_footer(canvas, doc, logo_path=None):
+    """Combined header and footer function"""
+    # Save the canvas state
+    canvas.saveState()
+    
+    # Header section
+    # Logo
+    if logo_path and os.path.exists(logo_path):
+        canvas.drawImage(logo_path, 
+                        doc.leftMargin, 
+                        doc.height + doc.topMargin - 0.75*inch,
+                        width=0.75*inch, 
+                        height=0.75*inch, 
+                        preserveAspectRatio=True)
+    
+    # Title
+    canvas.setFont("Helvetica-Bold", 18)
+    canvas.setFillColor(BRAND_COLOR)
+    canvas.drawString(doc.leftMargin + 1.0*inch,
+                    doc.height + doc.topMargin - 0.5*inch,
+                    "Anomaly Log Summary")
+    
+    # Subtitle with current date
+    canvas.setFont("Helvetica", 10)
+    canvas.setFillColor(TEXT_COLOR)
+    current_date = datetime.now().strftime("%B %d, %Y")
+    canvas.drawString(doc.leftMargin + 1.0*inch,
+                    doc.height + doc.topMargin - 0.7*inch,
+                    f"Generated on {current_date}")
+    
+    # Decorative header line
+    canvas.setStrokeColor(BRAND_COLOR)
+    canvas.setLineWidth(2)
+    canvas.line(doc.leftMargin,
+              doc.height + doc.topMargin - 0.9*inch,
+              doc.leftMargin + doc.width,
+              doc.height + doc.topMargin - 0.9*inch)
+    
+    # Footer section
+    page_no = canvas.getPageNumber()
+    canvas.setFont('Helvetica', 9)
+    canvas.setFillColor(TEXT_COLOR)
+    
+    # Page number
+    canvas.drawRightString(doc.leftMargin + doc.width,
+                         doc.bottomMargin - 20,
+                         f"Page {page_no}")
+    
+    # Company info or document ID in footer
+    canvas.setFont('Helvetica', 8)
+    canvas.setFillColor(colors.gray)
+    canvas.drawString(doc.leftMargin,
+                    doc.bottomMargin - 20,
+                    "Confidential | Sensor Monitoring System")
+    
+    # Footer line
+    canvas.setStrokeColor(DIVIDER_COLOR)
+    canvas.setLineWidth(0.5)
+    canvas.line(doc.leftMargin,
+              doc.bottomMargin - 10,
+              doc.leftMargin + doc.width,
+              doc.bottomMargin - 10)
+    
+    # Restore the canvas state
+    canvas.restoreState()
+
+def create_summary_table(data):
+    """Create a well-styled summary table"""
+    col_widths = [2.4*inch, 1.5*inch, 1.5*inch, 1.5*inch]
+    
+    # Apply alternating row colors safely
+    row_styles = []
+    for i in range(1, len(data)):
+        if i % 2 == 0:  # Even rows get background color
+            row_styles.append(('BACKGROUND', (0,i), (-1,i), BG_LIGHT))
+    
+    tbl = Table(data, colWidths=col_widths, hAlign='LEFT')
+    
+    # Modern table styling
+    tbl.setStyle(TableStyle([
+        # Header row styling
+        ('BACKGROUND', (0,0), (-1,0), BRAND_COLOR),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,0), 10),
+        ('BOTTOMPADDING', (0,0), (-1,0), 8),
+        ('TOPPADDING', (0,0), (-1,0), 8),
+        
+        # Base background for all non-header rows
+        ('BACKGROUND', (0,1), (-1,-1), colors.white),
+        
+        # Apply alternating row styling dynamically to avoid index errors
+        # This is safer than hard-coding specific row indices
+        
+        # Cell padding for all cells
+        ('TOPPADDING', (0,1), (-1,-1), 6),
+        ('BOTTOMPADDING', (0,1), (-1,-1), 6),
+        
+        # Text alignment
+        ('ALIGN', (1,1), (-1,-1), 'RIGHT'),  # Numeric columns aligned right
+        ('ALIGN', (0,0), (0,-1), 'LEFT'),    # First column aligned left
+        
+        # Grid styling - subtle lines
+        ('GRID', (0,0), (-1,-1), 0.25, DIVIDER_COLOR),
+        
+        # Value formatting
+        ('FONTNAME', (0,1), (-1,-1), 'Helvetica'),
+        ('FONTSIZE', (0,1), (-1,-1), 9),
+    ]))
+    
+    return tbl
+
+def create_anomaly_table(data, severities=()):
+    """Create a well-styled anomaly details table
+
+    `severities` holds one entry per data row (after the header).
+    """
+    col_widths = [1.6*inch, 1.8*inch, 1.1*inch, 2.4*inch]
+    
+    tbl = Table(data, colWidths=col_widths, hAlign='LEFT')
+    
+    # Row styling logic for anomaly severities
+    row_styles = []
+    for i, severity in enumerate(severities, start=1):
+        if severity == 'critical':
+            row_styles.append(('BACKGROUND', (0,i), (-1,i), colors.HexColor('#FFEBEE')))  # Light red for critical
+            row_styles.append(('TEXTCOLOR', (2,i), (2,i), colors.HexColor('#D32F2F')))    # Red text for value
+        elif severity == 'warning':
+            row_styles.append(('BACKGROUND', (0,i), (-1,i), colors.HexColor('#FFF8E1')))  # Light amber for warnings
+    
+    # Modern table styling
+    style_commands = [
+        # Header row styling
+        ('BACKGROUND', (0,0), (-1,0), BRAND_COLOR),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,0), 10),
+        ('BOTTOMPADDING', (0,0), (-1,0), 8),
+        ('TOPPADDING', (0,0), (-1,0), 8),
+        
+        # Default row styling
+        ('BACKGROUND', (0,1), (-1,-1), colors.white),
+    ]
+    
+    # Add the calculated row styles
+    style_commands.extend(row_styles)
+    
+    # Apply all styling
+    tbl.setStyle(TableStyle(style_commands + [
+        # Cell padding
+        ('TOPPADDING', (0,1), (-1,-1), 4),
+        ('BOTTOMPADDING', (0,1), (-1,-1), 4),
+        
+        # Text alignment
+        ('ALIGN', (2,1), (2,-1), 'RIGHT'),  # Value column aligned right
+        ('ALIGN', (0,1), (1,-1), 'LEFT'),   # Time and topic left aligned
+        
+        # Grid styling - subtle lines
+        ('GRID', (0,0), (-1,-1), 0.15, DIVIDER_COLOR),
+        
+        # Value formatting
+        ('FONTNAME', (0,1), (-1,-1), 'Helvetica'),
+        ('FONTSIZE', (0,1), (-1,-1), 9),
+    ]))
+    
+    return tbl
+
+def render_report(snapshot):
+    """Render a report snapshot (plain data, see build_snapshot) to PDF bytes.
+
+    Runs in a worker process, so it must not touch app or service state.
+    """
+    # Create buffer for PDF data
+    buf = io.BytesIO()
+    
+    # Configure document with proper margins
+    doc = SimpleDocTemplate(
+        buf,
+        pagesize=letter,
+        leftMargin=0.75*inch, 
+        rightMargin=0.75*inch,
+        topMargin=1.25*inch, 
+        bottomMargin=0.75*inch
+    )
+    
+    # Get custom styles
+    styles = setup_styles()
+    
+    # List to hold all elements
+    elements = []
+    
+    # --- Add introduction section ---
+    intro_text = """."""
+    elements.append(Paragraph(intro_text, styles['ModernBody']))
+    elements.append(Spacer(1, 0.3*inch))
+    
+    # --- Summary Table Section ---
+    elements.append(Paragraph("Sensor Reading Summary", styles['ModernHeading']))
+    
+    # Create summary table data
+    summary_data = [["Sensor Topic", "Average", "Peak", "Low"]]
+    for topic, stats in snapshot['summary']:
+        summary_data.append([
+            topic,
+            f"{stats['mean']:.2f}",
+            f"{stats['max']:.2f}",
+            f"{stats['min']:.2f}"
+        ])
+    
+    # Handle empty data case
+    if len(summary_data) <= 1:
+        summary_data.append(["No sensor data available", "", "", ""])
+    
+    # Create and add the table
+    summary_table = create_summary_table(summary_data)
+    elements.append(KeepTogether([summary_table]))
+    elements.append(Spacer(1, 0.4*inch))
+    
+    # --- Detailed Anomalies Section ---
+    elements.append(Paragraph("Recent Anomalies", styles['ModernHeading']))
+    
+    # Add explanatory text
+    anomaly_intro = "Values highlighted in red indicate anomalies that require immediate attention"
+    elements.append(Paragraph(anomaly_intro, styles['ModernBody']))
+    elements.append(Spacer(1, 0.2*inch))
+    
+    # Create anomaly table data
+    detail_data = [["Time", "Sensor Topic", "Value", "Rule"]]
+    severities = []
+    
+    # The 50 most recent anomalies (in reverse chronological order)
+    for e in snapshot['anomalies']:
+        detail_data.append([
+            e['time'].strftime("%Y-%m-%d %H:%M:%S"),
+            e['topic'],
+            f"{e['value']:.2f}" if isinstance(e['value'], (float, int)) else f"{e['value']}",
+            f"{e.get('rule', '')} {e.get('detail', '')}".strip()
+        ])
+        severities.append(e.get('severity'))
+    
+    # Handle empty data case
+    if len(detail_data) <= 1:
+        detail_data.append(["No anomalies detected", "", "", ""])
+    
+    # Create and add the table
+    anomaly_table = create_anomaly_table(detail_data, severities)
+    elements.append(anomaly_table)
+    
+    if snapshot['screenshots']:
+        elements.append(PageBreak())
+        elements.append(Paragraph("." \
+        "Inspection results", styles['ModernHeading']))
+        elements.append(Spacer(1, 0.2*inch))
+        # full images are streamed from disk by path, thumbnails from memory
+        width = 4*inch if snapshot['image_mode'] == 'full' else 2*inch
+        for shot in snapshot['screenshots']:
+            image = shot['image']
+            if isinstance(image, str) and not os.path.exists(image):
+                image = None   # evicted since the snapshot was taken
+            if image:
+                src = image if isinstance(image, str) else io.BytesIO(image)
+                # scale image to fit, keeping its aspect ratio
+                aspect = shot['height'] / shot['width'] if shot['width'] else 0.75
+                elements.append(PlatypusImage(src, width=width, height=width*aspect))
+            else:
+                elements.append(Paragraph("(image no longer retained)", styles['ModernBody']))
+            elements.append(Spacer(1, 0.1*inch))
+            elements.append(Paragraph(
+                f"<b>{shot['time'].strftime('%Y-%m-%d %H:%M:%S')}</b>: {shot['response']}",
+                styles['ModernBody']
+            ))
+            elements.append(Spacer(1, 0.3*inch))
+
+    # Build the document with header and footer
+    header_footer = partial(_header_footer, logo_path=snapshot['logo_path'])
+    doc.build(elements,
+              onFirstPage=header_footer,
+              onLaterPages=header_footer)
+    
+    return buf.getvalue()
+
+
+# --- Background report jobs ---
+
+_executor = None
+_jobs = JobRegistry()
+_cache = OrderedDict()          # data key -> PDF bytes, most recent last
+_cache_lock = threading.Lock()
+_cache_size = 8
+_socketio = None
+
+RENDER_SECONDS = metrics.histogram('report_render_seconds',
+                                   'render_report() time in the worker process')
+JOB_SECONDS = metrics.histogram('report_job_seconds',
+                                'Report request to PDF ready, including queueing')
+REQUESTS = metrics.counter('report_requests_total', 'Report requests by outcome', ('outcome',))
+
+
+def _mp_context():
+    # Not fork: the pool starts workers on demand, long after the camera,
+    # MQTT and Socket.IO threads are running, and a forked child can
+    # inherit their locks mid-operation. forkserver children come from a
+    # clean server process with this module (and reportlab) preloaded;
+    # spawn is the fallback. Both import the main script again, so the
+    # launchers (run.py, gauge_app/app.py) only build the app and start
+    # services from main(), never at import time.
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('forkserver')
+        ctx.set_forkserver_preload([__name__])
+        return ctx
+    return multiprocessing.get_context('spawn')
+
+
+IMAGE_MODES = ('thumb', 'full', 'none')
+_image_mode = 'thumb'
+
+
+def init_app(app, socketio=None):
+    """Create the render process pool and result cache."""
+    global _executor, _jobs, _cache_size, _socketio, _image_mode
+    _socketio = socketio
+    _cache_size = app.config['REPORT_CACHE_SIZE']
+    _image_mode = app.config['REPORT_SCREENSHOTS']
+    _jobs = JobRegistry(ttl=app.config['REPORT_JOB_TTL'])
+    _executor = ProcessPoolExecutor(
+        max_workers=app.config['REPORT_WORKERS'],
+        mp_context=_mp_context()
+    )
+    metrics.collect('report', lambda: {'jobs_active': _jobs.active_count(),
+                                       'cached_pdfs': len(_cache)})
+
+
+def _screenshots():
+    history = screenshot_service.screenshot_history
+    return history.snapshot() if history is not None else []
+
+
+def data_key(image_mode):
+    """Hash of what the report covers; unchanged data gives the same key."""
+    parts = [(t, s['count'], s['last_time'])
+             for t, s in sorted(sensor_stats.summaries().items())]
+    parts.append(('anomalies', len(anomaly_log),
+                  anomaly_log[-1]['time'] if anomaly_log else None))
+    shots = _screenshots()
+    parts.append(('screenshots', image_mode, len(shots),
+                  shots[-1]['digest'] if shots else None))
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def build_snapshot(static_folder, image_mode):
+    """Copy everything the report needs into plain, picklable data.
+
+    Screenshots carry a thumbnail (bytes) or the full image's path,
+    depending on `image_mode`; full images are never loaded here.
+    """
+    summary = []
+    for topic in sensor_history:
+        stats = sensor_stats.summary(topic)
+        if stats:
+            summary.append((topic, stats))
+    screenshots = []
+    if image_mode != 'none':
+        for shot in _screenshots():
+            screenshots.append({
+                'time': shot['time'],
+                'response': shot['response'],
+                'width': shot['width'],
+                'height': shot['height'],
+                'image': shot['path'] if image_mode == 'full' else shot['thumb'],
+            })
+    return {
+        'logo_path': os.path.join(static_folder, 'images', 'logo.png'),
+        'summary': summary,
+        'anomalies': sorted(anomaly_log[-50:], key=lambda x: x['time'], reverse=True),
+        'image_mode': image_mode,
+        'screenshots': screenshots,
+    }
+
+
+def _cache_get(key):
+    with _cache_lock:
+        pdf = _cache.get(key)
+        if pdf is not None:
+            _cache.move_to_end(key)
+        return pdf
+
+
+def _cache_put(key, pdf):
+    with _cache_lock:
+        _cache[key] = pdf
+        _cache.move_to_end(key)
+        while len(_cache) > _cache_size:
+            _cache.popitem(last=False)
+
+
+def request_report(static_folder, image_mode=None):
+    """Return a job for the current data, starting a render only if needed.
+
+    A cached PDF for unchanged data finishes the job immediately; a render
+    already in flight for the same data is shared. `image_mode` is one of
+    IMAGE_MODES and defaults to REPORT_SCREENSHOTS.
+    """
+    if _executor is None:
+        raise RuntimeError("report_service not initialized; call init_app(app) first")
+    image_mode = image_mode or _image_mode
+    if image_mode not in IMAGE_MODES:
+        raise ValueError(f"Unknown image mode {image_mode!r}; use one of {IMAGE_MODES}")
+
+    key = data_key(image_mode)
+    job, created = _jobs.create(key)
+    if not created:
+        REQUESTS.inc(outcome='shared')
+        return job
+
+    pdf = _cache_get(key)
+    if pdf is not None:
+        REQUESTS.inc(outcome='cached')
+        _jobs.finish(job, pdf)
+        return job
+
+    REQUESTS.inc(outcome='rendered')
+    _jobs.start(job)
+    future = _executor.submit(_timed_render, build_snapshot(static_folder, image_mode))
+    future.add_done_callback(partial(_on_rendered, job, time.perf_counter()))
+    return job
+
+
+def _timed_render(snapshot):
+    """render_report() plus its duration, measured inside the worker.
+
+    The worker process has its own copy of the registry, so the seconds
+    travel back with the PDF and _on_rendered() observes them here.
+    """
+    with metrics.timed(RENDER_SECONDS) as timer:
+        pdf = render_report(snapshot)
+    return pdf, timer.elapsed
+
+
+def _on_rendered(job, submitted, future):
+    try:
+        pdf, seconds = future.result()
+    except Exception as e:
+        _jobs.fail(job, e)
+    else:
+        RENDER_SECONDS.observe(seconds)
+        JOB_SECONDS.observe(time.perf_counter() - submitted)
+        _cache_put(job.key, pdf)
+        _jobs.finish(job, pdf)
+    if _socketio:
+        _socketio.emit('reportReady', job.as_dict())
+
+
+def get_job(job_id):
+    return _jobs.get(job_id)
@@ -1,5 +1,257 @@
 # gauge_app/services/screenshot_service.py
+import base64
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 
-# List of dicts: {'time': datetime, 'image_bytes': bytes, 'response': str}
-screenshot_history = []
+import cv2
+
+from gauge_app.utils import metrics
+from gauge_app.utils.jobs import JobRegistry
+from gauge_app.utils.phash import PerceptualCache, hamming, phash
+from gauge_app.utils.preprocess import PROFILES, borrow_preprocessor
+from gauge_app.utils.screenshot_store import ScreenshotStore
+
+# ScreenshotStore of {'time', 'response', 'path', 'thumb', ...}; set in init_app()
+screenshot_history = None
+# Answers for recently described views; set in init_app()
+answer_cache = None
+# Vision client with describe(jpeg_bytes) -> str; set in init_app()
+vision = None
+
+_executor = None
+_jobs = None
+_socketio = None
+_max_pending = 4
+_profile = 'default'
+# held across find/count/create so concurrent requests can't both submit
+_inflight_lock = threading.Lock()
+
+VISION_SECONDS = metrics.histogram('vision_call_seconds', 'Vision client describe() time',
+                                   ('client', 'result'))
+PREPARE_SECONDS = metrics.histogram('screenshot_prepare_seconds',
+                                    'Preprocess, encode and hash time per request')
+
+SYSTEM_PROMPT = (
+    "You are a remote-operated humanoid. "
+    "Describe this enhanced image in one sentence, prioritizing any analog and digital meters you see. "
+    "If you see a meter, say: “Meter: <value>/<scale>. Other: <list>.” "
+    "If you don't see a meter, say: “No meters found. Objects: <LIST THE OBJECTS YOU SEE>.”"
+)
+
+
+class OpenAIVision:
+    """Describe images with GPT-4o-mini."""
+
+    def __init__(self, api_key, model='gpt-4o-mini'):
+        import openai
+        self._openai = openai
+        self.api_key = api_key
+        self.model = model
+
+    def describe(self, jpeg_bytes):
+        img_b64 = base64.b64encode(jpeg_bytes).decode('utf-8')
+        md_img = f"![meter](data:image/jpeg;base64,{img_b64})"
+
+        self._openai.api_key = self.api_key
+        resp = self._openai.ChatCompletion.create(
+            model=self.model,
+            messages=[
+                {'role': 'system', 'content': SYSTEM_PROMPT},
+                {'role': 'user', 'content': md_img}
+            ]
+        )
+        return resp.choices[0].message.content.strip()
+
+
+class StubVision:
+    """Offline stand-in for OpenAIVision: a canned answer after `delay` s.
+
+    Counts calls so coalescing and caching can be checked without
+    network access or an API key.
+    """
+
+    def __init__(self, answer="No meters found. Objects: stub.", delay=0.0):
+        self.answer = answer
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def describe(self, jpeg_bytes):
+        with self._lock:
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return self.answer
+
+
+def init_app(app, socketio=None, client=None):
+    """Create the screenshot store, answer cache, vision client and
+    inspection worker pool.
+
+    `client` overrides the SCREENSHOT_VISION setting ('openai' or 'stub').
+    """
+    global screenshot_history, answer_cache, vision
+    global _executor, _jobs, _socketio, _max_pending, _profile
+    screenshot_history = ScreenshotStore(
+        app.config['SCREENSHOT_DIR'],
+        max_count=app.config['SCREENSHOT_MAX_COUNT'],
+        max_bytes=app.config['SCREENSHOT_MAX_BYTES'],
+        thumb_size=app.config['SCREENSHOT_THUMB_SIZE'],
+    )
+    answer_cache = PerceptualCache(
+        max_entries=app.config['SCREENSHOT_CACHE_SIZE'],
+        ttl=app.config['SCREENSHOT_CACHE_TTL'],
+        threshold=app.config['SCREENSHOT_HASH_THRESHOLD'],
+    )
+    if client is not None:
+        vision = client
+    elif app.config['SCREENSHOT_VISION'] == 'stub':
+        vision = StubVision()
+    elif app.config.get('OPENAI_API_KEY'):
+        vision = OpenAIVision(app.config['OPENAI_API_KEY'])
+    else:
+        vision = None
+    _profile = app.config['SCREENSHOT_PROFILE']
+    if _profile not in PROFILES:
+        raise ValueError(f"Unknown SCREENSHOT_PROFILE {_profile!r}; use one of {tuple(PROFILES)}")
+    _socketio = socketio
+    _max_pending = app.config['SCREENSHOT_MAX_PENDING']
+    _jobs = JobRegistry(ttl=app.config['SCREENSHOT_JOB_TTL'])
+    _executor = ThreadPoolExecutor(app.config['SCREENSHOT_WORKERS'],
+                                   thread_name_prefix='screenshot')
+    metrics.collect('screenshot_cache', cache_stats)
+    metrics.collect('screenshot_jobs', lambda: {'active': _jobs.active_count(),
+                                                'stored': len(screenshot_history)})
+
+
+class BusyError(RuntimeError):
+    """Too many inspections are already waiting for the vision client."""
+
+
+def request_inspection(frame, use_cache=True, sid=None):
+    """Return a job describing `frame`; the vision call runs in the pool.
+
+    Preprocessing and hashing happen here, so the job is keyed by the
+    view's perceptual hash: a request while a view within
+    SCREENSHOT_HASH_THRESHOLD bits is in flight shares that job, and a
+    cached answer finishes the job immediately (unless `use_cache` is
+    False). A whole-frame hash does not see a
+    needle moving a few degrees, so the cache TTL bounds how stale a
+    reused answer can be. Raises BusyError past SCREENSHOT_MAX_PENDING.
+
+    The 'screenshotResult' event goes only to the job's room; `sid` (the
+    requester's Socket.IO session) joins it.
+    """
+    if _executor is None:
+        raise RuntimeError("screenshot_service not initialized; call init_app(app) first")
+    if vision is None:
+        raise RuntimeError('OPENAI_API_KEY not set')
+
+    with metrics.timed(PREPARE_SECONDS), borrow_preprocessor(_profile) as pre:
+        # downsized + filtered per SCREENSHOT_PROFILE into the pooled
+        # instance's buffers, which stay ours until the block ends
+        resized = pre.run(frame)
+        ret, buf = cv2.imencode('.jpg', resized, [cv2.IMWRITE_JPEG_QUALITY, 70])
+        if not ret:
+            raise RuntimeError('Failed to encode image')
+        image_bytes = buf.tobytes()
+        h = phash(resized)
+
+    if use_cache:
+        answer = answer_cache.get(h)
+        if answer is not None:
+            # the view was recorded when it was first described; another
+            # copy would only fill the history and the report with duplicates
+            job, _ = _jobs.create()
+            _complete(job, {'response': answer, 'cached': True})
+            return job
+
+    with _inflight_lock:
+        job = _jobs.find_active(h, hamming, answer_cache.threshold)
+        if job is not None:
+            _watch(job, sid)
+            return job
+        if _jobs.active_count() >= _max_pending:
+            raise BusyError('Too many screenshot inspections in progress')
+        job, _ = _jobs.create(h)
+        _jobs.start(job)
+    _watch(job, sid)
+    future = _executor.submit(_describe, vision, image_bytes)
+    future.add_done_callback(partial(_on_described, job, image_bytes))
+    return job
+
+
+def _describe(client, image_bytes):
+    """client.describe(), timed per client class and outcome."""
+    name = type(client).__name__
+    with metrics.timed(VISION_SECONDS.labels(client=name, result='ok'),
+                       error=VISION_SECONDS.labels(client=name, result='error')):
+        return client.describe(image_bytes)
+
+
+def _record(image_bytes, answer):
+    """Log a freshly described screenshot for the anomaly report."""
+    screenshot_history.add(image_bytes, answer, time=datetime.now())
+
+
+def _on_described(job, image_bytes, future):
+    # Runs as the future's done-callback, where exceptions are swallowed:
+    # every path must close the job or it counts toward
+    # SCREENSHOT_MAX_PENDING forever.
+    try:
+        answer = future.result()
+        answer_cache.put(job.key, answer)
+        _record(image_bytes, answer)
+        _jobs.finish(job, {'response': answer, 'cached': False})
+    except Exception as e:
+        print("✗ screenshot inspection failed:", e)
+        _jobs.fail(job, e)
+    _emit(job)
+
+
+def _complete(job, result):
+    _jobs.finish(job, result)
+    _emit(job)
+
+
+def _room(job):
+    return f"screenshot:{job.id}"
+
+
+def _watch(job, sid):
+    """Have Socket.IO session `sid` receive `job`'s result."""
+    if _socketio and sid:
+        try:
+            _socketio.server.enter_room(sid, _room(job), namespace='/')
+        except Exception as e:
+            print("✗ screenshot watcher not added:", e)
+
+
+def _emit(job):
+    """Send the job's result to the sessions that asked for it."""
+    if not _socketio:
+        return
+    try:
+        _socketio.emit('screenshotResult', job_json(job), to=_room(job))
+        _socketio.close_room(_room(job))
+    except Exception as e:
+        print("✗ screenshotResult emit failed:", e)
+
+
+def job_json(job):
+    """Job status plus the answer once it is done."""
+    body = job.as_dict()
+    if job.result is not None:
+        body.update(job.result)
+    return body
+
+
+def get_job(job_id):
+    return _jobs.get(job_id)
+
+
+def cache_stats():
+    return answer_cache.stats() if answer_cache is not None else {}
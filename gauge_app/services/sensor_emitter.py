@@ -0,0 +1,182 @@
+# gauge_app/services/sensor_emitter.py
+import threading
+import time
+import uuid
+from collections import deque
+
+from gauge_app.utils import metrics
+
+# Room joined by clients that take batches at the shared flush rate
+BROADCAST_ROOM = 'sensors'
+
+EMIT_SECONDS = metrics.histogram('socketio_emit_seconds', 'Socket.IO emit fan-out time',
+                                 ('event', 'to'))
+
+
+class _Client:
+    __slots__ = ('min_interval', 'next_due', 'pending')
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self.next_due = 0.0
+        self.pending = {}
+
+
+class CoalescingEmitter:
+    """Collect the latest value per topic and emit it in periodic batches.
+
+    `push()` is cheap and safe to call from the MQTT thread; a Socket.IO
+    background task flushes one `sensorDataBatch` event every
+    1/`rate_hz` seconds. Clients in BROADCAST_ROOM share a single emit;
+    clients that asked for a lower rate are emitted to individually and
+    keep coalescing until their next slot.
+
+    Every batch carries `seq`: the client then has every reading up to
+    batch `seq`. The last `backlog` shared batches are kept so a client
+    that reconnects can be sent just what it missed (see since()).
+    """
+
+    def __init__(self, socketio, event='sensorDataBatch', rate_hz=10.0, backlog=600):
+        self.socketio = socketio
+        self.event = event
+        self._emit_seconds = {'room': EMIT_SECONDS.labels(event=event, to='room'),
+                              'client': EMIT_SECONDS.labels(event=event, to='client')}
+        self.rate_hz = float(rate_hz)
+        self._pending = {}
+        self._throttled = {}     # sid -> _Client
+        self._lock = threading.Lock()
+        self._running = False
+        self.seq = 0
+        self.epoch = uuid.uuid4().hex[:8]    # tells seqs of a restarted server apart
+        self._latest = {}                    # topic -> last value sent
+        self._backlog = deque(maxlen=backlog)  # (seq, time, readings) of shared batches
+        # held while a flush emits; hold it to send a client state that
+        # matches `seq` before it starts receiving batches
+        self.sync_lock = threading.RLock()
+        self.counters = {
+            'received': 0,      # values pushed
+            'coalesced': 0,     # values overwritten before the shared flush
+            'client_coalesced': 0,  # values overwritten while a throttled client waited
+            'dropped': 0,       # values never delivered (emit error, client left)
+            'batches': 0,       # events emitted
+        }
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self.socketio.start_background_task(self._run)
+
+    def stop(self):
+        self._running = False
+
+    def push(self, topic, data):
+        with self._lock:
+            self.counters['received'] += 1
+            if topic in self._pending:
+                self.counters['coalesced'] += 1
+            self._pending[topic] = data
+
+    def set_client_rate(self, sid, max_hz):
+        """Throttle `sid` to `max_hz` batches/s (None or >= rate_hz: no limit)."""
+        with self._lock:
+            if max_hz is None or max_hz >= self.rate_hz:
+                client = self._throttled.pop(sid, None)
+                if client is not None:
+                    self.counters['dropped'] += len(client.pending)
+                return False
+            client = self._throttled.get(sid)
+            if client is None:
+                client = self._throttled[sid] = _Client(0.0)
+            client.min_interval = 1.0 / max(max_hz, 0.01)
+            return True
+
+    def remove_client(self, sid):
+        with self._lock:
+            client = self._throttled.pop(sid, None)
+            if client is not None:
+                self.counters['dropped'] += len(client.pending)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters,
+                        seq=self.seq,
+                        pending=len(self._pending),
+                        throttled_clients=len(self._throttled))
+
+    def _run(self):
+        interval = 1.0 / self.rate_hz
+        next_tick = time.monotonic()
+        while self._running:
+            next_tick += interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                self.socketio.sleep(delay)
+            else:
+                next_tick = time.monotonic()   # fell behind; don't burst
+            try:
+                self.flush()
+            except Exception as e:
+                print("✗ sensor batch flush failed:", e)
+
+    def latest(self):
+        """(seq, {topic: value}) as of the last flush."""
+        with self._lock:
+            return self.seq, dict(self._latest)
+
+    def since(self, seq):
+        """What a client at batch `seq` missed: (seq, readings, time of
+        batch `seq`), or None if `seq` is not in the backlog."""
+        with self._lock:
+            if seq == self.seq:
+                return self.seq, {}, self._backlog[-1][1] if self._backlog else None
+            if not self._backlog or not self._backlog[0][0] <= seq < self.seq:
+                return None
+            readings, since_time = {}, None
+            for batch_seq, batch_time, batch in self._backlog:
+                if batch_seq == seq:
+                    since_time = batch_time
+                elif batch_seq > seq:
+                    readings.update(batch)
+            return self.seq, readings, since_time
+
+    def flush(self):
+        with self.sync_lock:
+            self._flush()
+
+    def _flush(self):
+        now = time.time()
+        mono = time.monotonic()
+        due = []
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            if batch:
+                self.seq += 1
+                self._latest.update(batch)
+                self._backlog.append((self.seq, now, batch))
+            seq = self.seq
+            for sid, client in self._throttled.items():
+                if batch:
+                    overlap = client.pending.keys() & batch.keys()
+                    self.counters['client_coalesced'] += len(overlap)
+                    client.pending.update(batch)
+                if client.pending and mono >= client.next_due:
+                    due.append((sid, client.pending))
+                    client.pending = {}
+                    client.next_due = mono + client.min_interval
+
+        if batch:
+            self._emit({'readings': batch, 'time': now, 'seq': seq}, BROADCAST_ROOM)
+        for sid, readings in due:
+            self._emit({'readings': readings, 'time': now, 'seq': seq}, sid)
+
+    def _emit(self, payload, to):
+        seconds = self._emit_seconds['room' if to == BROADCAST_ROOM else 'client']
+        try:
+            with metrics.timed(seconds):
+                self.socketio.emit(self.event, payload, to=to)
+        except Exception:
+            with self._lock:
+                self.counters['dropped'] += len(payload['readings'])
+            return
+        with self._lock:
+            self.counters['batches'] += 1
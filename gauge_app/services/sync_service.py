@@ -0,0 +1,118 @@
+# gauge_app/services/sync_service.py
+"""Dashboard state for connecting Socket.IO clients.
+
+A new client gets a `sensorSnapshot`:
+
+    {epoch, seq, readings: {topic: value},
+     sparklines: {topic: {start, step, values}}, anomalies: [event, ...]}
+
+A client that reconnects sends its last {epoch, seq, anomaly} in the
+Socket.IO auth payload. While that seq is still in the emitter's
+backlog it gets a `sensorDelta` instead, with only what it missed:
+
+    {epoch, seq, readings (changed topics only),
+     sparklines (buckets from its last batch on), anomalies (newer ids),
+     unacknowledged: [id, ...]}
+
+Sparkline buckets are aligned to multiples of `step` seconds, so a
+delta's buckets replace the client's from `start` onwards. Each bucket
+holds the last reading in it, or null.
+
+Call these with the emitter's sync_lock held so the state matches `seq`.
+"""
+import time
+
+import numpy as np
+
+
+def sparkline(ts, vals, start, step, buckets):
+    """Last value in each of `buckets` `step`-second buckets from `start`."""
+    out = np.full(buckets, np.nan)
+    if len(ts):
+        idx = ((ts - start) // step).astype(np.int64)
+        keep = (idx >= 0) & (idx < buckets)
+        idx, vals = idx[keep], vals[keep]
+        if len(idx):
+            # ts is sorted, so the last sample of a bucket is where idx changes
+            last = np.flatnonzero(np.diff(idx, append=idx[-1] + 1))
+            out[idx[last]] = vals[last]
+    return [None if np.isnan(v) else round(v, 3) for v in out.tolist()]
+
+
+def sparklines(history, start, step, now=None):
+    """{topic: sparkline} of every topic in `history` with readings after `start`."""
+    now = time.time() if now is None else now
+    start = (start // step) * step
+    buckets = max(1, int((now - start) // step) + 1)
+    lines = {}
+    for topic, buf in history.items():
+        ts, vals = buf.window(start)
+        if len(ts):
+            lines[topic] = {'start': start, 'step': step,
+                            'values': sparkline(ts, vals, start, step, buckets)}
+    return lines
+
+
+def unacknowledged(log, limit):
+    """The newest `limit` anomaly events nobody has acknowledged, oldest first."""
+    events = []
+    for event in reversed(list(log)):
+        if not event.get('acknowledged'):
+            events.append({k: v for k, v in event.items() if k != 'time'})
+            if len(events) >= limit:
+                break
+    events.reverse()
+    return events
+
+
+def snapshot(emitter, history, log, settings):
+    """Full dashboard state as of the emitter's current seq."""
+    window, points = settings['sparkline_seconds'], settings['sparkline_points']
+    now = time.time()
+    seq, readings = emitter.latest()
+    return {
+        'epoch': emitter.epoch,
+        'seq': seq,
+        'time': now,
+        'readings': readings,
+        'sparklines': sparklines(history, now - window, window / points, now),
+        'anomalies': unacknowledged(log, settings['max_anomalies']),
+    }
+
+
+def delta(emitter, history, log, seq, last_anomaly, settings):
+    """What a client at (`seq`, `last_anomaly`) missed, or None if the
+    emitter no longer holds the batches after `seq`."""
+    missed = emitter.since(seq)
+    if missed is None:
+        return None
+    seq, readings, since_time = missed
+    window, points = settings['sparkline_seconds'], settings['sparkline_points']
+    now = time.time()
+    start = max(since_time or now, now - window)
+    unacked = unacknowledged(log, settings['max_anomalies'])
+    return {
+        'epoch': emitter.epoch,
+        'seq': seq,
+        'time': now,
+        'readings': readings,
+        'sparklines': sparklines(history, start, window / points, now),
+        'anomalies': [e for e in unacked if e['id'] > last_anomaly],
+        'unacknowledged': [e['id'] for e in unacked],
+    }
+
+
+def sync_payload(emitter, history, log, auth, settings):
+    """('sensorDelta', delta) when the client's state can be caught up,
+    else ('sensorSnapshot', snapshot)."""
+    auth = auth if isinstance(auth, dict) else {}
+    if auth.get('epoch') == emitter.epoch and auth.get('seq') is not None:
+        try:
+            seq, last_anomaly = int(auth['seq']), int(auth.get('anomaly') or 0)
+        except (TypeError, ValueError):
+            seq = None
+        if seq is not None:
+            body = delta(emitter, history, log, seq, last_anomaly, settings)
+            if body is not None:
+                return 'sensorDelta', body
+    return 'sensorSnapshot', snapshot(emitter, history, log, settings)
@@ -0,0 +1,201 @@
+# gauge_app/utils/anomaly_rules.py
+"""Vectorised anomaly rules.
+
+Each rule looks at one topic's samples as two float64 arrays, `ts` and
+`vals`, where the first `start` entries are context (already evaluated)
+and the rest are the new micro-batch. `evaluate()` returns a list of
+(index, severity, detail) for flagged entries at index >= start.
+"""
+import numpy as np
+
+WARNING, CRITICAL = 'warning', 'critical'
+
+
+class Rule:
+    name = 'rule'
+
+    def evaluate(self, topic, ts, vals, start):
+        raise NotImplementedError
+
+
+def _hits(idx, severity, details):
+    return [(int(i), s, d) for i, s, d in zip(idx, severity, details)]
+
+
+class StaticBounds(Rule):
+    """Value outside the configured [low, high] range for the topic.
+
+    Critical once it is more than `critical_margin` of the range outside.
+    """
+    name = 'bounds'
+
+    def __init__(self, thresholds, critical_margin=0.1):
+        self.thresholds = thresholds
+        self.critical_margin = critical_margin
+
+    def evaluate(self, topic, ts, vals, start):
+        bounds = self.thresholds.get(topic)
+        if not bounds:
+            return []
+        low, high = bounds['low'], bounds['high']
+        x = vals[start:]
+        excess = np.maximum(low - x, x - high)
+        idx = np.flatnonzero(excess > 0)
+        if not len(idx):
+            return []
+        margin = self.critical_margin * (high - low)
+        sev = np.where(excess[idx] > margin, CRITICAL, WARNING)
+        details = [f"outside [{low:g}, {high:g}]"] * len(idx)
+        return _hits(idx + start, sev, details)
+
+
+class RollingZScore(Rule):
+    """Value more than `threshold` standard deviations from the mean of
+    the previous `window` samples."""
+    name = 'zscore'
+
+    def __init__(self, window=60, threshold=3.0, critical=5.0, min_samples=10):
+        self.window = window
+        self.threshold = threshold
+        self.critical = critical
+        self.min_samples = min_samples
+
+    def evaluate(self, topic, ts, vals, start):
+        n = len(vals)
+        pos = np.arange(max(start, 1), n)
+        if not len(pos):
+            return []
+        # prefix sums give every trailing-window mean/var in one pass
+        centred = vals - vals[:start or 1].mean()
+        cs = np.concatenate(([0.0], np.cumsum(centred)))
+        cs2 = np.concatenate(([0.0], np.cumsum(centred * centred)))
+        lo = np.maximum(pos - self.window, 0)
+        count = pos - lo
+        mean = (cs[pos] - cs[lo]) / count
+        var = (cs2[pos] - cs2[lo]) / count - mean * mean
+        std = np.sqrt(np.maximum(var, 0.0))
+        ok = (count >= self.min_samples) & (std > 1e-9)
+        z = np.zeros(len(pos))
+        z[ok] = np.abs(centred[pos[ok]] - mean[ok]) / std[ok]
+        flagged = np.flatnonzero(z > self.threshold)
+        if not len(flagged):
+            return []
+        sev = np.where(z[flagged] > self.critical, CRITICAL, WARNING)
+        details = [f"z={v:.1f}" for v in z[flagged]]
+        return _hits(pos[flagged], sev, details)
+
+
+def ewma(x, alpha, initial):
+    """Exponentially weighted moving average of `x` seeded with `initial`."""
+    out = np.empty(len(x))
+    decay = 1.0 - alpha
+    prev = initial
+    # closed form per chunk; chunks keep decay**-k well inside float range
+    for s in range(0, len(x), 64):
+        chunk = x[s:s + 64]
+        k = np.arange(1, len(chunk) + 1)
+        weights = decay ** -k
+        out[s:s + 64] = decay ** k * (prev + alpha * np.cumsum(chunk * weights))
+        prev = out[s + len(chunk) - 1]
+    return out
+
+
+class EwmaDrift(Rule):
+    """A fast EWMA pulling away from a slow EWMA baseline by more than
+    `threshold` standard deviations of the recent context."""
+    name = 'drift'
+
+    def __init__(self, fast=0.3, slow=0.02, threshold=3.0, critical=6.0,
+                 min_samples=20):
+        self.fast = fast
+        self.slow = slow
+        self.threshold = threshold
+        self.critical = critical
+        self.min_samples = min_samples
+        self._state = {}    # topic -> (fast, slow, flagged)
+
+    def evaluate(self, topic, ts, vals, start):
+        batch = vals[start:]
+        if not len(batch):
+            return []
+        state = self._state.get(topic)
+        if state is None:
+            state = (batch[0], batch[0], False)
+        fast = ewma(batch, self.fast, state[0])
+        slow = ewma(batch, self.slow, state[1])
+        was_flagged = state[2]
+
+        sigma = vals.std() if len(vals) >= self.min_samples else 0.0
+        hits = []
+        if sigma > 1e-9:
+            score = np.abs(fast - slow) / sigma
+            over = score > self.threshold
+            # report when drift begins, not on every sample while it lasts
+            onset = over & ~np.concatenate(([was_flagged], over[:-1]))
+            idx = np.flatnonzero(onset)
+            sev = np.where(score[idx] > self.critical, CRITICAL, WARNING)
+            details = [f"drift={score[i]:.1f}σ" for i in idx]
+            hits = _hits(idx + start, sev, details)
+            was_flagged = bool(over[-1])
+        self._state[topic] = (fast[-1], slow[-1], was_flagged)
+        return hits
+
+
+class RateOfChange(Rule):
+    """|Δvalue/Δt| above a per-topic limit (units per second).
+
+    Topics without an explicit limit use `span_fraction` of their
+    threshold range per second. Each reading is compared with the latest
+    one at least `min_interval` seconds older, so readings that arrive
+    in a burst (or with identical timestamps) are not divided by a tiny
+    Δt; a reading with no such predecessor is not rated.
+    """
+    name = 'rate'
+
+    def __init__(self, limits=None, thresholds=None, span_fraction=1.0,
+                 min_interval=1.0):
+        self.limits = dict(limits or {})
+        self.min_interval = min_interval
+        for topic, bounds in (thresholds or {}).items():
+            self.limits.setdefault(
+                topic, span_fraction * (bounds['high'] - bounds['low']))
+
+    def evaluate(self, topic, ts, vals, start):
+        limit = self.limits.get(topic)
+        if not limit or start >= len(vals):
+            return []
+        # index of the latest reading at least min_interval before each new one
+        prev = np.searchsorted(ts, ts[start:] - self.min_interval, side='right') - 1
+        ok = prev >= 0
+        cur = np.flatnonzero(ok) + start
+        prev = prev[ok]
+        dt = np.maximum(ts[cur] - ts[prev], 1e-3)   # >= min_interval unless that is 0
+        rate = np.abs(vals[cur] - vals[prev]) / dt
+        hit = np.flatnonzero(rate > limit)
+        sev = np.where(rate[hit] > 2 * limit, CRITICAL, WARNING)
+        details = [f"rate={rate[i]:.3g}/s" for i in hit]
+        return _hits(cur[hit], sev, details)
+
+
+class StuckSensor(Rule):
+    """The same value repeated for `samples` consecutive readings.
+
+    Flags once, on the reading that completes the run.
+    """
+    name = 'stuck'
+
+    def __init__(self, samples=30, tolerance=0.0):
+        self.samples = samples
+        self.tolerance = tolerance
+
+    def evaluate(self, topic, ts, vals, start):
+        if len(vals) < self.samples:
+            return []
+        changed = np.concatenate(
+            ([True], np.abs(np.diff(vals)) > self.tolerance))
+        run_start = np.maximum.accumulate(
+            np.where(changed, np.arange(len(vals)), 0))
+        run_len = np.arange(len(vals)) - run_start + 1
+        idx = np.flatnonzero(run_len[start:] == self.samples) + start
+        details = [f"unchanged for {self.samples} readings"] * len(idx)
+        return _hits(idx, [WARNING] * len(idx), details)
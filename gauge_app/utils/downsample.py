@@ -0,0 +1,66 @@
+# gauge_app/utils/downsample.py
+import numpy as np
+
+
+def minmax_buckets(ts, vals, n_out):
+    """Keep the min and max sample of each of n_out/2 equal-count buckets.
+
+    Returns (ts, vals) with at most `n_out` points, in time order.
+    """
+    n = len(ts)
+    if n <= n_out or n_out < 2:
+        return ts, vals
+    buckets = n_out // 2
+    size = -(-n // buckets)                     # ceil(n / buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = vals
+    base = np.arange(buckets) * size
+    # the tail buckets can be pure padding when n is just over a multiple
+    base = base[base < n]
+    grid = padded.reshape(buckets, size)[:len(base)]
+    idx = np.stack((base + np.nanargmin(grid, axis=1),
+                    base + np.nanargmax(grid, axis=1)), axis=1)
+    idx = np.sort(idx, axis=1).ravel()
+    idx = idx[np.concatenate(([True], idx[1:] != idx[:-1]))]
+    return ts[idx], vals[idx]
+
+
+def lttb(ts, vals, n_out):
+    """Largest-Triangle-Three-Buckets downsampling to at most `n_out` points.
+
+    Bucket averages are computed in one vectorised pass; the selection
+    walk is one NumPy reduction per bucket.
+    """
+    n = len(ts)
+    if n <= n_out or n_out < 3:
+        return ts, vals
+    x = ts - ts[0]                  # keep the triangle areas well-conditioned
+    y = vals
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    # reduceat's last segment runs to the end of its input, so stop the
+    # input before the final point, which is not in any bucket
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    last_bucket = n_out - 3
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i < last_bucket:
+            nx, ny = avg_x[i + 1], avg_y[i + 1]
+        else:
+            nx, ny = x[-1], y[-1]
+        area = np.abs((x[a] - nx) * (y[lo:hi] - y[a])
+                      - (x[a] - x[lo:hi]) * (ny - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return ts[out], vals[out]
+
+
+METHODS = {
+    'lttb': lttb,
+    'minmax': minmax_buckets,
+}
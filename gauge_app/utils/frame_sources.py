@@ -0,0 +1,158 @@
+# gauge_app/utils/frame_sources.py
+"""Frame sources with the cv2.VideoCapture read()/set()/release() API.
+
+    device               a live camera (cv2.VideoCapture)
+    replay:<path>        a video file or a directory of images, looped at
+                         a fixed fps
+    synthetic            rendered gauges whose true reading is known
+
+Selected with CAMERA_SOURCE; see open_source().
+"""
+import os
+import threading
+import time
+
+import cv2
+
+from gauge_app.utils.synthetic_gauge import render_background, render_gauge
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class _PacedSource:
+    """Deliver frames no faster than `fps`, like a camera's read()."""
+
+    def __init__(self, fps):
+        self.fps = fps
+        self._next = None
+        self.frames = 0
+
+    def _pace(self):
+        if not self.fps:
+            return
+        now = time.monotonic()
+        if self._next is not None and now < self._next:
+            time.sleep(self._next - now)
+            now = self._next
+        # a slow reader doesn't earn a burst of catch-up frames
+        self._next = max(now, self._next or now) + 1.0 / self.fps
+
+    def set(self, prop, value):
+        return False
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class ReplaySource(_PacedSource):
+    """Loop a video file or a directory of images at a fixed fps."""
+
+    def __init__(self, path, fps=30.0, loop=True, size=None):
+        super().__init__(fps)
+        self.path = path
+        self.loop = loop
+        self.size = size              # (width, height) to resize to, or None
+        self._lock = threading.Lock()
+        if os.path.isdir(path):
+            names = sorted(n for n in os.listdir(path)
+                           if n.lower().endswith(IMAGE_EXTENSIONS))
+            self._images = [cv2.imread(os.path.join(path, n)) for n in names]
+            self._images = [img for img in self._images if img is not None]
+            if not self._images:
+                raise ValueError(f"No readable images in {path}")
+            self._video = None
+        else:
+            self._images = None
+            self._video = cv2.VideoCapture(path)
+            if not self._video.isOpened():
+                raise ValueError(f"Cannot open video {path}")
+
+    def _next_frame(self):
+        if self._images is not None:
+            if self.frames >= len(self._images) and not self.loop:
+                return None
+            return self._images[self.frames % len(self._images)]
+        ok, frame = self._video.read()
+        if not ok and self.loop:
+            self._video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self._video.read()
+        return frame if ok else None
+
+    def read(self):
+        self._pace()
+        with self._lock:
+            frame = self._next_frame()
+            if frame is None:
+                return False, None
+            self.frames += 1
+        if self.size and (frame.shape[1], frame.shape[0]) != tuple(self.size):
+            frame = cv2.resize(frame, tuple(self.size), interpolation=cv2.INTER_AREA)
+        return True, frame
+
+    def release(self):
+        if self._video is not None:
+            self._video.release()
+
+
+class SyntheticSource(_PacedSource):
+    """Render gauges whose needle sweeps 0–100 every `period` frames.
+
+    `truth` is the reading drawn on the most recent frame, and
+    reading_at(n) the reading of frame n (0-based), for accuracy checks.
+    The background is drawn once, so frames cost one dial render.
+    """
+
+    def __init__(self, fps=30.0, size=(900, 1600), radius=75, clutter=20,
+                 ticks=36, period=200, seed=0):
+        super().__init__(fps)
+        self.size = size
+        self.radius = radius
+        self.ticks = ticks
+        self.period = period
+        self._background = render_background(size, clutter, seed)
+        self.truth = None
+
+    def reading_at(self, n):
+        return (n * 100.0 / self.period) % 100
+
+    def set(self, prop, value):
+        h, w = self.size
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.size = (h, int(value))
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.size = (int(value), w)
+        else:
+            return False
+        if self.size != self._background.shape[:2]:
+            self._background = cv2.resize(self._background, self.size[::-1])
+        return True
+
+    def read(self):
+        self._pace()
+        truth = self.reading_at(self.frames)
+        frame = render_gauge(truth, radius=self.radius, ticks=self.ticks,
+                             image=self._background.copy())
+        self.frames += 1
+        self.truth = truth
+        return True, frame
+
+
+def open_source(config):
+    """Open the frame source named by config['CAMERA_SOURCE']."""
+    spec = config.get('CAMERA_SOURCE', 'device')
+    fps = config.get('CAMERA_SOURCE_FPS', 30)
+    size = (config['CAMERA_WIDTH'], config['CAMERA_HEIGHT'])
+    if spec == 'synthetic':
+        return SyntheticSource(fps=fps, size=size[::-1])
+    if spec.startswith('replay:'):
+        return ReplaySource(spec[len('replay:'):], fps=fps, size=size)
+    if spec != 'device':
+        raise ValueError(f"Unknown CAMERA_SOURCE {spec!r}; "
+                         "use 'device', 'synthetic' or 'replay:<path>'")
+    capture = cv2.VideoCapture(config['CAMERA_INDEX'])
+    capture.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+    capture.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+    return capture
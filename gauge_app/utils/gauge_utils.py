@@ -30,12 +30,12 @@ def findRed(img):
     low2 = create_hue_mask(hsv, [170, 100, 100], [179, 255, 255])
     return cv2.GaussianBlur(cv2.bitwise_or(low1, low2), (5, 5), 0)
 
-def findCircles(mask):
+def findCircles(mask, minRadius=30, maxRadius=200, minDist=50):
     """Detect circles in the binary mask image."""
     circles = cv2.HoughCircles(
-        mask, cv2.HOUGH_GRADIENT, 1, 50,
+        mask, cv2.HOUGH_GRADIENT, 1, minDist,
         param1=50, param2=15,
-        minRadius=30, maxRadius=200
+        minRadius=minRadius, maxRadius=maxRadius
     )
     
     if circles is None or len(circles[0]) == 0:
@@ -46,7 +46,50 @@ def findCircles(mask):
     # Return list of (x,y,r)
     return [(int(x), int(y), int(r)) for x, y, r in pts]
 
-def findAngle(cut_bgr, cut_mask, center, width):
+def needle_tip(segments, center, width, min_angle_deg=None):
+    """Farthest pairwise segment-line intersection within the dial.
+
+    `segments` is an (L, 4) array of x1, y1, x2, y2. Every pair of lines
+    is intersected at once with NumPy broadcasting; the point farthest
+    from `center` but closer than width/2 is returned, or None. With
+    `min_angle_deg`, pairs of nearly parallel lines (whose intersections
+    are numerically unstable) are skipped.
+    """
+    segs = np.asarray(segments).reshape(-1, 4)
+    x1, y1, x2, y2 = segs.astype(np.float64).T
+
+    # Same coefficients as line(), one entry per segment
+    A = y1 - y2
+    B = x2 - x1
+    C = x2*y1 - x1*y2
+
+    # Cramer's rule for every (i, j) pair, as in intersection()
+    D = A[:, None]*B[None, :] - B[:, None]*A[None, :]
+    Dx = C[:, None]*B[None, :] - B[:, None]*C[None, :]
+    Dy = A[:, None]*C[None, :] - C[:, None]*A[None, :]
+
+    valid = D != 0
+    valid &= ~(segs[:, None, :] == segs[None, :, :]).all(axis=-1)
+    if min_angle_deg:
+        # |D| = |u_i x u_j| = len_i * len_j * sin(angle between segments)
+        lengths = np.hypot(A, B)
+        min_sin = math.sin(math.radians(min_angle_deg))
+        valid &= np.abs(D) >= min_sin * lengths[:, None] * lengths[None, :]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        px = Dx / D
+        py = Dy / D
+    dist = np.hypot(px - center[0], center[1] - py)
+    valid &= (dist > 0) & (dist < width/2)
+    if not valid.any():
+        return None
+
+    # argmax takes the first maximum in (i, j) order, like the scalar loop
+    k = int(np.argmax(np.where(valid, dist, -1.0)))
+    i, j = divmod(k, len(segs))
+    return float(px[i, j]), float(py[i, j])
+
+def findAngle(cut_bgr, cut_mask, center, width, min_angle_deg=None):
     """Find the angle of the gauge needle."""
     edges = cv2.Canny(cut_mask, 50, 150, apertureSize=3)
     lines = cv2.HoughLinesP(
@@ -56,26 +99,10 @@ def findAngle(cut_bgr, cut_mask, center, width):
         maxLineGap=20
     )
     
-    tip, maxd = None, 0
     if lines is None:
         return None
-        
-    for ln in lines:
-        x1, y1, x2, y2 = ln[0]
-        L1 = line((x1, y1), (x2, y2))
-        for ln2 in lines:
-            x3, y3, x4, y4 = ln2[0]
-            if (x1, y1, x2, y2) == (x3, y3, x4, y4):
-                continue
-            L2 = line((x3, y3), (x4, y4))
-            pt = intersection(L1, L2)
-            if pt:
-                dx = pt[0] - center[0]
-                dy = center[1] - pt[1]
-                dist = math.hypot(dx, dy)
-                if 0 < dist < width/2 and dist > maxd:
-                    tip, maxd = pt, dist
-                    
+
+    tip = needle_tip(lines, center, width, min_angle_deg)
     if tip is None:
         return None
 
@@ -94,14 +121,9 @@ def findAngle(cut_bgr, cut_mask, center, width):
         
     return max(0, min(100, int(pct*100)))
 
-def read_regular_gauge(frame):
-    """Return a single 0–100 int or None representing gauge reading."""
-    red = findRed(frame)
-    circles = findCircles(red)
-    if not circles:
-        return None
-        
-    x, y, r = circles[0]
+def read_dial(frame, red, circle):
+    """Read one dial given the frame's red mask and the dial's (x, y, r)."""
+    x, y, r = circle
     # Extract a square region around the dial
     pad = int(1.2*r)
     y1, y2 = max(0, y-pad), min(frame.shape[0], y+pad)
@@ -111,6 +133,179 @@ def read_regular_gauge(frame):
     
     return findAngle(cut_bgr, cut_mask, ((x2-x1)//2, (y2-y1)//2), x2-x1)
 
+def read_regular_gauge(frame):
+    """Return a single 0–100 int or None representing gauge reading."""
+    red = findRed(frame)
+    circles = findCircles(red)
+    if not circles:
+        return None
+        
+    return read_dial(frame, red, circles[0])
+
+class GaugeTracker:
+    """Track dial positions so later frames only search small ROIs.
+
+    After a full-frame detection the circles are cached. On each later
+    frame, findRed/findCircles run only on a box of `pad` radii around
+    each cached circle, looking for radii within `max_shift` of the
+    cached one. A circle passes the ROI check when it is found again
+    within `max_shift` radii of where it was; circles that fail are
+    dropped. The full frame is searched again when none pass, and every
+    `refresh_every` frames so new dials are picked up. Circles from a
+    full scan are kept only if they also pass the ROI check.
+
+    Each dial gets a stable integer id: tracked dials keep theirs, and
+    after a full scan a dial within one radius of a previous dial's
+    centre inherits its id.
+
+    `pad` must cover read_dial()'s 1.2r cut of a circle that moved and
+    grew by `max_shift`: pad > 1.2*(1 + max_shift) + max_shift.
+
+    The ROI re-detection runs HoughCircles on the ROI's mask scaled by
+    `search_scale`, which is most of a tracked frame's cost; the needle
+    is still read from the full-resolution mask. 1.0 searches at full
+    resolution.
+    """
+
+    def __init__(self, refresh_every=30, pad=1.8, max_shift=0.2, search_scale=0.5):
+        self.refresh_every = refresh_every
+        self.pad = pad
+        self.max_shift = max_shift
+        self.search_scale = search_scale
+        self.circles = []      # [(x, y, r)] in frame coordinates, sorted by x
+        self.ids = []          # gauge id of each entry in self.circles
+        self._views = []       # [(x0, y0, red mask of the read box)] matching self.circles
+        self._next_id = 1
+        self._since_full = 0
+        self.full_scans = 0
+        self.roi_frames = 0
+
+    def _track(self, frame, circle, red=None):
+        """Re-detect one cached circle in its ROI; (None, None) if it was lost.
+
+        The circle search runs on the ROI downscaled by `search_scale`;
+        only the box read_dial() will cut around the found circle gets a
+        full-resolution mask. `red` is the whole frame's mask when the
+        caller already has it; both are then views of it instead of new
+        findRed() calls.
+        """
+        x, y, r = circle
+        h, w = frame.shape[:2]
+        p = int(self.pad*r) + 4
+        x0, y0 = max(0, x-p), max(0, y-p)
+        x1, y1 = min(w, x+p), min(h, y+p)
+        s = self.search_scale
+        if red is not None:
+            search = red[y0:y1, x0:x1]
+            if s != 1.0:
+                search = cv2.resize(search, None, fx=s, fy=s, interpolation=cv2.INTER_AREA)
+        else:
+            roi = frame[y0:y1, x0:x1]
+            if s != 1.0:
+                roi = cv2.resize(roi, None, fx=s, fy=s, interpolation=cv2.INTER_AREA)
+            search = findRed(roi)
+        limit = self.max_shift * r
+        found = findCircles(search, max(1, int((r - limit) * s)),
+                            int((r + limit) * s) + 1, minDist=max(1, 50 * s))
+        best, best_d = None, limit
+        for cx, cy, cr in found:
+            cx, cy, cr = round(cx / s) + x0, round(cy / s) + y0, round(cr / s)
+            d = math.hypot(cx - x, cy - y)
+            if d <= best_d:
+                best, best_d = (cx, cy, cr), d
+        if best is None:
+            return None, None
+
+        # read_dial()'s 1.2r cut, plus a margin so the blur in findRed()
+        # sees the same neighbours as on the full frame
+        bx, by, br = best
+        q = int(1.2*br) + 4
+        cx0, cy0 = max(0, bx-q), max(0, by-q)
+        cx1, cy1 = min(w, bx+q), min(h, by+q)
+        if red is not None:
+            mask = red[cy0:cy1, cx0:cx1]
+        else:
+            mask = findRed(frame[cy0:cy1, cx0:cx1])
+        return best, (cx0, cy0, mask)
+
+    def _match_ids(self, circles):
+        """Give each new circle the id of the nearest previous dial, if close."""
+        pairs = sorted(
+            (math.hypot(x - px, y - py), i, j)
+            for i, (x, y, r) in enumerate(circles)
+            for j, (px, py, pr) in enumerate(self.circles)
+            if math.hypot(x - px, y - py) <= max(r, pr)
+        )
+        ids, used = [None] * len(circles), set()
+        for _, i, j in pairs:
+            if ids[i] is None and j not in used:
+                ids[i] = self.ids[j]
+                used.add(j)
+        for i in range(len(ids)):
+            if ids[i] is None:
+                ids[i] = self._next_id
+                self._next_id += 1
+        return ids
+
+    def _store(self, located):
+        located.sort(key=lambda item: item[0][0])
+        self.circles = [c for c, _, _ in located]
+        self._views = [v for _, v, _ in located]
+        self.ids = [g for _, _, g in located]
+
+    def update(self, frame):
+        """Locate the dials in `frame`; returns [(x, y, r)] sorted by x."""
+        if self.circles and self._since_full < self.refresh_every:
+            located = []
+            for circle, gid in zip(self.circles, self.ids):
+                found, view = self._track(frame, circle)
+                if found is not None:
+                    located.append((found, view, gid))
+            if located:
+                self._store(located)
+                self._since_full += 1
+                self.roi_frames += 1
+                return self.circles
+
+        # Full scan; keep only circles that the ROI search confirms, which
+        # also drops the spurious overlapping circles of a busy mask. The
+        # frame's mask is computed once and shared by every dial.
+        red = findRed(frame)
+        located = []
+        for circle in findCircles(red):
+            found, view = self._track(frame, circle, red)
+            if found is not None:
+                located.append((found, view))
+        ids = self._match_ids([c for c, _ in located])
+        self._store([(c, v, g) for (c, v), g in zip(located, ids)])
+        self._since_full = 0
+        self.full_scans += 1
+        return self.circles
+
+    def read_dial(self, frame, index=0):
+        """Read dial `index` as located by the last update() on this frame."""
+        x, y, r = self.circles[index]
+        x0, y0, red = self._views[index]
+        h, w = red.shape[:2]
+        return read_dial(frame[y0:y0+h, x0:x0+w], red, (x-x0, y-y0, r))
+
+    def read(self, frame):
+        """Drop-in for read_regular_gauge() using the tracked ROIs."""
+        if not self.update(frame):
+            return None
+        return self.read_dial(frame, 0)
+
+    def read_all(self, frame, executor=None):
+        """Read every tracked dial; returns {gauge_id: reading}.
+
+        With an `executor` (e.g. a ThreadPoolExecutor) the dials are read
+        in parallel; OpenCV releases the GIL for the heavy calls.
+        """
+        self.update(frame)
+        mapper = executor.map if executor is not None else map
+        readings = mapper(lambda i: self.read_dial(frame, i), range(len(self.circles)))
+        return dict(zip(self.ids, readings))
+
 def getNeedleMask(img, red_thresh_ratio=0.01):
     """Get a mask highlighting the gauge needle."""
     # 1) Try red-hue mask
@@ -0,0 +1,126 @@
+# gauge_app/utils/jobs.py
+import threading
+import time
+import uuid
+
+PENDING, RUNNING, DONE, ERROR = 'pending', 'running', 'done', 'error'
+
+
+class Job:
+    """One unit of background work tracked by a JobRegistry."""
+
+    __slots__ = ('id', 'key', 'status', 'result', 'error',
+                 'created', 'finished', '_done')
+
+    def __init__(self, key=None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = PENDING
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self._done = threading.Event()
+
+    @property
+    def active(self):
+        return self.status in (PENDING, RUNNING)
+
+    def wait(self, timeout=None):
+        """Block until the job finishes; True if it did within `timeout`."""
+        return self._done.wait(timeout)
+
+    def as_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'created': self.created,
+            'finished': self.finished,
+        }
+
+
+class JobRegistry:
+    """Thread-safe table of jobs; finished ones expire after `ttl` seconds.
+
+    Active jobs are indexed by `key` so identical requests can share one.
+    """
+
+    def __init__(self, ttl=3600, max_jobs=1000):
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self._jobs = {}
+        self._active = {}     # key -> Job
+        self._lock = threading.Lock()
+
+    def create(self, key=None):
+        """Return (job, created); an active job with the same key is reused."""
+        with self._lock:
+            self._prune()
+            if key is not None:
+                job = self._active.get(key)
+                if job is not None:
+                    return job, False
+            job = Job(key)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._active[key] = job
+            return job, True
+
+    def find_active(self, key, distance=None, threshold=0):
+        """The active job for `key`, or None.
+
+        With `distance(a, b)` given, the active job whose key is closest
+        to `key` and no more than `threshold` away.
+        """
+        with self._lock:
+            job = self._active.get(key)
+            if job is not None or distance is None:
+                return job
+            best_d = threshold + 1
+            for other, candidate in self._active.items():
+                d = distance(key, other)
+                if d < best_d:
+                    job, best_d = candidate, d
+            return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def start(self, job):
+        job.status = RUNNING
+
+    def finish(self, job, result):
+        self._close(job, DONE, result=result)
+
+    def fail(self, job, error):
+        self._close(job, ERROR, error=str(error))
+
+    def _close(self, job, status, result=None, error=None):
+        with self._lock:
+            job.result = result
+            job.error = error
+            job.status = status
+            job.finished = time.time()
+            if self._active.get(job.key) is job:
+                del self._active[job.key]
+        job._done.set()
+
+    def active_count(self):
+        with self._lock:
+            return len(self._active)
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        expired = [j for j in self._jobs.values()
+                   if not j.active and j.finished < cutoff]
+        # over the cap: drop the oldest finished jobs as well
+        overflow = len(self._jobs) - len(expired) - self.max_jobs
+        if overflow > 0:
+            finished = sorted((j for j in self._jobs.values()
+                               if not j.active and j.finished >= cutoff),
+                              key=lambda j: j.finished)
+            expired.extend(finished[:overflow])
+        for job in expired:
+            del self._jobs[job.id]
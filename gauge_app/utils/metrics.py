@@ -0,0 +1,289 @@
+# gauge_app/utils/metrics.py
+"""Minimal Prometheus-style metrics.
+
+    MESSAGES = counter('mqtt_messages_total', 'Messages processed', ('topic',))
+    MESSAGES.inc(topic='luzpeacock')
+    MESSAGES.labels(topic='luzpeacock').inc()   # bound child: cheapest per call
+
+    LATENCY = histogram('gauge_read_seconds', 'Gauge read time')
+    with timed(LATENCY) as t:
+        ...
+    t.elapsed                                   # seconds, also observed
+
+    @timed(LATENCY)
+    def read(...): ...
+
+Values for other components' own counters can be exported at scrape
+time with collect(), so nothing is added to their hot paths.
+render() produces the text exposition format served at /metrics.
+"""
+import bisect
+import functools
+import threading
+import time
+
+# Seconds; covers sub-millisecond handlers up to multi-second API calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(names, labels):
+    if len(labels) != len(names):
+        raise ValueError(f"Expected labels {names}, got {tuple(labels)}")
+    return tuple(str(labels[n]) for n in names)
+
+
+def _fmt_labels(names, key, extra=()):
+    pairs = list(zip(names, key)) + list(extra)
+    if not pairs:
+        return ''
+    body = ','.join('{}="{}"'.format(
+        n, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for n, v in pairs)
+    return '{' + body + '}'
+
+
+def _fmt_value(v):
+    if v == float('inf'):
+        return '+Inf'
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = 'untyped'
+    _child = None     # class of the per-label-set children
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def labels(self, **labels):
+        """The child for one label set; keep it to skip label handling on
+        hot paths."""
+        key = _label_key(self.label_names, labels)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children.setdefault(key, self._child(self, key))
+        return child
+
+    def _key(self, labels):
+        return _label_key(self.label_names, labels) if labels or self.label_names else ()
+
+
+class _CounterChild:
+    __slots__ = ('_metric', '_key')
+
+    def __init__(self, metric, key):
+        self._metric = metric
+        self._key = key
+
+    def inc(self, amount=1):
+        m = self._metric
+        with m._lock:
+            m._values[self._key] = m._values.get(self._key, 0) + amount
+
+    def set(self, value):
+        m = self._metric
+        with m._lock:
+            m._values[self._key] = value
+
+
+class Counter(_Metric):
+    kind = 'counter'
+    _child = _CounterChild
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_fmt_labels(self.label_names, k)} {_fmt_value(v)}"
+                                 for k, v in items]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class _HistogramChild:
+    __slots__ = ('_metric', '_state', '_buckets')
+
+    def __init__(self, metric, key):
+        self._metric = metric
+        self._buckets = metric.buckets
+        with metric._lock:
+            self._state = metric._values.setdefault(
+                key, [[0] * (len(metric.buckets) + 1), 0.0, 0])
+
+    def observe(self, value):
+        i = bisect.bisect_left(self._buckets, value)
+        state = self._state
+        with self._metric._lock:
+            state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+    _child = _HistogramChild
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        child = self.labels(**labels) if self.label_names else self._unlabelled()
+        child.observe(value)
+
+    def _unlabelled(self):
+        child = self._children.get(())
+        if child is None:
+            child = self._children.setdefault((), _HistogramChild(self, ()))
+        return child
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, ([*c], s, n)) for k, (c, s, n) in self._values.items())
+        lines = self._header()
+        for key, (counts, total, n) in items:
+            running = 0
+            for bound, c in zip(self.buckets + (float('inf'),), counts):
+                running += c
+                le = _fmt_labels(self.label_names, key, [('le', _fmt_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{le} {running}")
+            lbl = _fmt_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{lbl} {_fmt_value(total)}")
+            lines.append(f"{self.name}_count{lbl} {n}")
+        return lines
+
+
+class timed:
+    """Observe elapsed seconds into a histogram (or one of its label
+    children), as a context manager or decorator. Labels are fixed at
+    creation; on hot paths pass a child kept from labels().
+
+    When the block raises, the time goes to `error` instead if given.
+    `elapsed` holds the measured seconds after the block. As a context
+    manager an instance times one block at a time, so make one per use.
+    """
+
+    __slots__ = ('_observe', '_error', '_start', 'elapsed')
+
+    def __init__(self, histogram, error=None, **labels):
+        target = histogram.labels(**labels) if labels else histogram
+        self._observe = target.observe
+        self._error = error.observe if error is not None else self._observe
+        self._start = None
+        self.elapsed = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self._start
+        (self._observe if exc_type is None else self._error)(self.elapsed)
+        return False
+
+    def __call__(self, fn):
+        observe, error = self._observe, self._error
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                error(time.perf_counter() - started)
+                raise
+            observe(time.perf_counter() - started)
+            return result
+        return wrapper
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, labels, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labels, **kwargs)
+            elif not isinstance(metric, cls) or metric.label_names != tuple(labels):
+                raise ValueError(f"Metric {name} already registered differently")
+            return metric
+
+    def counter(self, name, help, labels=()):
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name, help, labels=()):
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def collect(self, name, fn):
+        """Call `fn()` at scrape time; it returns {metric_name: value} or
+        {metric_name: {label_value: value}} (labelled by `name`'s 'key'),
+        exported as gauges prefixed with `name`_."""
+        with self._lock:
+            self._collectors[name] = fn
+
+    def _collected(self):
+        lines = []
+        with self._lock:
+            collectors = list(self._collectors.items())
+        for prefix, fn in collectors:
+            try:
+                values = fn() or {}
+            except Exception as e:
+                print(f"✗ metrics collector {prefix} failed:", e)
+                continue
+            for field, value in sorted(values.items()):
+                name = f"{prefix}_{field}"
+                if isinstance(value, dict):
+                    rows = [(_fmt_labels(('key',), (str(k),)), v) for k, v in sorted(value.items())]
+                else:
+                    rows = [('', value)]
+                rows = [(lbl, v) for lbl, v in rows if isinstance(v, (int, float))]
+                if not rows:
+                    continue
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(f"{name}{lbl} {_fmt_value(float(v))}" for lbl, v in rows)
+        return lines
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        lines.extend(self._collected())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+collect = REGISTRY.collect
+render = REGISTRY.render
@@ -0,0 +1,92 @@
+# gauge_app/utils/phash.py
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def phash(image, hash_size=8, highfreq=4):
+    """64-bit DCT perceptual hash of a BGR or grayscale image, as an int.
+
+    Near-identical views (sensor noise, small exposure changes, JPEG
+    artefacts) hash a few bits apart; a different scene differs in many.
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    side = hash_size * highfreq
+    small = cv2.resize(image, (side, side), interpolation=cv2.INTER_AREA)
+    low = cv2.dct(np.float32(small))[:hash_size, :hash_size]
+    bits = (low > np.median(low)).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming(a, b):
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+class PerceptualCache:
+    """LRU cache looked up by perceptual-hash similarity.
+
+    `get(h)` returns the value of the closest unexpired entry within
+    `threshold` bits of `h`. Entries expire `ttl` seconds after they were
+    stored; the least recently used entry is evicted beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries=64, ttl=300.0, threshold=6):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries = OrderedDict()   # hash -> (stored_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, h):
+        now = time.time()
+        with self._lock:
+            best, best_d = None, self.threshold + 1
+            for key, (stored, _) in list(self._entries.items()):
+                if now - stored > self.ttl:
+                    del self._entries[key]
+                    self.expired += 1
+                    continue
+                d = hamming(h, key)
+                if d < best_d:
+                    best, best_d = key, d
+            if best is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best)
+            self.hits += 1
+            return self._entries[best][1]
+
+    def put(self, h, value):
+        with self._lock:
+            self._entries[h] = (time.time(), value)
+            self._entries.move_to_end(h)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'threshold': self.threshold,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'expired': self.expired,
+            'evictions': self.evictions,
+        }
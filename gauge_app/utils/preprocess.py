@@ -0,0 +1,136 @@
+# gauge_app/utils/preprocess.py
+"""Screenshot preprocessing pipeline.
+
+Frames are downsized to the target size first (INTER_AREA) and only the
+small grayscale image is filtered. A profile picks the filter steps:
+
+    default   CLAHE, bilateral filter, sharpen (the original look)
+    fast      CLAHE, sharpen
+    minimal   grayscale only
+
+The 'legacy' profile keeps the original full-resolution chain for
+comparison. Each Preprocessor holds its CLAHE object and output buffers,
+so one instance serves one caller at a time; borrow_preprocessor() hands
+them out from a shared pool.
+"""
+import threading
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+SHARPEN_KERNEL = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]], np.float32)
+
+PROFILES = {
+    'default': ('clahe', 'bilateral', 'sharpen'),
+    'fast': ('clahe', 'sharpen'),
+    'minimal': (),
+    'legacy': None,
+}
+
+
+def legacy_preprocess(frame, target_size=512.0):
+    """The original chain: filter at full resolution, then INTER_CUBIC."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+    eq = clahe.apply(gray)
+    denoised = cv2.bilateralFilter(eq, 9, 75, 75)
+    sharpened = cv2.filter2D(denoised, -1, SHARPEN_KERNEL)
+    processed = cv2.cvtColor(sharpened, cv2.COLOR_GRAY2BGR)
+
+    h, w = processed.shape[:2]
+    scale = target_size / max(h, w)
+    return cv2.resize(
+        processed,
+        (int(w * scale), int(h * scale)),
+        interpolation=cv2.INTER_CUBIC
+    )
+
+
+class Preprocessor:
+    """Downsize-then-filter pipeline for one profile.
+
+    run() returns a grayscale image of at most `target_size` on its long
+    side. The result lives in a reused buffer and is only valid until the
+    next run() on the same instance; copy it to keep it longer.
+    """
+
+    def __init__(self, profile='default', target_size=512, clip_limit=3.0,
+                 tile_grid=(8, 8), bilateral=(9, 75, 75)):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown preprocessing profile {profile!r}; "
+                             f"use one of {tuple(PROFILES)}")
+        self.profile = profile
+        self.steps = PROFILES[profile]
+        self.target_size = target_size
+        self.bilateral = bilateral
+        self._clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid)
+        self._shape = None
+        self._bufs = None
+
+    def _buffers(self, shape):
+        h, w = shape[:2]
+        scale = min(1.0, self.target_size / max(h, w))
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        if self._shape != (shape, size):
+            self._shape = (shape, size)
+            small_h, small_w = size[1], size[0]
+            self._bufs = {
+                'size': size,
+                'small': np.empty((small_h, small_w) + tuple(shape[2:]), np.uint8),
+                'gray': np.empty((small_h, small_w), np.uint8),
+                'a': np.empty((small_h, small_w), np.uint8),
+                'b': np.empty((small_h, small_w), np.uint8),
+            }
+        return self._bufs
+
+    def run(self, frame):
+        if self.steps is None:
+            return legacy_preprocess(frame, self.target_size)
+
+        bufs = self._buffers(frame.shape)
+        small = cv2.resize(frame, bufs['size'], dst=bufs['small'],
+                           interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            cur = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=bufs['gray'])
+        else:
+            cur = small
+
+        # ping-pong between two buffers; bilateral can't run in place
+        out, spare = bufs['a'], bufs['b']
+        for step in self.steps:
+            if step == 'clahe':
+                cur = self._clahe.apply(cur, dst=out)
+            elif step == 'bilateral':
+                d, sigma_color, sigma_space = self.bilateral
+                cur = cv2.bilateralFilter(cur, d, sigma_color, sigma_space, dst=out)
+            elif step == 'sharpen':
+                cur = cv2.filter2D(cur, -1, SHARPEN_KERNEL, dst=out)
+            out, spare = spare, out
+        return cur
+
+
+# Idle Preprocessors by (profile, target_size). A pool rather than
+# thread-locals: the threaded server starts a new thread per request.
+_pool = {}
+_pool_lock = threading.Lock()
+POOL_MAX = 4     # idle instances kept per key
+
+
+@contextmanager
+def borrow_preprocessor(profile='default', target_size=512):
+    """A Preprocessor for `profile`, exclusive to the caller inside the
+    block (so run()'s output stays valid there), then returned to the pool."""
+    key = (profile, target_size)
+    with _pool_lock:
+        idle = _pool.get(key)
+        pre = idle.pop() if idle else None
+    if pre is None:
+        pre = Preprocessor(profile, target_size)
+    try:
+        yield pre
+    finally:
+        with _pool_lock:
+            idle = _pool.setdefault(key, [])
+            if len(idle) < POOL_MAX:
+                idle.append(pre)
@@ -0,0 +1,129 @@
+# gauge_app/utils/running_stats.py
+import math
+import threading
+from collections import deque
+
+
+class RunningStats:
+    """Streaming count/mean/variance (Welford), min, max and last value."""
+
+    __slots__ = ('count', 'mean', '_m2', 'min', 'max', 'last', 'last_time')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.last = None
+        self.last_time = None
+
+    def update(self, ts, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.last = value
+        self.last_time = ts
+
+    @property
+    def variance(self):
+        """Sample variance (0.0 with fewer than two readings)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'variance': self.variance,
+            'std': self.std,
+            'min': self.min,
+            'max': self.max,
+            'last': self.last,
+            'last_time': self.last_time,
+        }
+
+
+class TumblingWindow:
+    """RunningStats rolled up over aligned, non-overlapping windows.
+
+    `size` is the window length in seconds; the `keep` most recent closed
+    windows are retained.
+    """
+
+    def __init__(self, size, keep=60):
+        self.size = size
+        self.start = None
+        self.current = RunningStats()
+        self.closed = deque(maxlen=keep)   # (window_start, RunningStats)
+
+    def update(self, ts, value):
+        start = ts - (ts % self.size)
+        if start != self.start:
+            if self.current.count:
+                self.closed.append((self.start, self.current))
+                self.current = RunningStats()
+            self.start = start
+        self.current.update(ts, value)
+
+    def rollups(self, include_current=True):
+        """Return [{'start', 'end', ...stats}] oldest first."""
+        windows = list(self.closed)
+        if include_current and self.current.count:
+            windows.append((self.start, self.current))
+        return [
+            dict(stats.as_dict(), start=start, end=start + self.size)
+            for start, stats in windows
+        ]
+
+
+class SensorAggregator:
+    """Per-topic RunningStats plus tumbling-window rollups.
+
+    Updates are O(1) and every read is O(1) in the number of readings.
+    """
+
+    def __init__(self, windows=(60, 3600), keep=60):
+        self.windows = tuple(windows)
+        self.keep = keep
+        self._totals = {}
+        self._rollups = {}
+        self._lock = threading.Lock()
+
+    def update(self, topic, ts, value):
+        with self._lock:
+            totals = self._totals.get(topic)
+            if totals is None:
+                totals = self._totals[topic] = RunningStats()
+                self._rollups[topic] = {
+                    w: TumblingWindow(w, self.keep) for w in self.windows
+                }
+            totals.update(ts, value)
+            for window in self._rollups[topic].values():
+                window.update(ts, value)
+
+    def summary(self, topic):
+        """Return the all-time stats dict for `topic`, or None."""
+        with self._lock:
+            totals = self._totals.get(topic)
+            return totals.as_dict() if totals else None
+
+    def summaries(self):
+        with self._lock:
+            return {t: s.as_dict() for t, s in self._totals.items()}
+
+    def rollups(self, topic, window):
+        """Return the closed + current windows of `window` seconds."""
+        with self._lock:
+            windows = self._rollups.get(topic)
+            if not windows or window not in windows:
+                return []
+            return windows[window].rollups()
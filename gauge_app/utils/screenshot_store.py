@@ -0,0 +1,185 @@
+# gauge_app/utils/screenshot_store.py
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+# On-disk layout:
+#   <root>/<hh>/<sha256>.jpg        full JPEG, named by its content hash
+#   <root>/<hh>/<sha256>.thumb.jpg  thumbnail of the same image
+#   <root>/index.jsonl              one metadata record per screenshot
+# Identical images share one file; it is deleted with its last entry.
+INDEX = 'index.jsonl'
+
+
+class ScreenshotStore:
+    """Bounded screenshot log with full images spilled to disk.
+
+    Each entry is a dict with 'time', 'response', 'digest', 'path',
+    'size', 'width', 'height' and 'thumb' (small JPEG bytes, kept in
+    memory) plus any extra fields given to add(). The oldest entries are
+    dropped once there are more than `max_count` or their images take
+    more than `max_bytes` on disk. Indexing and len() work like the list
+    this replaces.
+    """
+
+    def __init__(self, root, max_count=500, max_bytes=200 * 2**20,
+                 thumb_size=160, thumb_quality=60):
+        self.root = root
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+        self.thumb_size = thumb_size
+        self.thumb_quality = thumb_quality
+        self._entries = []
+        self._refs = {}          # digest -> entries using the file
+        self._bytes = 0          # disk bytes of distinct full images
+        self._index_lines = 0
+        self._lock = threading.Lock()
+        self.evicted = 0
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, i):
+        return self._entries[i]
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def snapshot(self):
+        """A copy of the current entries, oldest first."""
+        with self._lock:
+            return list(self._entries)
+
+    @property
+    def total_bytes(self):
+        return self._bytes
+
+    def _paths(self, digest):
+        directory = os.path.join(self.root, digest[:2])
+        return (os.path.join(directory, digest + '.jpg'),
+                os.path.join(directory, digest + '.thumb.jpg'))
+
+    def _thumbnail(self, image_bytes):
+        img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            return b'', 0, 0
+        h, w = img.shape[:2]
+        scale = min(1.0, self.thumb_size / max(h, w))
+        small = cv2.resize(img, (max(1, int(w * scale)), max(1, int(h * scale))),
+                           interpolation=cv2.INTER_AREA)
+        ok, buf = cv2.imencode('.jpg', small, [cv2.IMWRITE_JPEG_QUALITY, self.thumb_quality])
+        return (buf.tobytes() if ok else b''), w, h
+
+    def add(self, image_bytes, response, time=None, **extra):
+        """Store one JPEG and its answer; returns the new entry."""
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        path, thumb_path = self._paths(digest)
+        thumb, w, h = self._thumbnail(image_bytes)
+        entry = dict(extra, time=time or datetime.now(), response=response,
+                     digest=digest, path=path, size=len(image_bytes),
+                     width=w, height=h, thumb=thumb)
+
+        with self._lock:
+            if digest not in self._refs:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path + '.tmp', 'wb') as f:
+                    f.write(image_bytes)
+                os.replace(path + '.tmp', path)
+                with open(thumb_path, 'wb') as f:
+                    f.write(thumb)
+                self._refs[digest] = 0
+                self._bytes += len(image_bytes)
+            self._refs[digest] += 1
+            self._entries.append(entry)
+            self._append_index(entry)
+            self._evict()
+        return entry
+
+    def read_image(self, entry):
+        """Full JPEG bytes of an entry, or None if it is no longer on disk."""
+        try:
+            with open(entry['path'], 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_count
+                                 or self._bytes > self.max_bytes):
+            old = self._entries.pop(0)
+            self.evicted += 1
+            digest = old['digest']
+            self._refs[digest] -= 1
+            if self._refs[digest]:
+                continue
+            del self._refs[digest]
+            self._bytes -= old['size']
+            for p in self._paths(digest):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+            try:
+                os.rmdir(os.path.dirname(p))   # only succeeds once empty
+            except OSError:
+                pass
+        if self._index_lines > 2 * max(self.max_count, 1):
+            self._rewrite_index()
+
+    # --- index ---
+
+    @staticmethod
+    def _record(entry):
+        rec = {k: v for k, v in entry.items() if k not in ('thumb', 'path')}
+        rec['time'] = entry['time'].isoformat()
+        return rec
+
+    def _append_index(self, entry):
+        with open(os.path.join(self.root, INDEX), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self._record(entry)) + '\n')
+        self._index_lines += 1
+
+    def _rewrite_index(self):
+        path = os.path.join(self.root, INDEX)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            for entry in self._entries:
+                f.write(json.dumps(self._record(entry)) + '\n')
+        os.replace(path + '.tmp', path)
+        self._index_lines = len(self._entries)
+
+    def _load(self):
+        """Rebuild entries from the index, skipping images no longer on disk."""
+        path = os.path.join(self.root, INDEX)
+        if not os.path.exists(path):
+            return
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                full, thumb_path = self._paths(rec['digest'])
+                if not os.path.exists(full):
+                    continue
+                try:
+                    with open(thumb_path, 'rb') as t:
+                        thumb = t.read()
+                except OSError:
+                    thumb = b''
+                rec.update(time=datetime.fromisoformat(rec['time']),
+                           path=full, thumb=thumb)
+                self._entries.append(rec)
+                if rec['digest'] not in self._refs:
+                    self._refs[rec['digest']] = 0
+                    self._bytes += rec['size']
+                self._refs[rec['digest']] += 1
+        self._evict()
+        self._rewrite_index()
+        print(f"✓ Loaded {len(self._entries)} screenshots from {self.root}")
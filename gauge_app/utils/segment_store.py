@@ -0,0 +1,315 @@
+# gauge_app/utils/segment_store.py
+import os
+import threading
+import time
+from array import array
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+# On-disk layout, one directory per topic:
+#   <root>/<quoted topic>/active.ts, active.val          (being appended)
+#   <root>/<quoted topic>/seg-<first_ms>-<last_ms>.ts/.val (sealed, read-only)
+# .ts holds float64 epoch seconds and .val float64 values, little-endian,
+# row i of one file matching row i of the other.
+DTYPE = np.dtype('<f8')
+ROW_BYTES = DTYPE.itemsize
+ACTIVE = 'active'
+
+
+def _map(path):
+    """Memory-map a column file read-only (empty files give an empty array)."""
+    if os.path.getsize(path) < ROW_BYTES:
+        return np.empty(0, DTYPE)
+    return np.memmap(path, dtype=DTYPE, mode='r')
+
+
+class _Segment:
+    """A sealed, immutable pair of column files."""
+
+    def __init__(self, base, first, last):
+        self.base = base
+        self.first = first
+        self.last = last
+        self._ts = None
+        self._vals = None
+
+    @classmethod
+    def from_name(cls, directory, name):
+        _, first_ms, last_ms = name.split('-')
+        return cls(os.path.join(directory, name),
+                   int(first_ms) / 1000.0, int(last_ms) / 1000.0)
+
+    @property
+    def ts(self):
+        if self._ts is None:
+            self._ts = _map(self.base + '.ts')
+        return self._ts
+
+    @property
+    def vals(self):
+        if self._vals is None:
+            self._vals = _map(self.base + '.val')
+        return self._vals
+
+    @property
+    def rows(self):
+        return min(len(self.ts), len(self.vals))
+
+    def slice(self, start, end):
+        ts = self.ts
+        lo = 0 if start is None else np.searchsorted(ts, start, side='left')
+        hi = len(ts) if end is None else np.searchsorted(ts, end, side='right')
+        return np.array(ts[lo:hi]), np.array(self.vals[lo:hi])
+
+    def close(self):
+        self._ts = self._vals = None
+
+    def delete(self):
+        self.close()
+        for ext in ('.ts', '.val'):
+            try:
+                os.remove(self.base + ext)
+            except FileNotFoundError:
+                pass
+
+
+def _seal_name(first, last):
+    return f"seg-{int(first * 1000):015d}-{int(last * 1000):015d}"
+
+
+class TopicLog:
+    """Append-only columnar log for one topic."""
+
+    def __init__(self, directory, max_rows, max_seconds):
+        self.directory = directory
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self.lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+        self.sealed = []
+        for name in os.listdir(directory):
+            if name.endswith('.tmp'):
+                os.remove(os.path.join(directory, name))
+            elif name.startswith('seg-') and name.endswith('.ts'):
+                base = name[:-3]
+                if os.path.exists(os.path.join(directory, base + '.val')):
+                    self.sealed.append(_Segment.from_name(directory, base))
+        self.sealed.sort(key=lambda s: (s.first, -s.last))
+        self._drop_covered()
+
+        self._pending_ts = array('d')
+        self._pending_vals = array('d')
+        self._open_active()
+
+    def _drop_covered(self):
+        # A crash mid-compaction can leave sources next to the merged file
+        kept = []
+        for seg in self.sealed:
+            if kept and seg.last <= kept[-1].last:
+                seg.delete()
+            else:
+                kept.append(seg)
+        self.sealed = kept
+
+    def _active_path(self, ext):
+        return os.path.join(self.directory, ACTIVE + ext)
+
+    def _open_active(self):
+        ts_path, val_path = self._active_path('.ts'), self._active_path('.val')
+        for path in (ts_path, val_path):
+            open(path, 'ab').close()
+        # Trim torn writes so both columns have the same row count
+        rows = min(os.path.getsize(ts_path), os.path.getsize(val_path)) // ROW_BYTES
+        for path in (ts_path, val_path):
+            if os.path.getsize(path) != rows * ROW_BYTES:
+                os.truncate(path, rows * ROW_BYTES)
+        self.active_rows = rows
+        self.active_first = float(_map(ts_path)[0]) if rows else None
+        self._ts_file = open(ts_path, 'ab')
+        self._val_file = open(val_path, 'ab')
+
+    def append(self, ts, value):
+        with self.lock:
+            if self.active_first is None:
+                self.active_first = ts
+            elif (self.active_rows >= self.max_rows
+                  or ts - self.active_first >= self.max_seconds):
+                self.roll()
+                self.active_first = ts
+            self._pending_ts.append(ts)
+            self._pending_vals.append(value)
+            self.active_rows += 1
+            if len(self._pending_ts) >= 1024:
+                self.flush()
+
+    def flush(self):
+        with self.lock:
+            if not self._pending_ts:
+                return
+            self._ts_file.write(self._pending_ts.tobytes())
+            self._val_file.write(self._pending_vals.tobytes())
+            self._ts_file.flush()
+            self._val_file.flush()
+            del self._pending_ts[:]
+            del self._pending_vals[:]
+
+    def roll(self):
+        """Seal the active segment and start a new one."""
+        with self.lock:
+            self.flush()
+            self._ts_file.close()
+            self._val_file.close()
+            if self.active_rows:
+                ts = _map(self._active_path('.ts'))
+                first, last = float(ts[0]), float(ts[-1])
+                del ts
+                base = os.path.join(self.directory, _seal_name(first, last))
+                os.replace(self._active_path('.val'), base + '.val')
+                os.replace(self._active_path('.ts'), base + '.ts')
+                self.sealed.append(_Segment(base, first, last))
+            self._open_active()
+
+    def query(self, start=None, end=None):
+        """Return copies of (timestamps, values) within [start, end]."""
+        with self.lock:
+            self.flush()
+            parts = []
+            for seg in self.sealed:
+                if (start is not None and seg.last < start) or \
+                   (end is not None and seg.first > end):
+                    continue
+                parts.append(seg.slice(start, end))
+            if self.active_rows:
+                active = _Segment(os.path.join(self.directory, ACTIVE),
+                                  self.active_first, None)
+                parts.append(active.slice(start, end))
+                active.close()
+        if not parts:
+            return np.empty(0), np.empty(0)
+        return (np.concatenate([p[0] for p in parts]),
+                np.concatenate([p[1] for p in parts]))
+
+    def compact(self, target_rows, cutoff=None):
+        """Drop segments older than `cutoff`, then merge runs of small ones."""
+        with self.lock:
+            if cutoff is not None:
+                expired = [s for s in self.sealed if s.last < cutoff]
+                for seg in expired:
+                    seg.delete()
+                self.sealed = [s for s in self.sealed if s.last >= cutoff]
+
+            merged, run, run_rows = [], [], 0
+            for seg in self.sealed:
+                rows = seg.rows
+                if run and run_rows + rows > target_rows:
+                    merged.append(self._merge(run) if len(run) > 1 else run[0])
+                    run, run_rows = [], 0
+                run.append(seg)
+                run_rows += rows
+            if run:
+                merged.append(self._merge(run) if len(run) > 1 else run[0])
+            self.sealed = merged
+
+    def _merge(self, run):
+        base = os.path.join(self.directory, _seal_name(run[0].first, run[-1].last))
+        for ext, column in (('.val', 'vals'), ('.ts', 'ts')):
+            with open(base + ext + '.tmp', 'wb') as f:
+                for seg in run:
+                    f.write(np.asarray(getattr(seg, column)[:seg.rows]).tobytes())
+        # .ts last: a merged segment only counts once both columns are in place
+        os.replace(base + '.val.tmp', base + '.val')
+        os.replace(base + '.ts.tmp', base + '.ts')
+        for seg in run:
+            if seg.base != base:
+                seg.delete()
+        return _Segment(base, run[0].first, run[-1].last)
+
+    def close(self):
+        with self.lock:
+            self.flush()
+            self._ts_file.close()
+            self._val_file.close()
+            for seg in self.sealed:
+                seg.close()
+
+
+class SegmentStore:
+    """Persistent per-topic sensor history built from TopicLogs.
+
+    Segments roll over after `max_rows` readings or `max_seconds` of data;
+    a background thread flushes appends every `flush_interval` seconds and
+    compacts/expires sealed segments every `compact_interval` seconds.
+    """
+
+    def __init__(self, root, max_rows=100_000, max_seconds=3600,
+                 retention=30 * 86400, flush_interval=1.0,
+                 compact_interval=600):
+        self.root = root
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self.retention = retention
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self._logs = {}
+        self._lock = threading.Lock()
+        self._running = False
+        os.makedirs(root, exist_ok=True)
+        for name in os.listdir(root):
+            if os.path.isdir(os.path.join(root, name)):
+                self._log(unquote(name))
+
+    def _log(self, topic):
+        log = self._logs.get(topic)
+        if log is None:
+            with self._lock:
+                log = self._logs.get(topic)
+                if log is None:
+                    log = self._logs[topic] = TopicLog(
+                        os.path.join(self.root, quote(topic, safe='')),
+                        self.max_rows, self.max_seconds)
+        return log
+
+    def topics(self):
+        return list(self._logs)
+
+    def append(self, topic, ts, value):
+        self._log(topic).append(ts, value)
+
+    def query(self, topic, start=None, end=None):
+        log = self._logs.get(topic)
+        if log is None:
+            return np.empty(0), np.empty(0)
+        return log.query(start, end)
+
+    def flush(self):
+        for log in list(self._logs.values()):
+            log.flush()
+
+    def compact(self):
+        cutoff = time.time() - self.retention if self.retention else None
+        for log in list(self._logs.values()):
+            log.compact(self.max_rows, cutoff)
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        last_compact = time.monotonic()
+        while self._running:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+                if time.monotonic() - last_compact >= self.compact_interval:
+                    self.compact()
+                    last_compact = time.monotonic()
+            except Exception as e:
+                print("✗ history store maintenance failed:", e)
+
+    def close(self):
+        self._running = False
+        for log in list(self._logs.values()):
+            log.close()
@@ -0,0 +1,72 @@
+# gauge_app/utils/synthetic_gauge.py
+import math
+
+import cv2
+import numpy as np
+
+RED = (0, 0, 220)   # BGR, inside findRed()'s hue band
+LIGHT = (245, 245, 245)
+
+
+def reading_to_angle(pct):
+    """0–100 gauge reading to a clockwise angle (degrees) from 12 o'clock."""
+    return (pct % 100) * 3.6
+
+
+def render_background(size=(900, 1600), clutter=0, seed=0):
+    """Grey (h, w) frame with `clutter` random non-red lines."""
+    rng = np.random.default_rng(seed)
+    h, w = size
+    image = np.full((h, w, 3), 90, np.uint8)
+    for _ in range(clutter):
+        p1 = (int(rng.integers(0, w)), int(rng.integers(0, h)))
+        p2 = (int(rng.integers(0, w)), int(rng.integers(0, h)))
+        colour = tuple(int(c) for c in rng.integers(0, 160, 3))
+        colour = (colour[0], colour[1], min(colour[2], colour[1]))  # never red
+        cv2.line(image, p1, p2, colour, int(rng.integers(1, 4)))
+    return image
+
+
+def render_gauge(pct, size=(900, 1600), center=None, radius=75, ticks=36,
+                 clutter=0, seed=0, image=None):
+    """Draw a dial whose needle reads `pct` (0–100).
+
+    The dial is laid out for read_regular_gauge(): a solid red face with
+    a light tapered needle, so findRed() sees one filled circle and
+    findAngle() two long needle edges that meet at the tip. The needle
+    runs 0.3r past the hub to keep both edges longer than the reader's
+    minimum line length. `ticks` light tick marks sit on a dark bezel
+    outside the face, out of the red mask. Keep `radius` under about
+    80 px: on bigger dials the needle edges add off-centre Hough circles
+    further than findCircles()' minDist, and the reader picks those.
+
+    The needle convention matches findAngle(): 0 at 12 o'clock, growing
+    clockwise. `clutter` random non-red lines make the frame realistically
+    busy. Draws onto `image` if given, otherwise on a new grey frame of
+    `size` (h, w); returns the frame.
+    """
+    if image is None:
+        image = render_background(size, clutter, seed)
+    h, w = image.shape[:2]
+    if center is None:
+        center = (w // 2, h // 2)
+    cx, cy = center
+
+    cv2.circle(image, center, int(1.15 * radius), (40, 40, 40), -1)
+    for k in range(ticks):
+        a = math.radians(k * 360.0 / ticks)
+        outer = radius * (1.13 if k % 3 == 0 else 1.08)
+        p1 = (int(cx + 1.02 * radius * math.sin(a)), int(cy - 1.02 * radius * math.cos(a)))
+        p2 = (int(cx + outer * math.sin(a)), int(cy - outer * math.cos(a)))
+        cv2.line(image, p1, p2, LIGHT, 2)
+    cv2.circle(image, center, radius, RED, -1)
+
+    a = math.radians(reading_to_angle(pct))
+    sin, cos = math.sin(a), math.cos(a)
+    tip = (cx + 0.9 * radius * sin, cy - 0.9 * radius * cos)
+    bx, by = cx - 0.3 * radius * sin, cy + 0.3 * radius * cos
+    half = 0.14 * radius        # half-width of the needle at its base
+    needle = np.array([tip, (bx + half * cos, by + half * sin),
+                       (bx - half * cos, by - half * sin)])
+    cv2.fillPoly(image, [np.round(needle).astype(np.int32)], LIGHT)
+    return image
@@ -0,0 +1,150 @@
+# gauge_app/utils/timeseries.py
+import threading
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity (timestamp, value) series backed by NumPy arrays.
+
+    Timestamps are epoch seconds (float64) and must arrive in order.
+    Appends are O(1); once `capacity` is reached the oldest sample is
+    overwritten. If `max_age` (seconds) is set, samples older than
+    `newest - max_age` are dropped as new ones arrive.
+    """
+
+    def __init__(self, capacity, max_age=None):
+        self.capacity = int(capacity)
+        self.max_age = max_age
+        self._ts = np.empty(self.capacity, dtype=np.float64)
+        self._vals = np.empty(self.capacity, dtype=np.float64)
+        self._start = 0   # index of the oldest sample
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def append(self, ts, value):
+        with self._lock:
+            end = (self._start + self._count) % self.capacity
+            self._ts[end] = ts
+            self._vals[end] = value
+            if self._count < self.capacity:
+                self._count += 1
+            else:
+                self._start = (self._start + 1) % self.capacity
+
+            # Age out from the front; amortised O(1) per append
+            if self.max_age is not None:
+                cutoff = ts - self.max_age
+                while self._count > 1 and self._ts[self._start] < cutoff:
+                    self._start = (self._start + 1) % self.capacity
+                    self._count -= 1
+
+    def extend(self, ts, values):
+        """Append arrays of in-order samples in one vectorised write."""
+        ts = np.asarray(ts, dtype=np.float64)[-self.capacity:]
+        values = np.asarray(values, dtype=np.float64)[-self.capacity:]
+        n = len(ts)
+        if not n:
+            return
+        with self._lock:
+            end = (self._start + self._count) % self.capacity
+            idx = (end + np.arange(n)) % self.capacity
+            self._ts[idx] = ts
+            self._vals[idx] = values
+            overflow = self._count + n - self.capacity
+            if overflow > 0:
+                self._start = (self._start + overflow) % self.capacity
+                self._count = self.capacity
+            else:
+                self._count += n
+
+            if self.max_age is not None:
+                cutoff = ts[-1] - self.max_age
+                while self._count > 1 and self._ts[self._start] < cutoff:
+                    self._start = (self._start + 1) % self.capacity
+                    self._count -= 1
+
+    def first(self):
+        """Return the oldest (ts, value) pair, or None if empty."""
+        with self._lock:
+            if not self._count:
+                return None
+            return float(self._ts[self._start]), float(self._vals[self._start])
+
+    def last(self):
+        """Return the newest (ts, value) pair, or None if empty."""
+        with self._lock:
+            if not self._count:
+                return None
+            i = (self._start + self._count - 1) % self.capacity
+            return float(self._ts[i]), float(self._vals[i])
+
+    def _ordered(self, arr):
+        end = self._start + self._count
+        if end <= self.capacity:
+            return arr[self._start:end]
+        return np.concatenate((arr[self._start:], arr[:end - self.capacity]))
+
+    def window(self, start=None, end=None):
+        """Return (timestamps, values) with start <= ts <= end, oldest first.
+
+        Both arrays are copies, safe to use after the buffer moves on.
+        """
+        with self._lock:
+            ts = self._ordered(self._ts)
+            vals = self._ordered(self._vals)
+            lo = 0 if start is None else np.searchsorted(ts, start, side='left')
+            hi = len(ts) if end is None else np.searchsorted(ts, end, side='right')
+            return ts[lo:hi].copy(), vals[lo:hi].copy()
+
+    def timestamps(self):
+        return self.window()[0]
+
+    def values(self):
+        return self.window()[1]
+
+
+class TimeSeriesStore:
+    """One RingBuffer per topic, sharing capacity and retention settings."""
+
+    def __init__(self, topics=(), capacity=100_000, max_age=None):
+        self.capacity = capacity
+        self.max_age = max_age
+        self._series = {t: RingBuffer(capacity, max_age) for t in topics}
+        self._lock = threading.Lock()
+
+    def __contains__(self, topic):
+        return topic in self._series
+
+    def __getitem__(self, topic):
+        return self._series[topic]
+
+    def __iter__(self):
+        return iter(list(self._series))
+
+    def __len__(self):
+        return len(self._series)
+
+    def items(self):
+        return list(self._series.items())
+
+    def ensure(self, topic):
+        """Return the buffer for `topic`, creating it if needed."""
+        buf = self._series.get(topic)
+        if buf is None:
+            with self._lock:
+                buf = self._series.setdefault(
+                    topic, RingBuffer(self.capacity, self.max_age))
+        return buf
+
+    def append(self, topic, ts, value):
+        self._series[topic].append(ts, value)
+
+    def window(self, topic, start=None, end=None):
+        return self._series[topic].window(start, end)
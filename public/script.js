@@ -1,9 +1,15 @@
 window.addEventListener("DOMContentLoaded", function () {
         // --- Initialize Socket.IO ---
-        const socket = io();
+        // On every (re)connect the server sends a sensorSnapshot, or just a
+        // sensorDelta when it still has everything after our last batch
+        const syncState = { epoch: null, seq: null, anomaly: 0 };
+        const socket = io({
+          auth: (cb) => cb({ epoch: syncState.epoch, seq: syncState.seq, anomaly: syncState.anomaly }),
+        });
         // throttle settings
         let lastControllerEmitTime = 0;
-        const emitInterval = 1000 / 3; // ≈333 ms between sends
+        // the server keeps only the newest command and publishes at its own tick
+        const emitInterval = 50; // ms between sends
         // --- Handle sensor data from the server ---
         const sensorMapping = {
           temperaturapeacock: {
@@ -38,12 +44,152 @@ window.addEventListener("DOMContentLoaded", function () {
           },
         };
 
-        socket.on("sensorData", ({ topic, data }) => {
-          console.log("socket → sensorData", topic, data);
-          if (sensorMapping[topic]) {
-            sensorMapping[topic].element.textContent =
-              sensorMapping[topic].format(data);
+        function renderSensor(topic, data) {
+          if (!sensorMapping[topic]) return;
+          const cfg = THRESHOLDS[topic];
+          const el = sensorMapping[topic].element;
+          el.textContent = sensorMapping[topic].format(data);
+
+          // reset
+          el.classList.remove("value-increasing", "value-decreasing");
+
+          if (cfg) {
+            if (data > cfg.high) el.classList.add("value-increasing");
+            if (data < cfg.low) el.classList.add("value-decreasing");
+          }
+        }
+
+        // --- Sparklines: last reading per fixed time bucket ---
+        const sparklines = {}; // topic -> { start, step, values, size }
+
+        function drawSparkline(topic) {
+          const line = sparklines[topic];
+          const item = sensorMapping[topic] && sensorMapping[topic].element.closest(".stat-item");
+          if (!line || !item) return;
+          let svg = item.querySelector("svg.sparkline");
+          if (!svg) {
+            svg = document.createElementNS("http://www.w3.org/2000/svg", "svg");
+            svg.setAttribute("class", "sparkline");
+            svg.setAttribute("viewBox", "0 0 100 20");
+            svg.setAttribute("preserveAspectRatio", "none");
+            svg.appendChild(document.createElementNS("http://www.w3.org/2000/svg", "polyline"));
+            item.appendChild(svg);
+          }
+          const vals = line.values.filter((v) => typeof v === "number");
+          const lo = Math.min(...vals), hi = Math.max(...vals);
+          const n = Math.max(line.size - 1, 1);
+          const points = line.values
+            .map((v, i) => typeof v === "number"
+              ? `${(i / n) * 100},${hi > lo ? 19 - ((v - lo) / (hi - lo)) * 18 : 10}`
+              : null)
+            .filter(Boolean);
+          svg.firstChild.setAttribute("points", points.join(" "));
+        }
+
+        // Replace buckets from `update.start` onwards, keeping `size` buckets
+        function mergeSparkline(topic, update) {
+          let line = sparklines[topic];
+          if (!line || line.step !== update.step) {
+            line = sparklines[topic] = { start: update.start, step: update.step, values: [], size: 0 };
+          }
+          const offset = Math.round((update.start - line.start) / line.step);
+          if (offset < 0) {
+            line.values = Array(-offset).fill(null).concat(line.values);
+            line.start = update.start;
+          }
+          line.values.length = Math.max(offset, 0);
+          line.values.push(...update.values);
+          line.size = Math.max(line.size, update.values.length);
+          const extra = line.values.length - line.size;
+          if (extra > 0) {
+            line.values.splice(0, extra);
+            line.start += extra * line.step;
+          }
+          drawSparkline(topic);
+        }
+
+        function pushSparkline(topic, value, time) {
+          const line = sparklines[topic];
+          if (!line || typeof value !== "number") return;
+          const bucket = Math.floor(time / line.step) * line.step;
+          const i = Math.round((bucket - line.start) / line.step);
+          if (i < line.values.length - 1) {
+            if (i >= 0) line.values[i] = value;
+          } else {
+            mergeSparkline(topic, { start: bucket, step: line.step, values: [value] });
+            return;
+          }
+          drawSparkline(topic);
+        }
+
+        // --- Unacknowledged anomalies, shown as a count on the logs button ---
+        const anomalies = new Map(); // id -> event
+        const logsButton = document.getElementById("view-logs-panel");
+        const anomalyBadge = document.createElement("span");
+        anomalyBadge.className = "anomaly-count";
+        if (logsButton) logsButton.appendChild(anomalyBadge);
+
+        function addAnomalies(events) {
+          for (const e of events) {
+            anomalies.set(e.id, e);
+            syncState.anomaly = Math.max(syncState.anomaly, e.id);
+          }
+          anomalyBadge.textContent = anomalies.size ? anomalies.size : "";
+        }
+        function dropAnomalies(keep) {
+          for (const id of [...anomalies.keys()]) if (!keep(id)) anomalies.delete(id);
+          anomalyBadge.textContent = anomalies.size ? anomalies.size : "";
+        }
+
+        socket.on("sensorSnapshot", (snap) => {
+          syncState.epoch = snap.epoch;
+          syncState.seq = snap.seq;
+          for (const [topic, data] of Object.entries(snap.readings)) renderSensor(topic, data);
+          for (const topic of Object.keys(sparklines)) delete sparklines[topic];
+          for (const [topic, line] of Object.entries(snap.sparklines)) mergeSparkline(topic, line);
+          anomalies.clear();
+          syncState.anomaly = 0;
+          addAnomalies(snap.anomalies);
+        });
+
+        socket.on("sensorDelta", (delta) => {
+          syncState.seq = delta.seq;
+          for (const [topic, data] of Object.entries(delta.readings)) renderSensor(topic, data);
+          for (const [topic, line] of Object.entries(delta.sparklines)) mergeSparkline(topic, line);
+          const unacked = new Set(delta.unacknowledged);
+          dropAnomalies((id) => unacked.has(id));
+          addAnomalies(delta.anomalies);
+        });
+
+        socket.on("anomalies", (events) => addAnomalies(events));
+        socket.on("anomaliesAcked", ({ ids }) => {
+          const acked = new Set(ids);
+          dropAnomalies((id) => !acked.has(id));
+        });
+
+        // The server coalesces readings and pushes the latest per topic
+        socket.on("sensorDataBatch", ({ readings, time, seq }) => {
+          if (seq !== undefined) {
+            if (syncState.seq !== null && seq <= syncState.seq) return;
+            syncState.seq = seq;
           }
+          for (const [topic, data] of Object.entries(readings)) {
+            renderSensor(topic, data);
+            pushSparkline(topic, data, time);
+          }
+        });
+        socket.on("sensorData", ({ topic, data }) => renderSensor(topic, data));
+
+        // On-device dial reading from the camera feed
+        const gaugeValue = document.getElementById("gauge-value");
+        // Single-gauge mode reports one topic; multi-gauge mode one per dial
+        const gaugeReadings = {};
+        socket.on("gaugeReading", ({ topic, value }) => {
+          gaugeReadings[topic] = value === null ? "--" : value + "%";
+          const topics = Object.keys(gaugeReadings).sort();
+          gaugeValue.textContent = topics.length === 1
+            ? gaugeReadings[topics[0]]
+            : topics.map((t) => t.split("/").pop() + ": " + gaugeReadings[t]).join("  ");
         });
 
         // --- Widget Toggle Functionality ---
@@ -127,7 +273,7 @@ window.addEventListener("DOMContentLoaded", function () {
             ];
             const now = Date.now();
             if (now - lastControllerEmitTime >= emitInterval) {
-              socket.emit("controllerData", joystickData);
+              socket.emit("controllerData", { axes: joystickData, t: now });
               lastControllerEmitTime = now;
             }
           } else {
@@ -141,15 +287,53 @@ window.addEventListener("DOMContentLoaded", function () {
         requestAnimationFrame(updateGamepad);
         const streamImg = document.getElementById("server-stream");
 
-        async function onProcessClick() {
-       const res = await fetch('/screenshot');
-       const { response, error } = await res.json();
-       if (error) {
-        console.error(error);
-          return;
+        // Screenshot inspection runs as a server job; the answer comes back
+        // to this socket as a "screenshotResult" event. Only one request in
+        // flight at a time.
+        const screenshotWaiters = {};
+        let screenshotPending = null;
+
+        socket.on("screenshotResult", (job) => {
+          const resolve = screenshotWaiters[job.job_id];
+          if (resolve) {
+            delete screenshotWaiters[job.job_id];
+            resolve(job);
+          }
+        });
+
+        function requestScreenshot() {
+          if (screenshotPending) return screenshotPending;
+          screenshotPending = (async () => {
+            const sid = encodeURIComponent(socket.id || "");
+            const res = await fetch(`/screenshot?sid=${sid}`, { method: "POST" });
+            let job = await res.json();
+            if (job.error) throw new Error(job.error);
+            if (job.status === "pending" || job.status === "running") {
+              const result = new Promise((resolve) => {
+                screenshotWaiters[job.job_id] = resolve;
+              });
+              // the job may have finished before we started listening
+              const status = await (await fetch(job.status_url)).json();
+              job = status.status === "done" || status.status === "error"
+                ? status
+                : await result;
+              delete screenshotWaiters[job.job_id];
             }
-           speak(response);
+            if (job.status !== "done") throw new Error(job.error || "Screenshot failed");
+            return job.response;
+          })().finally(() => {
+            screenshotPending = null;
+          });
+          return screenshotPending;
+        }
+
+        async function onProcessClick() {
+          try {
+            speak(await requestScreenshot());
+          } catch (err) {
+            console.error(err);
           }
+        }
 
 // wire up your button
 document.getElementById('screenshot-btn')
@@ -167,26 +351,10 @@ document.getElementById('screenshot-btn')
           window.speechSynthesis.speak(utter);
         }
 
-        fetch("/screenshot")
-          .then((res) => res.json())
-          .then(({ response, error }) => {
-            if (error) return alert(error);
-            speak(response);
-          });
-
-        socket.on("sensorData", ({ topic, data }) => {
-          const cfg = THRESHOLDS[topic];
-          const el = sensorMapping[topic].element;
-          el.textContent = sensorMapping[topic].format(data);
-
-          // reset
-          el.classList.remove("value-increasing", "value-decreasing");
+        requestScreenshot()
+          .then(speak)
+          .catch((err) => alert(err.message));
 
-          if (cfg) {
-            if (data > cfg.high) el.classList.add("value-increasing");
-            if (data < cfg.low) el.classList.add("value-decreasing");
-          }
-        });
       });
       const streamImg = document.getElementById("server-stream");
       let showingRaw = true;
@@ -240,9 +408,24 @@ document.getElementById('screenshot-btn')
         });
         
         const viewLogsBtn = document.getElementById('view-logs-panel');
-        viewLogsBtn.addEventListener('click', function() {
-          window.open('/anomalies/pdf','_blank');
+        viewLogsBtn.addEventListener('click', async function() {
           closeThePanel();
+          // Opening the log counts as having seen the current anomalies
+          if (anomalies.size) socket.emit('ackAnomalies', { upTo: syncState.anomaly });
+          // Open the tab now (popup blockers), point it at the PDF once rendered
+          const win = window.open('', '_blank');
+          try {
+            let job = await (await fetch('/anomalies/reports', { method: 'POST' })).json();
+            while (job.status === 'pending' || job.status === 'running') {
+              await new Promise((resolve) => setTimeout(resolve, 500));
+              job = await (await fetch(job.status_url)).json();
+            }
+            if (job.status !== 'done') throw new Error(job.error || 'Report failed');
+            win.location = job.download_url;
+          } catch (err) {
+            console.error(err);
+            if (win) win.close();
+          }
         });
         
         // Add functionality for other buttons
@@ -5,7 +5,8 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 
-from gauge_app.app import app, socketio
-
 if __name__ == '__main__':
-    socketio.run(app, host='0.0.0.0', port=3000)
\ No newline at end of file
+    # Report workers (forkserver/spawn) re-import this script, so the app
+    # is only built and its services started here, never at import time.
+    from gauge_app.app import main
+    main(port=3000)
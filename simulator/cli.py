@@ -0,0 +1,58 @@
+# simulator/cli.py
+"""Command-line plumbing shared by the run_simdata*.py scripts."""
+import argparse
+import time
+
+from simulator.engine import Engine, connect_mqtt
+from simulator.values import PROFILES
+
+
+def parser(description, broker, port):
+    ap = argparse.ArgumentParser(description=description)
+    ap.add_argument('--broker', default=broker)
+    ap.add_argument('--port', type=int, default=port)
+    ap.add_argument('--interval', type=float, default=5.0,
+                    help='seconds between readings per topic')
+    ap.add_argument('--stagger', type=float, default=1.0,
+                    help='start offset between consecutive topics, seconds')
+    ap.add_argument('--replicas', type=int, default=1,
+                    help="copies of each sensor; copy k publishes on '<topic>/<k>'")
+    ap.add_argument('--profile', choices=tuple(PROFILES), default='normal')
+    ap.add_argument('--jitter', type=float, default=0.0,
+                    help='per-slot jitter as a fraction of the interval')
+    ap.add_argument('--seed', type=int)
+    ap.add_argument('--verbose', action='store_true', help='print every publish')
+    return ap
+
+
+def build_engine(args, thresholds):
+    """An Engine with every (replicated) sensor in `thresholds`; run()
+    connects its publish callback."""
+    engine = Engine(None, jitter=args.jitter, profile=args.profile, seed=args.seed,
+                    verbose=args.verbose)
+    n = 0
+    for k in range(args.replicas):
+        for topic, bounds in thresholds.items():
+            name = topic if k == 0 else f"{topic}/{k}"
+            offset = (n * args.stagger) % args.interval if args.stagger else 0.0
+            engine.add(name, bounds['low'], bounds['high'], args.interval, offset)
+            n += 1
+    return engine
+
+
+def run(args, engine, report_every=10.0):
+    """Connect, run `engine` until Ctrl-C and print progress now and then."""
+    client, publish = connect_mqtt(args.broker, args.port)
+    engine.publish = publish
+    engine.start()
+    print(f"✓ Simulating {len(engine.topics)} topics on {args.broker}:{args.port}")
+    try:
+        while True:
+            time.sleep(report_every)
+            print("  •", engine.stats())
+    except KeyboardInterrupt:
+        print("Stopping...")
+    finally:
+        engine.stop()
+        client.loop_stop()
+        client.disconnect()
@@ -0,0 +1,179 @@
+# simulator/engine.py
+"""One scheduling thread for any number of simulated topics.
+
+    engine = Engine(publish, profile='drift')
+    engine.add('luzpeacock', 300.0, 1000.0, interval=5.0)
+    engine.run()
+
+Topics live in arrays. Each wake-up finds every topic that is due with
+one vectorised comparison, draws all their values in one batch and
+publishes them. Slot k of a topic is scheduled at
+start + offset + k * interval, plus optional jitter, so publish time
+never accumulates into drift. A topic that falls a whole interval
+behind skips the missed slots instead of bursting to catch up.
+"""
+import json
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from simulator.values import SensorValues
+
+
+class Engine:
+    """Publish simulated readings at fixed per-topic rates.
+
+    `publish(topic, payload)` is called from the engine thread. Topics
+    due within `tick` seconds of each other go out in the same batch.
+    `jitter` shifts each slot by up to ±jitter × interval without
+    moving the ones after it.
+    """
+
+    def __init__(self, publish, tick=0.01, jitter=0.0, profile='normal', seed=None,
+                 verbose=False, **profile_params):
+        if not 0.0 <= jitter < 0.5:
+            raise ValueError("jitter must be in [0, 0.5)")
+        self.publish = publish
+        self.tick = tick
+        self.jitter = jitter
+        self.profile = profile
+        self.profile_params = profile_params
+        self.verbose = verbose
+        self.rng = np.random.default_rng(seed)
+        self.topics = []
+        self._specs = []            # (low, high, interval, offset) per topic
+        self._index = {}
+        self._overrides = {}        # topic index -> fixed value
+        self._values = None
+        self._running = False
+        self._thread = None
+        self.published = 0
+        self.missed = 0             # slots skipped because the engine fell behind
+        self.errors = 0
+        self._late = deque(maxlen=10000)   # seconds after the slot each publish went out
+
+    def add(self, topic, low, high, interval, offset=0.0):
+        """Simulate `topic` every `interval` seconds, first after `offset`."""
+        if self._values is not None:
+            raise RuntimeError("add topics before the engine starts")
+        self._index[topic] = len(self.topics)
+        self.topics.append(topic)
+        self._specs.append((low, high, interval, offset))
+        return self._index[topic]
+
+    def set_value(self, topic, value):
+        """Publish `value` for `topic` instead of a simulated reading;
+        None goes back to simulating."""
+        i = self._index[topic]
+        self._overrides[i] = np.nan if value is None else float(value)
+        if self._values is not None:
+            self._fixed[i] = self._overrides[i]
+
+    def _prepare(self, now):
+        low, high, interval, offset = (np.array(col, dtype=float) for col in zip(*self._specs))
+        self._values = SensorValues(low, high, self.profile,
+                                    seed=self.rng.integers(2 ** 32), **self.profile_params)
+        self._interval = interval
+        self._base = now + offset                 # slot times without jitter
+        self._due = self._base + self._jitter(np.arange(len(self.topics)))
+        self._fixed = np.full(len(self.topics), np.nan)
+        for i, value in self._overrides.items():
+            self._fixed[i] = value
+
+    def _jitter(self, idx):
+        if not self.jitter:
+            return 0.0
+        return self.rng.uniform(-self.jitter, self.jitter, len(idx)) * self._interval[idx]
+
+    def step(self, now=None):
+        """Publish every topic due by `now` + tick; returns how many went out."""
+        now = time.monotonic() if now is None else now
+        if self._values is None:
+            self._prepare(now)
+        idx = np.flatnonzero(self._due <= now + self.tick)
+        if not len(idx):
+            return 0
+
+        values = self._values.draw(idx)
+        fixed = self._fixed[idx]
+        values = np.where(np.isnan(fixed), values, fixed)
+        self._late.extend(np.maximum(now - self._due[idx], 0.0).tolist())
+
+        sent = 0
+        for i, value in zip(idx.tolist(), values.tolist()):
+            topic = self.topics[i]
+            try:
+                self.publish(topic, json.dumps(value))
+            except Exception as e:
+                self.errors += 1
+                print(f"✗ publish to {topic} failed:", e)
+                continue
+            sent += 1
+            if self.verbose:
+                print(f"Published to {topic}: {value}")
+        self.published += sent
+
+        # next slot; skip any that are already a whole interval late
+        interval = self._interval[idx]
+        base = self._base[idx] + interval
+        skip = np.maximum(np.floor((now - base) / interval), 0)
+        self.missed += int(skip.sum())
+        self._base[idx] = base + skip * interval
+        self._due[idx] = self._base[idx] + self._jitter(idx)
+        return sent
+
+    def next_due(self):
+        return float(self._due.min()) if self._values is not None and len(self._due) else None
+
+    def run(self, duration=None):
+        """Publish until stop() (or for `duration` seconds) in this thread."""
+        if not self.topics:
+            raise RuntimeError("no topics to simulate")
+        self._running = True
+        started = time.monotonic()
+        self.step(started)
+        while self._running:
+            now = time.monotonic()
+            if duration is not None and now - started >= duration:
+                break
+            # sleep to the next slot, waking now and then to notice stop()
+            delay = min(self.next_due() - now, 0.25)
+            if delay > 0:
+                time.sleep(delay)
+            self.step()
+        self._running = False
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def stats(self):
+        late = np.fromiter(self._late, float) if self._late else None
+        return {
+            'topics': len(self.topics),
+            'published': self.published,
+            'missed': self.missed,
+            'errors': self.errors,
+            'late_p50_ms': float(np.percentile(late, 50) * 1000) if late is not None else None,
+            'late_p99_ms': float(np.percentile(late, 99) * 1000) if late is not None else None,
+        }
+
+
+def connect_mqtt(broker, port=1883):
+    """Connected paho client with its network loop running, and a
+    publish(topic, payload) for the engine."""
+    import paho.mqtt.client as mqtt
+    client = mqtt.Client()
+    client.connect(broker, port, keepalive=60)
+    client.loop_start()
+    return client, lambda topic, payload: client.publish(topic, payload)
@@ -0,0 +1,109 @@
+# simulator/values.py
+"""Vectorised sensor readings.
+
+SensorValues draws one reading for many sensors in a single NumPy call.
+The base draw is the original simulate_value(): uniform in [low, high],
+with P_EXCEED of draws landing outside it. Scenario profiles add
+behaviour on top:
+
+    normal   the base draw only
+    drift    a bounded random-walk offset per sensor
+    spikes   rare excursions of up to `spike_scale` spans
+    stuck    sensors freezing on their last value for a while
+    mixed    all of the above
+"""
+import numpy as np
+
+P_EXCEED = 0.05
+
+PROFILES = {
+    'normal': {},
+    'drift':  {'drift': 0.02},
+    'spikes': {'spike_prob': 0.01},
+    'stuck':  {'stuck_prob': 0.005},
+    'mixed':  {'drift': 0.02, 'spike_prob': 0.01, 'stuck_prob': 0.005},
+}
+
+
+class SensorValues:
+    """Readings for sensors with per-sensor [low, high] ranges.
+
+    drift        random-walk step per draw, as a fraction of the span
+    drift_limit  largest offset the walk may reach, fraction of the span
+    spike_prob   chance per draw of a spike
+    spike_scale  largest spike, in spans
+    stuck_prob   chance per draw that a sensor freezes
+    stuck_draws  (min, max) draws a frozen sensor repeats its value
+    """
+
+    def __init__(self, lows, highs, profile='normal', seed=None, p_exceed=P_EXCEED,
+                 **params):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile {profile!r}; use one of {tuple(PROFILES)}")
+        params = dict(PROFILES[profile], **params)
+        self.low = np.asarray(lows, dtype=float)
+        self.high = np.asarray(highs, dtype=float)
+        self.span = self.high - self.low
+        self.profile = profile
+        self.p_exceed = p_exceed
+        self.drift = params.get('drift', 0.0)
+        self.drift_limit = params.get('drift_limit', 0.3)
+        self.spike_prob = params.get('spike_prob', 0.0)
+        self.spike_scale = params.get('spike_scale', 1.0)
+        self.stuck_prob = params.get('stuck_prob', 0.0)
+        self.stuck_draws = params.get('stuck_draws', (20, 100))
+        self.rng = np.random.default_rng(seed)
+
+        n = len(self.low)
+        self.offset = np.zeros(n)                 # drift per sensor
+        self.last = np.full(n, np.nan)            # last value drawn per sensor
+        self.stuck_left = np.zeros(n, dtype=int)  # draws still frozen
+
+    def __len__(self):
+        return len(self.low)
+
+    def draw(self, idx=None):
+        """Readings for sensors `idx` (default all), rounded to 2 decimals."""
+        idx = np.arange(len(self.low)) if idx is None else np.asarray(idx)
+        k = len(idx)
+        rng = self.rng
+        low, high, span = self.low[idx], self.high[idx], self.span[idx]
+
+        values = rng.uniform(low, high)
+        exceed = rng.random(k) < self.p_exceed
+        if exceed.any():
+            below = rng.random(k) < 0.5
+            values = np.where(exceed,
+                              np.where(below,
+                                       rng.uniform(low - 0.2 * span, low - 0.1),
+                                       rng.uniform(high + 0.1, high + 0.2 * span)),
+                              values)
+
+        if self.drift:
+            limit = self.drift_limit * span
+            offset = np.clip(self.offset[idx] + rng.normal(0.0, self.drift, k) * span,
+                             -limit, limit)
+            self.offset[idx] = offset
+            values += offset
+
+        if self.spike_prob:
+            spike = rng.random(k) < self.spike_prob
+            if spike.any():
+                size = rng.uniform(0.5, 1.0, k) * self.spike_scale * span
+                values = np.where(spike, values + np.where(rng.random(k) < 0.5, -size, size),
+                                  values)
+
+        values = np.round(values, 2)
+
+        if self.stuck_prob:
+            left = self.stuck_left[idx]
+            frozen = left > 0
+            values = np.where(frozen, self.last[idx], values)
+            # a sensor that freezes now repeats this draw's value next time
+            start = ~frozen & (rng.random(k) < self.stuck_prob)
+            lo, hi = self.stuck_draws
+            self.stuck_left[idx] = np.where(
+                frozen, left - 1, np.where(start, rng.integers(lo, hi + 1, k), 0))
+
+        self.last[idx] = values
+        return values
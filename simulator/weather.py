@@ -0,0 +1,191 @@
+# simulator/weather.py
+"""Background weather readings from Open-Meteo.
+
+    feed = WeatherFeed(34.6937, 135.5023, cache_dir='data/weather',
+                       on_update=lambda temp, hum: ...)
+    feed.start()
+
+Responses are cached on disk for `ttl` seconds, so restarts and several
+simulators on one machine share a single request per TTL. Requests go
+through one pooled requests.Session with timeouts and retries. Times
+are requested as unix timestamps, which keeps the hourly series sorted
+and searchable with bisect without parsing any dates.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+
+
+def make_session(retries=2, backoff=0.5):
+    """A requests.Session that retries transient failures."""
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=backoff,
+                  status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=('GET',))
+    session.mount('http://', HTTPAdapter(max_retries=retry, pool_maxsize=2))
+    session.mount('https://', HTTPAdapter(max_retries=retry, pool_maxsize=2))
+    return session
+
+
+class WeatherFeed:
+    """Current temperature (°C) and relative humidity (%) for one place.
+
+    `current` is (temperature, humidity), or None before the first
+    successful fetch. A background thread refreshes it when the cached
+    response expires and calls `on_update(temperature, humidity)`. If a
+    refresh fails the hourly forecast already held keeps the values
+    moving, and the fetch is retried after `retry` seconds.
+    """
+
+    def __init__(self, latitude, longitude, timezone='Asia/Tokyo', ttl=900.0,
+                 cache_dir=None, url=OPEN_METEO_URL, timeout=(3.05, 10.0),
+                 retry=60.0, session=None, on_update=None):
+        self.params = {
+            'latitude': latitude,
+            'longitude': longitude,
+            'current_weather': 'true',
+            'hourly': 'temperature_2m,relativehumidity_2m',
+            'timezone': timezone,
+            'timeformat': 'unixtime',
+        }
+        self.ttl = ttl
+        self.url = url
+        self.timeout = timeout
+        self.retry = retry
+        self.session = session or make_session()
+        self.on_update = on_update
+        self.cache_path = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.cache_path = os.path.join(cache_dir, f"weather_{latitude}_{longitude}.json")
+        self.current = None
+        self.fetched = None          # epoch seconds of the response in use
+        self.requests = 0            # HTTP requests made
+        self.failures = 0
+        self._times = []             # hourly timestamps, ascending
+        self._temps = []
+        self._hums = []
+        self._running = False
+        self._thread = None
+        self._lock = threading.Lock()
+
+    # --- fetching ---
+
+    def _read_cache(self):
+        if not self.cache_path:
+            return None
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, entry):
+        """Store `entry` on disk; a failed write only costs the cache."""
+        if not self.cache_path:
+            return
+        tmp = self.cache_path + '.tmp'
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            print("✗ weather cache write failed:", e)
+
+    def fetch(self):
+        """{'fetched', 'data'}: the disk cache while fresh, else a new
+        response (written back to the cache)."""
+        entry = self._read_cache()
+        if entry and time.time() - entry['fetched'] < self.ttl:
+            return entry
+        self.requests += 1
+        resp = self.session.get(self.url, params=self.params, timeout=self.timeout)
+        resp.raise_for_status()
+        entry = {'fetched': time.time(), 'data': resp.json()}
+        self._write_cache(entry)
+        return entry
+
+    def _load(self, entry):
+        data = entry['data']
+        hourly = data['hourly']
+        with self._lock:
+            self._times = hourly['time']
+            self._temps = hourly['temperature_2m']
+            self._hums = hourly['relativehumidity_2m']
+            self.fetched = entry['fetched']
+        cw = data['current_weather']
+        humidity = self._nearest(self._hums, cw['time'])
+        return round(cw['temperature'], 2), round(humidity, 2)
+
+    # --- lookups ---
+
+    def _nearest(self, series, ts):
+        """Value of `series` at the hourly time closest to `ts`."""
+        with self._lock:
+            times = self._times
+            if not times:
+                return None
+            i = bisect.bisect_left(times, ts)
+            if i == len(times) or (i > 0 and ts - times[i - 1] <= times[i] - ts):
+                i -= 1
+            return series[i]
+
+    def forecast(self, when=None):
+        """(temperature, humidity) of the forecast hour nearest `when`
+        (epoch seconds, default now), or None without data."""
+        when = time.time() if when is None else when
+        temp = self._nearest(self._temps, when)
+        if temp is None:
+            return None
+        return round(temp, 2), round(self._nearest(self._hums, when), 2)
+
+    # --- refreshing ---
+
+    def update(self):
+        """Refresh `current`; returns seconds until the next refresh is due."""
+        try:
+            self.current = self._load(self.fetch())
+            delay = max(self.fetched + self.ttl - time.time(), 1.0)
+        except (requests.RequestException, KeyError, TypeError, ValueError) as e:
+            self.failures += 1
+            print("✗ weather fetch failed:", e)
+            if not self._times:
+                stale = self._read_cache()      # expired, but better than nothing
+                try:
+                    if stale:
+                        self._load(stale)
+                except (KeyError, TypeError, ValueError):
+                    pass
+            forecast = self.forecast()
+            if forecast is None:
+                return self.retry
+            self.current = forecast
+            delay = self.retry
+        if self.on_update:
+            self.on_update(*self.current)
+        return delay
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def _run(self):
+        while self._running:
+            delay = self.update()
+            # sleep in short steps so stop() takes effect promptly
+            until = time.monotonic() + delay
+            while self._running and time.monotonic() < until:
+                time.sleep(max(0.0, min(1.0, until - time.monotonic())))